@@ -0,0 +1,411 @@
+"""
+Beyond Benchmark
+================
+
+Times each phase of the Beyond verification (collect, LightingFactory,
+BeyondFactory, parameter write-back, Logger) on synthetic models built with
+the fake Revit API, and reports how each phase scales with model size.
+With --memory, measures (tracemalloc) the memory retained by the fixtures and
+devices in the slotted record layout against the previous object layout.
+With --live, measures the latency of the live re-verification after single
+edits against the time of a full verification.
+With --query, measures the lookups of the ValidationResultIndex returned by
+the run.
+
+Mede o tempo de cada fase da verificação Beyond em modelos sintéticos gerados
+com a API fictícia do Revit e reporta como cada fase escala com o tamanho do modelo.
+Com --memory, mede a memória retida pelas luminárias e dispositivos nos registros
+com __slots__ em comparação com o layout anterior de objetos.
+Com --live, mede a latência da verificação contínua após edições isoladas em
+comparação com o tempo de uma verificação completa.
+Com --query, mede as consultas ao ValidationResultIndex retornado pela execução.
+
+Usage / Uso:
+    python beyond_benchmark.py [--sizes 100 1000 10000] [--rounds 3] [--fixtures-per-device 5]
+    python beyond_benchmark.py --memory [--sizes 1000 10000]
+    python beyond_benchmark.py --live [--sizes 1000 10000] [--edits 50]
+    python beyond_benchmark.py --query [--sizes 10000 100000] [--rounds 3]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import beyond_fake_revit
+
+beyond_fake_revit.install()
+
+import beyond_revit_automation as beyond
+
+#===================================================================================================================
+#==========================         PHASES          ================================================================
+#===================================================================================================================
+
+PHASES = ("collect", "LightingFactory", "BeyondFactory", "writer", "Logger")
+
+
+def run_phases(doc):
+    """
+    Executa as fases de run_verification separadamente, sem verificação incremental.
+    Returns:
+        {fase: segundos}
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    beyond_families = beyond.ModelCollector.get_beyond_families(doc, beyond.BEYOND_TYPE_NAMES)
+    lighting_fixtures_collector = beyond.ModelCollector.get_lighting_fixtures(doc)
+    timings["collect"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lighting_fixtures = beyond.LightingFactory.create_lighting_fixtures(lighting_fixtures_collector)
+    apparent_load_mapping = beyond.LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+    timings["LightingFactory"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    beyond_objects = beyond.BeyondFactory.create_devices(doc, beyond_families, apparent_load_mapping) or None
+    timings["BeyondFactory"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parameter_cache = beyond.BeyondParameterCache(beyond.BeyondParameterWriter.PARAMETER_NAMES)
+    write_back = beyond.BeyondParameterWriteBack(doc, parameter_cache, beyond.WRITE_BACK_CHUNK_SIZE)
+    write_back.write(beyond_objects or [])
+    timings["writer"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    log = beyond.Logger(doc, beyond.LOG_FILE_NAME)
+    log.write_to_log(beyond.Logger.log_message(beyond_objects, parameter_cache.missing_parameters, write_back))
+    timings["Logger"] = time.perf_counter() - start
+
+    return timings
+
+
+def benchmark(sizes, rounds, fixtures_per_device, faulty_fraction):
+    """
+    Returns:
+        {tamanho: {fase: [segundos por rodada]}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            results[size] = {phase: [] for phase in PHASES}
+            for round_number in range(rounds):
+                doc = beyond_fake_revit.generate_model(
+                    devices=size,
+                    fixtures=size * fixtures_per_device,
+                    faulty_fraction=faulty_fraction,
+                    path_name=os.path.join(directory, f"model_{size}.rvt"),
+                    seed=round_number,
+                )
+                for phase, seconds in run_phases(doc).items():
+                    results[size][phase].append(seconds)
+    return results
+
+
+#===================================================================================================================
+#==========================         MEMORY          ================================================================
+#===================================================================================================================
+
+LAYOUTS = ("objects", "records", "records, fixtures dropped")
+
+
+class LegacyElement:
+    """
+    Layout anterior de LightingFixture, DockStation e OutputChannel: objeto com
+    __dict__ que mantém a FamilyInstance e o ElectricalData além dos valores.
+    """
+    def __init__(self, family_instance, electrical_data, values):
+        self.family_instance = family_instance
+        self.electrical_data = electrical_data
+        self.__dict__.update(values)
+
+
+class LegacyDevice:
+    """
+    Layout anterior de BeyondDevice: objeto com __dict__, FamilyInstance e BeyondService.
+    """
+    def __init__(self, family_instance, values):
+        self.service = beyond.BeyondService(self)
+        self.family_instance = family_instance
+        self.__dict__.update(values)
+
+
+def build_legacy_objects(doc, beyond_families, lighting_fixtures_collector, beyond_objects):
+    """
+    Reconstrói luminárias e dispositivos no layout anterior, com os valores já
+    verificados em beyond_objects.
+    Returns:
+        (List[LegacyElement], List[LegacyDevice])
+    """
+    fixtures = []
+    for family_instance in lighting_fixtures_collector:
+        electrical_data = beyond.ElectricalData(family_instance, beyond.ElectricalData.FIXTURE_KEYS)
+        record = beyond.LightingFixture.from_electrical_data(family_instance.Id, electrical_data)
+        fixtures.append(LegacyElement(family_instance, electrical_data, record._asdict()))
+
+    nested_family_index = beyond.NestedFamilyIndex.build(doc, beyond_families)
+    devices = []
+    for family_instance, device in zip(beyond_families, beyond_objects):
+        dock_station_family = nested_family_index.get_nested_families(family_instance.Id.Value, beyond.NestedFamilyIndex.DOCK_STATION)[0]
+        output_channel_families = nested_family_index.get_nested_families(family_instance.Id.Value, beyond.NestedFamilyIndex.OUTPUT_CHANNEL)
+        values = {attribute: getattr(device, attribute) for attribute in beyond.BeyondDevice.__slots__ if attribute != "family_instance"}
+        values["revit_element_id"] = family_instance.Id
+        values["dock_station"] = LegacyElement(
+            dock_station_family,
+            beyond.ElectricalData(dock_station_family, beyond.ElectricalData.DOCK_STATION_KEYS),
+            device.dock_station._asdict(),
+        )
+        for channel_number, channel_family in enumerate(output_channel_families, start=1):
+            channel = getattr(device, f"output_channel_{channel_number}")
+            values[f"output_channel_{channel_number}"] = LegacyElement(
+                channel_family,
+                beyond.ElectricalData(channel_family, beyond.ElectricalData.OUTPUT_CHANNEL_KEYS),
+                channel._asdict(),
+            )
+        values["issues"] = list(device.issues)
+        values["issue_codes"] = list(device.issue_codes)
+        devices.append(LegacyDevice(family_instance, values))
+
+    return fixtures, devices
+
+
+def retained_bytes(build):
+    """
+    Returns:
+        (bytes retidos pelo valor retornado por build(), valor retornado)
+    """
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    value = build()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained, value
+
+
+def measure_memory(doc):
+    """
+    Returns:
+        {layout: bytes retidos pelas luminárias e dispositivos}
+    """
+    beyond_families = beyond.ModelCollector.get_beyond_families(doc, beyond.BEYOND_TYPE_NAMES)
+    lighting_fixtures_collector = list(beyond.ModelCollector.get_lighting_fixtures(doc))
+
+    def build_records():
+        lighting_fixtures = beyond.LightingFactory.create_lighting_fixtures(lighting_fixtures_collector)
+        apparent_load_mapping = beyond.LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+        beyond_objects = beyond.BeyondFactory.create_devices(doc, beyond_families, apparent_load_mapping)
+        return lighting_fixtures, beyond_objects
+
+    records, (lighting_fixtures, beyond_objects) = retained_bytes(build_records)
+    fixtures_bytes, _ = retained_bytes(lambda: beyond.LightingFactory.create_lighting_fixtures(lighting_fixtures_collector))
+    objects, _ = retained_bytes(lambda: build_legacy_objects(doc, beyond_families, lighting_fixtures_collector, beyond_objects))
+
+    return {
+        "objects"                   : objects,
+        "records"                   : records,
+        "records, fixtures dropped" : records - fixtures_bytes,
+    }
+
+
+def memory_benchmark(sizes, fixtures_per_device, faulty_fraction):
+    """
+    Returns:
+        {tamanho: {layout: bytes}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            doc = beyond_fake_revit.generate_model(
+                devices=size,
+                fixtures=size * fixtures_per_device,
+                faulty_fraction=faulty_fraction,
+                path_name=os.path.join(directory, f"model_{size}.rvt"),
+            )
+            results[size] = measure_memory(doc)
+    return results
+
+
+def format_memory_report(results):
+    """
+    Tabela com a memória retida por layout, por dispositivo e em relação ao layout anterior.
+    """
+    lines = [f"{'devices':>8} {'layout':<26} {'KiB':>10} {'B/device':>10} {'vs objects':>10}"]
+    for size, layouts in results.items():
+        for layout in LAYOUTS:
+            retained = layouts[layout]
+            lines.append(
+                f"{size:>8} {layout:<26} {retained / 1024:>10.1f} {retained / size:>10.0f} "
+                f"{retained / layouts['objects']:>10.1%}"
+            )
+    return "\n".join(lines)
+
+
+#===================================================================================================================
+#==========================         LIVE          ==================================================================
+#===================================================================================================================
+
+def live_benchmark(sizes, edits, fixtures_per_device, faulty_fraction):
+    """
+    Edita luminárias e dispositivos, uma edição por transação, e descarrega o
+    LiveVerifier após cada uma, com o ChangeDebouncer sem espera.
+    Returns:
+        {tamanho: {"full": segundos da verificação completa, "flush": [segundos por edição]}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            doc = beyond_fake_revit.generate_model(
+                devices=size,
+                fixtures=size * fixtures_per_device,
+                faulty_fraction=faulty_fraction,
+                path_name=os.path.join(directory, f"model_{size}.rvt"),
+            )
+            start = time.perf_counter()
+            live_verifier = beyond.LiveVerifier.from_document(doc, beyond.BEYOND_TYPE_NAMES, debouncer=beyond.ChangeDebouncer(0, 0))
+            full = time.perf_counter() - start
+            live_verifier.start(beyond.DocumentChangedSource(doc))
+
+            generator = random.Random(size)
+            lighting_fixtures = list(beyond.ModelCollector.get_lighting_fixtures(doc))
+            device_ids = list(live_verifier.devices)
+            flushes = []
+            for edit_number in range(edits):
+                with beyond_fake_revit.edit_model(doc):
+                    if edit_number % 2:
+                        beyond_fake_revit.set_apparent_load(generator.choice(lighting_fixtures), generator.choice((5.0, 10.0, 60.0)))
+                    else:
+                        device = doc.GetElement(beyond.ElementId(generator.choice(device_ids)))
+                        location = device.Location.Point
+                        beyond_fake_revit.move_element(device, beyond.XYZ(location.X + 1.0, location.Y, location.Z))
+                start = time.perf_counter()
+                live_verifier.flush()
+                flushes.append(time.perf_counter() - start)
+
+            live_verifier.stop()
+            results[size] = {"full": full, "flush": flushes}
+    return results
+
+
+def format_live_report(results):
+    """
+    Tabela com o tempo da verificação completa e a latência média e máxima da verificação contínua.
+    """
+    lines = [f"{'devices':>8} {'full (ms)':>10} {'edit mean (ms)':>15} {'edit max (ms)':>14} {'speedup':>8}"]
+    for size, timings in results.items():
+        mean = statistics.mean(timings["flush"])
+        lines.append(
+            f"{size:>8} {timings['full'] * 1e3:>10.2f} {mean * 1e3:>15.3f} {max(timings['flush']) * 1e3:>14.3f} "
+            f"{timings['full'] / mean:>8.0f}x"
+        )
+    return "\n".join(lines)
+
+
+#===================================================================================================================
+#==========================         QUERY          =================================================================
+#===================================================================================================================
+
+def query_benchmark(sizes, rounds, fixtures_per_device, faulty_fraction, queries=200):
+    """
+    Executa run_verification e consulta o ValidationResultIndex retornado com
+    filtros simples e combinados sobre valores sorteados do modelo.
+    Returns:
+        {tamanho: {consulta: {"time": [segundos por consulta], "ids": média de Ids retornados}}}
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            doc = beyond_fake_revit.generate_model(
+                devices=size,
+                fixtures=size * fixtures_per_device,
+                faulty_fraction=faulty_fraction,
+                path_name=os.path.join(directory, f"model_{size}.rvt"),
+            )
+            beyond.INCREMENTAL_MODE = False
+            result_index = beyond.run_verification(doc)[2]
+
+            generator = random.Random(size)
+            values = {field: result_index.values(field) for field in ("device_id", "panel", "switch_id", "space_or_room", "issue_code")}
+            element_ids = sorted(result_index.find())
+            lookups = {
+                "element_id"        : lambda: [result_index.get(generator.choice(element_ids))],
+                "device_id"         : lambda: result_index.element_ids(device_id=generator.choice(values["device_id"])),
+                "switch_id"         : lambda: result_index.element_ids(switch_id=generator.choice(values["switch_id"])),
+                "space + issue"     : lambda: result_index.element_ids(space_or_room=generator.choice(values["space_or_room"]),
+                                                                       issue_code=generator.choice(values["issue_code"])),
+                "panel + faulty"    : lambda: result_index.element_ids(panel=generator.choice(values["panel"]), issue_flag=True),
+            }
+            timings = results[size] = {name: {"time": [], "ids": 0} for name in lookups}
+            for _ in range(rounds):
+                for name, lookup in lookups.items():
+                    returned_ids = 0
+                    start = time.perf_counter()
+                    for _ in range(queries):
+                        returned_ids += len(lookup())
+                    timings[name]["time"].append((time.perf_counter() - start) / queries)
+                    timings[name]["ids"] = returned_ids / queries
+    return results
+
+
+def format_query_report(results):
+    """
+    Tabela com o tempo mínimo por consulta e a quantidade média de Ids retornados.
+    """
+    lines = [f"{'devices':>8} {'query':<16} {'min (us)':>10} {'ids':>8}"]
+    for size, timings in results.items():
+        for name, samples in timings.items():
+            lines.append(f"{size:>8} {name:<16} {min(samples['time']) * 1e6:>10.2f} {samples['ids']:>8.0f}")
+    return "\n".join(lines)
+
+
+def format_report(results):
+    """
+    Tabela com o tempo mínimo e médio de cada fase e o tempo por dispositivo.
+    """
+    lines = [f"{'devices':>8} {'phase':<16} {'min (ms)':>10} {'mean (ms)':>10} {'us/device':>10}"]
+    for size, phases in results.items():
+        for phase in PHASES:
+            samples = phases[phase]
+            lines.append(
+                f"{size:>8} {phase:<16} {min(samples) * 1e3:>10.2f} {statistics.mean(samples) * 1e3:>10.2f} "
+                f"{min(samples) / size * 1e6:>10.2f}"
+            )
+        total = sum(min(phases[phase]) for phase in PHASES)
+        lines.append(f"{size:>8} {'total':<16} {total * 1e3:>10.2f} {'':>10} {total / size * 1e6:>10.2f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das fases da verificação Beyond em modelos sintéticos.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="quantidade de dispositivos por modelo")
+    parser.add_argument("--rounds", type=int, default=3, help="rodadas por tamanho")
+    parser.add_argument("--fixtures-per-device", type=int, default=5, help="luminárias por dispositivo")
+    parser.add_argument("--faulty-fraction", type=float, default=0.1, help="fração de dispositivos com defeito")
+    parser.add_argument("--memory", action="store_true", help="mede a memória retida pelos registros em vez do tempo das fases")
+    parser.add_argument("--live", action="store_true", help="mede a latência da verificação contínua após cada edição")
+    parser.add_argument("--edits", type=int, default=50, help="edições por tamanho, com --live")
+    parser.add_argument("--query", action="store_true", help="mede as consultas ao índice dos resultados")
+    args = parser.parse_args(argv)
+
+    if args.query:
+        print(format_query_report(query_benchmark(args.sizes, args.rounds, args.fixtures_per_device, args.faulty_fraction)))
+        return 0
+
+    if args.live:
+        print(format_live_report(live_benchmark(args.sizes, args.edits, args.fixtures_per_device, args.faulty_fraction)))
+        return 0
+
+    if args.memory:
+        print(format_memory_report(memory_benchmark(args.sizes, args.fixtures_per_device, args.faulty_fraction)))
+        return 0
+
+    results = benchmark(args.sizes, args.rounds, args.fixtures_per_device, args.faulty_fraction)
+    print(format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,1165 @@
+"""
+Beyond Fake Revit API
+=====================
+
+Local stand-in for the subset of the Revit API used by beyond_revit_automation,
+plus a synthetic model generator for benchmarks outside Revit.
+
+Substituto local do subconjunto da API do Revit utilizado por
+beyond_revit_automation e gerador de modelos sintéticos para benchmarks fora do Revit.
+
+Usage / Uso:
+    import beyond_fake_revit
+    beyond_fake_revit.install()            # antes de importar beyond_revit_automation
+    import beyond_revit_automation
+    doc = beyond_fake_revit.generate_model(devices=1000, fixtures=5000)
+"""
+
+import contextlib
+import random
+import sys
+import types
+import uuid
+from enum import Enum, IntEnum
+
+#===================================================================================================================
+#==========================         API          ===================================================================
+#===================================================================================================================
+
+INTERNAL_UNITS_PER_WATT = 10.763910416709722
+INTERNAL_UNITS_PER_VOLT = 10.763910416709722
+
+
+class BuiltInCategory(Enum):
+    OST_ElectricalFixtures = -2001060
+    OST_LightingFixtures = -2001120
+    OST_LightingDevices = -2008087
+    OST_MEPSpaces = -2003600
+    OST_Rooms = -2000160
+    OST_ElectricalCircuit = -2008037
+
+
+class ElectricalSystemType(Enum):
+    UndefinedSystemType = 0
+    Data = 1
+    PowerCircuit = 2
+
+
+class BuiltInParameter(IntEnum):
+    RBS_ELEC_VOLTAGE = -1140146
+    RBS_ELEC_NUMBER_OF_POLES = -1140147
+    RBS_ELEC_APPARENT_LOAD = -1140224
+    RBS_ELEC_CIRCUIT_PANEL_PARAM = -1140151
+    RBS_ELEC_CIRCUIT_NUMBER = -1140150
+    RBS_ELEC_SWITCH_ID_PARAM = -1140212
+    SYMBOL_NAME_PARAM = -1002002
+    SPACE_NAME_PARAM = -1155101
+    ROOM_NAME = -1001014
+
+
+class Domain(Enum):
+    DomainUndefined = 0
+    DomainHvac = 1
+    DomainElectrical = 2
+    DomainPiping = 3
+
+
+class StorageType(Enum):
+    None_ = 0
+    Integer = 1
+    Double = 2
+    String = 3
+    ElementId = 4
+
+
+class UnitTypeId:
+    Watts = "autodesk.unit.unit:watts"
+    Volts = "autodesk.unit.unit:volts"
+
+
+class UnitUtils:
+
+    @staticmethod
+    def ConvertFromInternalUnits(value, unit_type_id):
+        factors = {UnitTypeId.Watts: INTERNAL_UNITS_PER_WATT, UnitTypeId.Volts: INTERNAL_UNITS_PER_VOLT}
+        return value / factors[unit_type_id]
+
+    @staticmethod
+    def ConvertToInternalUnits(value, unit_type_id):
+        factors = {UnitTypeId.Watts: INTERNAL_UNITS_PER_WATT, UnitTypeId.Volts: INTERNAL_UNITS_PER_VOLT}
+        return value * factors[unit_type_id]
+
+
+class ElementId:
+
+    InvalidElementId = None
+
+    def __init__(self, value):
+        self.Value = int(value.value if isinstance(value, Enum) else value)
+
+    def __eq__(self, other):
+        return isinstance(other, ElementId) and other.Value == self.Value
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def __str__(self):
+        return str(self.Value)
+
+    def __repr__(self):
+        return f"ElementId({self.Value})"
+
+
+ElementId.InvalidElementId = ElementId(-1)
+
+
+class XYZ:
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.X, self.Y, self.Z = float(x), float(y), float(z)
+
+
+class BoundingBoxXYZ:
+
+    def __init__(self, minimum, maximum):
+        self.Min = minimum
+        self.Max = maximum
+
+
+class Location:
+    pass
+
+
+class LocationPoint(Location):
+
+    def __init__(self, point):
+        self.Point = point
+
+
+class Parameter:
+
+    def __init__(self, element, name, storage_type, value, guid=None):
+        self.element = element
+        self.Definition = types.SimpleNamespace(Name=name)
+        self.StorageType = storage_type
+        self.IsShared = guid is not None
+        self.GUID = guid
+        self._value = value
+
+    @property
+    def HasValue(self):
+        return self._value not in (None, "")
+
+    def AsString(self):
+        return self._value if self.StorageType == StorageType.String else None
+
+    def AsDouble(self):
+        return float(self._value or 0.0)
+
+    def AsInteger(self):
+        return int(self._value or 0)
+
+    def Set(self, value):
+        document = self.element.Document
+        if document.active_transaction is None:
+            raise RuntimeError("Modification of the document is forbidden outside of a transaction.")
+        document.api_calls["Set"] += 1
+        self._value = value
+        document._record_change("modified", self.element.Id)
+        return True
+
+
+class ParameterValue:
+
+    def __init__(self, value):
+        self.Value = value
+
+
+class MEPConnectorInfo:
+
+    def __init__(self, connector_values):
+        self._connector_values = connector_values
+
+    def GetConnectorParameterValue(self, parameter_id):
+        return ParameterValue(self._connector_values.get(parameter_id.Value))
+
+
+class Connector:
+
+    def __init__(self, domain, connector_values=None):
+        self.Domain = domain
+        self._mep_connector_info = MEPConnectorInfo(connector_values or {})
+
+    def GetMEPConnectorInfo(self):
+        return self._mep_connector_info
+
+
+class ConnectorSetIterator:
+
+    def __init__(self, connectors):
+        self._connectors = connectors
+        self._position = -1
+
+    def MoveNext(self):
+        self._position += 1
+        return self._position < len(self._connectors)
+
+    @property
+    def Current(self):
+        return self._connectors[self._position]
+
+
+class ConnectorSet:
+
+    def __init__(self, connectors):
+        self._connectors = connectors
+
+    def ForwardIterator(self):
+        return ConnectorSetIterator(self._connectors)
+
+    @property
+    def Size(self):
+        return len(self._connectors)
+
+
+class ConnectorManager:
+
+    def __init__(self, connectors):
+        self.Connectors = ConnectorSet(connectors)
+
+
+class MEPModel:
+
+    def __init__(self, connectors, document=None):
+        self.ConnectorManager = ConnectorManager(connectors)
+        self._document = document
+        self._electrical_systems = []
+
+    def GetElectricalSystems(self):
+        if self._document is not None:
+            self._document.api_calls["GetElectricalSystems"] += 1
+        return list(self._electrical_systems)
+
+
+class Element:
+
+    def __init__(self, document, name, category, level_id=None, location=None):
+        self.Document = document
+        self.Name = name
+        self.Category = category
+        self.LevelId = level_id or ElementId.InvalidElementId
+        self.Location = location
+        self.Id = document._add(self)
+        self._parameters = {}
+
+    def add_parameter(self, key, storage_type, value, guid=None):
+        name = key if isinstance(key, str) else key.name
+        parameter = Parameter(self, name, storage_type, value, guid)
+        self._parameters[key] = parameter
+        if guid is not None:
+            self._parameters[guid] = parameter
+        return parameter
+
+    def get_Parameter(self, key):
+        self.Document.api_calls["get_Parameter"] += 1
+        return self._parameters.get(key)
+
+    def LookupParameter(self, name):
+        self.Document.api_calls["LookupParameter"] += 1
+        return self._parameters.get(name)
+
+    def get_BoundingBox(self, view):
+        return getattr(self, "_bounding_box", None)
+
+    @property
+    def WorksetId(self):
+        return self.Document._level_worksets.get(self.LevelId.Value, WorksetId(0))
+
+
+class ElementType(Element):
+    pass
+
+
+class Level(Element):
+
+    def __init__(self, document, name, elevation):
+        super().__init__(document, name, None)
+        self.Elevation = elevation
+
+
+class ViewPlan(Element):
+
+    def __init__(self, document, name, level):
+        super().__init__(document, name, None)
+        self.GenLevel = level
+
+
+class WorksetId(ElementId):
+    pass
+
+
+class WorksetKind(Enum):
+    UserWorkset = 1
+    ViewWorkset = 4
+
+
+class Workset:
+
+    def __init__(self, workset_id, name, kind=WorksetKind.UserWorkset):
+        self.Id = workset_id
+        self.Name = name
+        self.Kind = kind
+
+
+class FamilySymbol(ElementType):
+
+    def __init__(self, document, name, category):
+        super().__init__(document, name, category)
+        self.add_parameter(BuiltInParameter.SYMBOL_NAME_PARAM, StorageType.String, name)
+
+
+class SpatialElement(Element):
+
+    def __init__(self, document, name, category, level_id, bbox_min, bbox_max):
+        center = XYZ((bbox_min.X + bbox_max.X) / 2, (bbox_min.Y + bbox_max.Y) / 2, bbox_min.Z)
+        super().__init__(document, name, category, level_id, LocationPoint(center))
+        self._bounding_box = BoundingBoxXYZ(bbox_min, bbox_max)
+        name_parameter = BuiltInParameter.SPACE_NAME_PARAM if category == BuiltInCategory.OST_MEPSpaces else BuiltInParameter.ROOM_NAME
+        self.add_parameter(name_parameter, StorageType.String, name)
+
+    def _contains(self, point):
+        bbox = self._bounding_box
+        return (bbox.Min.X <= point.X <= bbox.Max.X and bbox.Min.Y <= point.Y <= bbox.Max.Y
+                and bbox.Min.Z <= point.Z <= bbox.Max.Z)
+
+    def IsPointInSpace(self, point):
+        return self._contains(point)
+
+    def IsPointInRoom(self, point):
+        return self._contains(point)
+
+
+class FamilyInstance(Element):
+
+    def __init__(self, document, name, category, type_id, level_id=None, location=None, super_component=None, connector_values=None):
+        super().__init__(document, name, category, level_id, location)
+        self._type_id = type_id
+        self.SuperComponent = super_component
+        self.MEPModel = MEPModel([Connector(Domain.DomainElectrical, connector_values)], document) if connector_values is not None else None
+        self.Space = None
+        self.Room = None
+        self._sub_components = []
+        if super_component is not None:
+            super_component._sub_components.append(self.Id)
+
+    def GetTypeId(self):
+        return self._type_id
+
+    def GetSubComponentIds(self):
+        return list(self._sub_components)
+
+    def GetDependentElements(self, element_filter):
+        return list(self._sub_components)
+
+
+class ElectricalSystem(Element):
+    """
+    Circuito elétrico: painel, número do circuito e elementos conectados.
+    """
+    def __init__(self, document, panel_name, circuit_number, system_type=ElectricalSystemType.PowerCircuit):
+        super().__init__(document, circuit_number, BuiltInCategory.OST_ElectricalCircuit)
+        self.PanelName = panel_name
+        self.CircuitNumber = circuit_number
+        self.SystemType = system_type
+        self._members = []
+
+    @property
+    def Elements(self):
+        self.Document.api_calls["ElectricalSystem.Elements"] += 1
+        return list(self._members)
+
+    def connect(self, family_instance):
+        self._members.append(family_instance)
+        if family_instance.MEPModel is not None:
+            family_instance.MEPModel._electrical_systems.append(self)
+
+
+class ElementCategoryFilter:
+
+    def __init__(self, built_in_category):
+        self.built_in_category = built_in_category
+
+    def PassesFilter(self, element):
+        return element.Category == self.built_in_category
+
+
+class ElementClassFilter:
+
+    def __init__(self, element_class):
+        self.element_class = element_class
+
+    def PassesFilter(self, element):
+        return isinstance(element, self.element_class)
+
+
+class FamilyInstanceFilter:
+
+    def __init__(self, document, family_symbol_id):
+        self.family_symbol_id = family_symbol_id
+
+    def PassesFilter(self, element):
+        return isinstance(element, FamilyInstance) and element.GetTypeId() == self.family_symbol_id
+
+
+class ElementFilter:
+    pass
+
+
+class ElementLevelFilter:
+
+    def __init__(self, level_id):
+        self.level_id = level_id
+
+    def PassesFilter(self, element):
+        return element.LevelId == self.level_id
+
+
+class ElementWorksetFilter:
+
+    def __init__(self, workset_id):
+        self.workset_id = workset_id
+
+    def PassesFilter(self, element):
+        return element.WorksetId == self.workset_id
+
+
+class LogicalOrFilter:
+
+    def __init__(self, *filters):
+        self.filters = filters[0] if len(filters) == 1 else filters
+
+    def PassesFilter(self, element):
+        return any(element_filter.PassesFilter(element) for element_filter in self.filters)
+
+
+class LogicalAndFilter(LogicalOrFilter):
+
+    def PassesFilter(self, element):
+        return all(element_filter.PassesFilter(element) for element_filter in self.filters)
+
+
+class HasValueFilterRule:
+
+    def __init__(self, parameter_id):
+        self.built_in_parameter = BuiltInParameter(parameter_id.Value)
+
+    def ElementPasses(self, element):
+        parameter = element._parameters.get(self.built_in_parameter)
+        return parameter is not None and parameter.HasValue
+
+
+class FilterStringRule(HasValueFilterRule):
+
+    def __init__(self, parameter_id, value):
+        super().__init__(parameter_id)
+        self.value = value
+
+    def ElementPasses(self, element):
+        parameter = element._parameters.get(self.built_in_parameter)
+        return parameter is not None and parameter.AsString() == self.value
+
+
+class ParameterFilterRuleFactory:
+
+    @staticmethod
+    def CreateHasValueParameterRule(parameter_id):
+        return HasValueFilterRule(parameter_id)
+
+    @staticmethod
+    def CreateEqualsRule(parameter_id, value):
+        return FilterStringRule(parameter_id, value)
+
+
+class ElementParameterFilter:
+
+    def __init__(self, rule):
+        self.rule = rule
+
+    def PassesFilter(self, element):
+        return self.rule.ElementPasses(element)
+
+
+class FilteredElementCollector:
+
+    def __init__(self, document, *args):
+        self._document = document
+        self._elements = document._elements
+        document.api_calls["FilteredElementCollector"] += 1
+        if args and isinstance(args[0], ElementId):
+            view = document.GetElement(args[0])
+            self._elements = [element for element in self._elements if element.LevelId == view.GenLevel.Id]
+        elif args:
+            if not args[0]:
+                raise ValueError("The input element id collection is empty.")
+            self._elements = [document._by_id[element_id.Value] for element_id in args[0]]
+
+    def _filtered(self, predicate):
+        collector = FilteredElementCollector.__new__(FilteredElementCollector)
+        collector._document = self._document
+        collector._elements = [element for element in self._elements if predicate(element)]
+        return collector
+
+    def OfCategory(self, built_in_category):
+        return self._filtered(lambda element: element.Category == built_in_category)
+
+    def OfClass(self, element_class):
+        return self._filtered(lambda element: isinstance(element, element_class))
+
+    def WhereElementIsNotElementType(self):
+        return self._filtered(lambda element: not isinstance(element, ElementType))
+
+    def WhereElementIsElementType(self):
+        return self._filtered(lambda element: isinstance(element, ElementType))
+
+    def WherePasses(self, element_filter):
+        return self._filtered(element_filter.PassesFilter)
+
+    def ToElements(self):
+        self._document.api_calls["ElementsReturned"] += len(self._elements)
+        return list(self._elements)
+
+    def ToElementIds(self):
+        return [element.Id for element in self._elements]
+
+    def GetElementCount(self):
+        return len(self._elements)
+
+    def __iter__(self):
+        for element in list(self._elements):
+            self._document.api_calls["ElementsReturned"] += 1
+            yield element
+
+
+class FailureSeverity(Enum):
+    NoFailure = 0
+    Warning = 1
+    Error = 2
+    DocumentCorruption = 3
+
+
+class FailureProcessingResult(Enum):
+    Continue = 0
+    ProceedWithCommit = 1
+    ProceedWithRollBack = 2
+    WaitForUserInput = 3
+
+
+class TransactionStatus(Enum):
+    Uninitialized = 0
+    Started = 1
+    RolledBack = 2
+    Committed = 3
+    Pending = 4
+    Error = 5
+    Proceed = 6
+
+
+class IFailuresPreprocessor:
+
+    def PreprocessFailures(self, failures_accessor):
+        raise NotImplementedError
+
+
+class FailureHandlingOptions:
+
+    def __init__(self):
+        self.failures_preprocessor = None
+        self.clear_after_rollback = False
+
+    def SetFailuresPreprocessor(self, failures_preprocessor):
+        self.failures_preprocessor = failures_preprocessor
+        return self
+
+    def SetClearAfterRollback(self, clear_after_rollback):
+        self.clear_after_rollback = clear_after_rollback
+        return self
+
+
+class Transaction:
+
+    def __init__(self, document, name):
+        self._document = document
+        self.name = name
+        self._failure_handling_options = FailureHandlingOptions()
+
+    def GetFailureHandlingOptions(self):
+        return self._failure_handling_options
+
+    def SetFailureHandlingOptions(self, options):
+        self._failure_handling_options = options
+
+    def Start(self):
+        if self._document.active_transaction is not None:
+            raise RuntimeError("Starting a new transaction is not permitted while another transaction is open.")
+        self._document.active_transaction = self
+        self._document.api_calls["Transaction"] += 1
+
+    def Commit(self):
+        """
+        Com document.failing_commits > 0, a transação é desfeita como por um
+        erro não resolvido e retorna TransactionStatus.RolledBack.
+        """
+        self._document.active_transaction = None
+        if self._document.failing_commits:
+            self._document.failing_commits -= 1
+            self._document._changes = {"added": [], "modified": [], "deleted": []}
+            return TransactionStatus.RolledBack
+        self._document._raise_document_changed()
+        return TransactionStatus.Committed
+
+    def RollBack(self):
+        self._document.active_transaction = None
+        self._document._changes = {"added": [], "modified": [], "deleted": []}
+        return TransactionStatus.RolledBack
+
+    def HasStarted(self):
+        return self._document.active_transaction is self
+
+
+class TransactionGroup:
+    """
+    Os grupos iniciados ficam em document.transaction_groups, com o status final.
+    """
+    def __init__(self, document, name):
+        self._document = document
+        self.name = name
+        self.status = TransactionStatus.Uninitialized
+
+    def Start(self):
+        self.status = TransactionStatus.Started
+        self._document.transaction_groups.append(self)
+        return self.status
+
+    def HasStarted(self):
+        return self.status == TransactionStatus.Started
+
+    def Assimilate(self):
+        self.status = TransactionStatus.Committed
+        return self.status
+
+    def RollBack(self):
+        self.status = TransactionStatus.RolledBack
+        return self.status
+
+
+class FilteredWorksetCollector:
+
+    def __init__(self, document):
+        self._worksets = list(document._worksets)
+
+    def OfKind(self, workset_kind):
+        self._worksets = [workset for workset in self._worksets if workset.Kind == workset_kind]
+        return self
+
+    def ToWorksets(self):
+        return list(self._worksets)
+
+    def __iter__(self):
+        return iter(list(self._worksets))
+
+
+class ModelPathUtils:
+
+    @staticmethod
+    def ConvertModelPathToUserVisiblePath(model_path):
+        return model_path
+
+
+class Document:
+
+    def __init__(self, path_name, title="Synthetic"):
+        self.PathName = path_name
+        self.Title = title
+        self.IsWorkshared = False
+        self.ActiveView = None
+        self.active_transaction = None
+        self.transaction_groups = []
+        self.failing_commits = 0
+        self.api_calls = _CallCounter()
+        self._elements = []
+        self._by_id = {}
+        self._next_id = 100000
+        self._worksets = []
+        self._level_worksets = {}
+        self.Application = None
+        self._changes = {"added": [], "modified": [], "deleted": []}
+
+    def _add(self, element):
+        element_id = ElementId(self._next_id)
+        self._next_id += 1
+        self._elements.append(element)
+        self._by_id[element_id.Value] = element
+        self._record_change("added", element_id)
+        return element_id
+
+    def _record_change(self, kind, element_id):
+        """
+        Registra a alteração feita dentro de uma transação, notificada em DocumentChanged no Commit.
+        """
+        if self.active_transaction is not None:
+            self._changes[kind].append(element_id)
+
+    def _raise_document_changed(self):
+        changes, self._changes = self._changes, {"added": [], "modified": [], "deleted": []}
+        if self.Application is None or not any(changes.values()):
+            return
+        self.Application.DocumentChanged.fire(self.Application, DocumentChangedEventArgs(self, **changes))
+
+    def Delete(self, element_id):
+        """
+        Remove o elemento e os seus sub-componentes.
+        Returns:
+            List[ElementId] removidos.
+        """
+        if self.active_transaction is None:
+            raise RuntimeError("Modification of the document is forbidden outside of a transaction.")
+        element = self._by_id.pop(element_id.Value, None)
+        if element is None:
+            return []
+
+        deleted_ids = [element_id]
+        for sub_component_id in list(getattr(element, "_sub_components", [])):
+            deleted_ids.extend(self.Delete(sub_component_id))
+        super_component = getattr(element, "SuperComponent", None)
+        if super_component is not None and element_id in super_component._sub_components:
+            super_component._sub_components.remove(element_id)
+        self._elements.remove(element)
+        mep_model = getattr(element, "MEPModel", None)
+        if mep_model is not None:
+            for electrical_system in mep_model._electrical_systems:
+                electrical_system._members.remove(element)
+        self._record_change("deleted", element_id)
+        return deleted_ids
+
+    def Equals(self, other):
+        return self is other
+
+    def GetElement(self, element_id):
+        self.api_calls["GetElement"] += 1
+        return self._by_id.get(element_id.Value)
+
+    def GetWorksharingCentralModelPath(self):
+        return self.PathName
+
+    def _spatial_at_point(self, category, point):
+        for element in self._elements:
+            if element.Category == category and element._contains(point):
+                return element
+        return None
+
+    def GetSpaceAtPoint(self, point):
+        self.api_calls["GetSpaceAtPoint"] += 1
+        return self._spatial_at_point(BuiltInCategory.OST_MEPSpaces, point)
+
+    def GetRoomAtPoint(self, point):
+        self.api_calls["GetRoomAtPoint"] += 1
+        return self._spatial_at_point(BuiltInCategory.OST_Rooms, point)
+
+    def Close(self, save_modified=True):
+        return True
+
+
+class _Event:
+    """
+    Evento .NET: handlers acrescentados com += e removidos com -=.
+    """
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self._handlers.remove(handler)
+        return self
+
+    def fire(self, sender, args=None):
+        for handler in list(self._handlers):
+            handler(sender, args)
+
+
+class DocumentChangedEventArgs:
+
+    def __init__(self, document, added, modified, deleted):
+        self._document = document
+        self._added = added
+        self._modified = modified
+        self._deleted = deleted
+
+    def GetDocument(self):
+        return self._document
+
+    def _filtered(self, element_ids, element_filter):
+        if element_filter is None:
+            return list(element_ids)
+        return [element_id for element_id in element_ids if element_filter.PassesFilter(self._document._by_id[element_id.Value])]
+
+    def GetAddedElementIds(self, element_filter=None):
+        return self._filtered([element_id for element_id in self._added if element_id.Value in self._document._by_id], element_filter)
+
+    def GetModifiedElementIds(self, element_filter=None):
+        return self._filtered([element_id for element_id in self._modified if element_id.Value in self._document._by_id], element_filter)
+
+    def GetDeletedElementIds(self):
+        return list(self._deleted)
+
+
+class Application:
+    """
+    Autodesk.Revit.ApplicationServices.Application: OpenDocumentFile retorna
+    os modelos sintéticos gerados com generate_model pelo PathName e
+    DocumentChanged é disparado no Commit de cada transação com alterações.
+    """
+    def __init__(self):
+        self.DocumentChanged = _Event()
+
+    def OpenDocumentFile(self, path_name):
+        document = _DOCUMENTS_BY_PATH.get(path_name)
+        if document is None:
+            raise OSError(f"Modelo não encontrado: {path_name}")
+        return document
+
+
+_DOCUMENTS_BY_PATH = {}
+
+
+class Selection:
+
+    def __init__(self):
+        self._element_ids = []
+
+    def GetElementIds(self):
+        return list(self._element_ids)
+
+    def SetElementIds(self, element_ids):
+        self._element_ids = list(element_ids)
+
+
+class UIDocument:
+
+    def __init__(self, document):
+        self.Document = document
+        self.Selection = Selection()
+
+
+class _GenericList(list):
+    """
+    System.Collections.Generic.List[T](iterable).
+    """
+    def __class_getitem__(cls, item_type):
+        return cls
+
+
+class _CallCounter(dict):
+
+    def __missing__(self, key):
+        return 0
+
+
+class _DocumentManager:
+
+    Instance = None
+
+    def __init__(self):
+        self.CurrentDBDocument = None
+        self.CurrentUIApplication = None
+
+
+_DocumentManager.Instance = _DocumentManager()
+
+#===================================================================================================================
+#==========================         INSTALL          ===============================================================
+#===================================================================================================================
+
+API_NAMES = [
+    "BuiltInCategory", "BuiltInParameter", "Domain", "StorageType", "UnitTypeId", "UnitUtils", "ElementId",
+    "XYZ", "BoundingBoxXYZ", "Location", "LocationPoint", "Parameter", "Element", "ElementType", "FamilySymbol",
+    "FamilyInstance", "Level", "ViewPlan", "WorksetId", "WorksetKind", "Workset", "ElementFilter", "ElementClassFilter",
+    "FamilyInstanceFilter", "ElementCategoryFilter", "ElementLevelFilter", "ElementWorksetFilter", "LogicalOrFilter", "LogicalAndFilter",
+    "ParameterFilterRuleFactory", "ElementParameterFilter", "FilteredElementCollector", "FilteredWorksetCollector", "FailureSeverity", "FailureProcessingResult",
+    "IFailuresPreprocessor", "FailureHandlingOptions", "Transaction", "TransactionStatus", "TransactionGroup", "ModelPathUtils",
+    "Document",
+]
+ELECTRICAL_API_NAMES = ["ElectricalSystem", "ElectricalSystemType"]
+
+
+def install():
+    """
+    Registra os módulos clr, Revit, RevitServices e Autodesk.Revit.DB/UI em
+    sys.modules. Deve ser chamado antes de importar beyond_revit_automation.
+    """
+    clr = types.ModuleType("clr")
+    clr.AddReference = lambda name: None
+    clr.ImportExtensions = lambda module: None
+
+    revit = types.ModuleType("Revit")
+    revit_elements = types.ModuleType("Revit.Elements")
+    revit.Elements = revit_elements
+
+    revit_services = types.ModuleType("RevitServices")
+    persistence = types.ModuleType("RevitServices.Persistence")
+    persistence.DocumentManager = _DocumentManager
+    transactions = types.ModuleType("RevitServices.Transactions")
+    transactions.TransactionManager = types.SimpleNamespace(Instance=None)
+    revit_services.Persistence = persistence
+    revit_services.Transactions = transactions
+
+    system = types.ModuleType("System")
+    system_collections = types.ModuleType("System.Collections")
+    system_generic = types.ModuleType("System.Collections.Generic")
+    system_generic.List = _GenericList
+    system.Collections = system_collections
+    system_collections.Generic = system_generic
+
+    autodesk = types.ModuleType("Autodesk")
+    autodesk_revit = types.ModuleType("Autodesk.Revit")
+    database = types.ModuleType("Autodesk.Revit.DB")
+    electrical = types.ModuleType("Autodesk.Revit.DB.Electrical")
+    user_interface = types.ModuleType("Autodesk.Revit.UI")
+    for name in API_NAMES:
+        setattr(database, name, globals()[name])
+    database.__all__ = list(API_NAMES)
+    for name in ELECTRICAL_API_NAMES:
+        setattr(electrical, name, globals()[name])
+    database.Electrical = electrical
+    user_interface.UIDocument = UIDocument
+    user_interface.Selection = Selection
+    user_interface.__all__ = ["UIDocument"]
+    autodesk.Revit = autodesk_revit
+    autodesk_revit.DB = database
+    autodesk_revit.UI = user_interface
+
+    sys.modules.update({
+        "clr": clr,
+        "Revit": revit,
+        "Revit.Elements": revit_elements,
+        "RevitServices": revit_services,
+        "RevitServices.Persistence": persistence,
+        "RevitServices.Transactions": transactions,
+        "Autodesk": autodesk,
+        "Autodesk.Revit": autodesk_revit,
+        "Autodesk.Revit.DB": database,
+        "Autodesk.Revit.DB.Electrical": electrical,
+        "Autodesk.Revit.UI": user_interface,
+        "System": system,
+        "System.Collections": system_collections,
+        "System.Collections.Generic": system_generic,
+    })
+
+#===================================================================================================================
+#==========================         GENERATOR          =============================================================
+#===================================================================================================================
+
+BEYOND_TYPE_NAMES = ("ONE.Black", "ONE.White", "POWER.Black", "POWER.White")
+OTHER_ELECTRICAL_TYPE_NAMES = ("Beyond.Base", "Saída 1", "Saída 2", "Saída 3", "Tomada 2P+T")
+LIGHTING_TYPE_NAME = "Luminária LED"
+
+BEYOND_PARAMETERS = (
+    ("Beyond.LocalDeInstalação", StorageType.String),
+    ("Beyond.IDObjeto", StorageType.String),
+    ("Beyond.IDComandos", StorageType.String),
+    ("Beyond.NúmeroDoCircuito", StorageType.String),
+    ("Beyond.PainelDistribuição", StorageType.String),
+    ("Beyond.Voltagem", StorageType.Double),
+    ("Beyond.NúmeroDePolos", StorageType.Integer),
+    ("Beyond.Iluminação.PotênciaAparente.Saída1", StorageType.Double),
+    ("Beyond.Iluminação.PotênciaAparente.Saída2", StorageType.Double),
+    ("Beyond.Iluminação.PotênciaAparente.Saída3", StorageType.Double),
+)
+
+FAULTS = ("panel_divergence", "circuit_divergence", "missing_switch_id", "overload", "null_dock_load", "outside_space", "missing_connector")
+
+
+def _add_electrical_parameters(element, panel, circuit_number, switch_id=None):
+    element.add_parameter(BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM, StorageType.String, panel)
+    element.add_parameter(BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER, StorageType.String, circuit_number)
+    element.add_parameter(BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM, StorageType.String, switch_id)
+
+
+def _connector_values(apparent_load_va, voltage=220.0, number_of_poles=1):
+    return {
+        BuiltInParameter.RBS_ELEC_APPARENT_LOAD.value: apparent_load_va * INTERNAL_UNITS_PER_WATT,
+        BuiltInParameter.RBS_ELEC_VOLTAGE.value: voltage * INTERNAL_UNITS_PER_VOLT,
+        BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES.value: number_of_poles,
+    }
+
+
+def generate_model(devices=100, fixtures=None, panels=4, circuits_per_panel=12, levels=3, rooms_per_level=20,
+                   faulty_fraction=0.1, space_property_fraction=0.5, unrelated_fixture_fraction=0.2,
+                   path_name="/tmp/beyond_synthetic/model.rvt", seed=0, workshared=False):
+    """
+    Gera um documento sintético com dispositivos Beyond (Base + 3 Saídas),
+    luminárias, Espaços e Ambientes.
+    Args:
+        devices: quantidade de dispositivos Beyond;
+        fixtures: quantidade de luminárias (padrão: 5 por dispositivo);
+        panels, circuits_per_panel: quantidade de painéis e de circuitos por painel;
+        levels, rooms_per_level: grade de Espaços/Ambientes por nível;
+        faulty_fraction: fração dos dispositivos com algum defeito de FAULTS;
+        space_property_fraction: fração dos dispositivos cujo FamilyInstance.Space/Room é preenchido;
+        unrelated_fixture_fraction: fração das luminárias em comandos sem dispositivo Beyond, metade delas sem ID de comando;
+        path_name: caminho do .rvt fictício (o log e os arquivos auxiliares são gravados no seu diretório);
+        seed: semente do gerador aleatório;
+        workshared: cria um workset por nível ('Pavimento n').
+    Returns:
+        Document
+    """
+    generator = random.Random(seed)
+    fixtures = devices * 5 if fixtures is None else fixtures
+    document = Document(path_name)
+
+    level_ids = []
+    for level_number in range(levels):
+        level = Level(document, f"Nível {level_number + 1}", level_number * 12.0)
+        view = ViewPlan(document, f"Planta - {level.Name}", level)
+        document.ActiveView = document.ActiveView or view
+        level_ids.append(level.Id)
+        if workshared:
+            workset = Workset(WorksetId(level_number + 1), f"Pavimento {level_number + 1}")
+            document._worksets.append(workset)
+            document._level_worksets[level.Id.Value] = workset.Id
+    document.IsWorkshared = workshared
+    room_size = 30.0
+    rooms_per_row = max(1, int(rooms_per_level ** 0.5))
+    rooms = []
+    for level_number, level_id in enumerate(level_ids):
+        elevation = level_number * 12.0
+        for room_number in range(rooms_per_level):
+            x = (room_number % rooms_per_row) * room_size
+            y = (room_number // rooms_per_row) * room_size
+            bbox_min, bbox_max = XYZ(x, y, elevation), XYZ(x + room_size, y + room_size, elevation + 10.0)
+            space = SpatialElement(document, f"Espaço {level_number + 1}.{room_number + 1}", BuiltInCategory.OST_MEPSpaces, level_id, bbox_min, bbox_max)
+            room = SpatialElement(document, f"Ambiente {level_number + 1}.{room_number + 1}", BuiltInCategory.OST_Rooms, level_id, bbox_min, bbox_max)
+            rooms.append((level_id, space, room, bbox_min))
+
+    type_ids = {name: FamilySymbol(document, name, BuiltInCategory.OST_ElectricalFixtures).Id for name in BEYOND_TYPE_NAMES + OTHER_ELECTRICAL_TYPE_NAMES}
+    type_ids[LIGHTING_TYPE_NAME] = FamilySymbol(document, LIGHTING_TYPE_NAME, BuiltInCategory.OST_LightingFixtures).Id
+    shared_guids = {name: uuid.uuid5(uuid.NAMESPACE_URL, name) for name, _ in BEYOND_PARAMETERS}
+    channel_keys = []
+    circuit_members = {}
+
+    for device_number in range(devices):
+        fault = generator.choice(FAULTS) if generator.random() < faulty_fraction else None
+        level_id, space, room, origin = generator.choice(rooms)
+        point = XYZ(origin.X + generator.uniform(1, 29), origin.Y + generator.uniform(1, 29), origin.Z + 1.0)
+        if fault == "outside_space":
+            point = XYZ(-1000.0 - device_number, -1000.0, origin.Z + 1.0)
+
+        panel = f"QD-{generator.randrange(panels) + 1}"
+        circuit_number = str(generator.randrange(circuits_per_panel) + 1)
+        type_name = generator.choice(BEYOND_TYPE_NAMES)
+
+        device = FamilyInstance(document, type_name, BuiltInCategory.OST_ElectricalFixtures, type_ids[type_name], level_id, LocationPoint(point))
+        if generator.random() < space_property_fraction and fault != "outside_space":
+            device.Space, device.Room = space, room
+        for name, storage_type in BEYOND_PARAMETERS:
+            device.add_parameter(name, storage_type, None, shared_guids[name])
+
+        dock_station_load = 0.0 if fault == "null_dock_load" else 30.0
+        dock_station = FamilyInstance(document, "Beyond.Base", BuiltInCategory.OST_ElectricalFixtures, type_ids["Beyond.Base"], level_id,
+                                      LocationPoint(point), device, None if fault == "missing_connector" else _connector_values(dock_station_load))
+        _add_electrical_parameters(dock_station, panel, circuit_number)
+        circuit_members.setdefault((panel, circuit_number), []).append(dock_station)
+
+        for channel_number in (3, 1, 2):
+            channel_panel = "QD-X" if fault == "panel_divergence" and channel_number == 2 else panel
+            channel_circuit = "99" if fault == "circuit_divergence" and channel_number == 2 else circuit_number
+            switch_id = None if fault == "missing_switch_id" and channel_number == 1 else f"{chr(96 + channel_number)}{device_number}"
+            channel = FamilyInstance(document, f"Saída {channel_number}", BuiltInCategory.OST_ElectricalFixtures, type_ids[f"Saída {channel_number}"],
+                                     level_id, LocationPoint(point), device, _connector_values(0.0))
+            _add_electrical_parameters(channel, channel_panel, channel_circuit, switch_id)
+            circuit_members.setdefault((channel_panel, channel_circuit), []).append(channel)
+            if switch_id is not None:
+                channel_keys.append((channel_panel, channel_circuit, switch_id, fault == "overload" and channel_number == 3))
+
+        FamilyInstance(document, "Tomada 2P+T", BuiltInCategory.OST_ElectricalFixtures, type_ids["Tomada 2P+T"], level_id, LocationPoint(point),
+                       connector_values=_connector_values(100.0))
+
+    for fixture_number in range(fixtures):
+        if channel_keys and generator.random() >= unrelated_fixture_fraction:
+            panel, circuit_number, switch_id, overload = generator.choice(channel_keys)
+            apparent_load = 60.0 if overload else generator.choice((5.0, 10.0, 15.0))
+        else:
+            panel = f"QD-{generator.randrange(panels) + 1}"
+            circuit_number = str(circuits_per_panel + generator.randrange(circuits_per_panel) + 1)
+            switch_id = f"z{fixture_number % 500}" if generator.random() < 0.5 else None
+            apparent_load = generator.choice((5.0, 10.0, 15.0))
+
+        level_id, _, _, origin = generator.choice(rooms)
+        fixture = FamilyInstance(document, LIGHTING_TYPE_NAME, BuiltInCategory.OST_LightingFixtures, type_ids[LIGHTING_TYPE_NAME], level_id,
+                                 LocationPoint(XYZ(origin.X + 5, origin.Y + 5, origin.Z + 9)), connector_values=_connector_values(apparent_load))
+        _add_electrical_parameters(fixture, panel, circuit_number, switch_id)
+        circuit_members.setdefault((panel, circuit_number), []).append(fixture)
+
+    for (panel, circuit_number), members in circuit_members.items():
+        electrical_system = ElectricalSystem(document, panel, circuit_number)
+        for member in members:
+            electrical_system.connect(member)
+
+    _DOCUMENTS_BY_PATH[path_name] = document
+    document.Application = Application()
+    _DocumentManager.Instance.CurrentDBDocument = document
+    _DocumentManager.Instance.CurrentUIApplication = types.SimpleNamespace(
+        ActiveUIDocument=UIDocument(document), Application=document.Application, Idling=_Event()
+    )
+    return document
+
+#===================================================================================================================
+#==========================         EDITS          =================================================================
+#===================================================================================================================
+
+@contextlib.contextmanager
+def edit_model(document, name="Edição"):
+    """
+    Agrupa edições em uma transação; DocumentChanged é disparado ao final.
+    """
+    transaction = Transaction(document, name)
+    transaction.Start()
+    try:
+        yield document
+    except Exception:
+        transaction.RollBack()
+        raise
+    transaction.Commit()
+
+
+def set_apparent_load(element, apparent_load_va):
+    """
+    Altera a carga aparente (VA) do conector elétrico do elemento.
+    """
+    connector = element.MEPModel.ConnectorManager.Connectors._connectors[0]
+    connector.GetMEPConnectorInfo()._connector_values[BuiltInParameter.RBS_ELEC_APPARENT_LOAD.value] = apparent_load_va * INTERNAL_UNITS_PER_WATT
+    element.Document._record_change("modified", element.Id)
+
+
+def move_element(element, point):
+    element.Location = LocationPoint(point)
+    element.Document._record_change("modified", element.Id)
+
+
+def add_lighting_fixture(document, panel, circuit_number, switch_id, apparent_load_va, level_id=None, point=None):
+    """
+    Inclui uma luminária conectada ao circuito (panel, circuit_number), caso ele exista.
+    Returns:
+        FamilyInstance
+    """
+    fixture_type = next(element for element in document._elements if isinstance(element, FamilySymbol) and element.Name == LIGHTING_TYPE_NAME)
+    fixture = FamilyInstance(document, LIGHTING_TYPE_NAME, BuiltInCategory.OST_LightingFixtures, fixture_type.Id, level_id,
+                             LocationPoint(point or XYZ()), connector_values=_connector_values(apparent_load_va))
+    _add_electrical_parameters(fixture, panel, circuit_number, switch_id)
+    for element in document._elements:
+        if isinstance(element, ElectricalSystem) and (element.PanelName, element.CircuitNumber) == (panel, circuit_number):
+            element.connect(fixture)
+            break
+    return fixture
@@ -36,27 +36,62 @@ __url__ = "https://tecnika.vercel.app/estudo-de-caso-beyond.html"
 #==========================         IMPORTS          ===============================================================
 #===================================================================================================================
 
-import clr
+import argparse
+import bisect
+import concurrent.futures
+import csv
+import hashlib
+import json
+import math
+import mmap
 import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import defaultdict, namedtuple
+from contextlib import closing, contextmanager
 from abc import ABC, abstractmethod
 from datetime import datetime
+from types import CodeType
 
-clr.AddReference("RevitNodes")
-import Revit
-import Revit.Elements
-clr.ImportExtensions(Revit.Elements)
+try:
+    import numpy as np
+except ImportError:
+    # Dependência opcional: sem NumPy, a validação de cargas é feita objeto a objeto.
+    np = None
 
-clr.AddReference("RevitServices")
-import RevitServices
-from RevitServices.Persistence import DocumentManager 
-from RevitServices.Transactions import TransactionManager 
+try:
+    import clr
 
-clr.AddReference("RevitAPI")
-clr.AddReference("RevitAPIUI")
+    clr.AddReference("RevitNodes")
+    import Revit
+    import Revit.Elements
+    clr.ImportExtensions(Revit.Elements)
 
-import Autodesk 
-from Autodesk.Revit.DB import *
-from Autodesk.Revit.UI import *
+    clr.AddReference("RevitServices")
+    import RevitServices
+    from RevitServices.Persistence import DocumentManager 
+    from RevitServices.Transactions import TransactionManager 
+
+    clr.AddReference("RevitAPI")
+    clr.AddReference("RevitAPIUI")
+
+    import Autodesk 
+    from Autodesk.Revit.DB import *
+    from Autodesk.Revit.DB.Electrical import ElectricalSystemType
+    from Autodesk.Revit.UI import *
+    from System.Collections.Generic import List
+
+    REVIT_AVAILABLE = True
+
+except ImportError:
+    # Execução fora do Revit (CPython): apenas a validação offline de snapshots está disponível.
+    REVIT_AVAILABLE = False
 
 #===================================================================================================================
 #==========================         INTERFACES          ============================================================
@@ -79,6 +114,10 @@ class ElectricalDataAcessor(ABC):
     def get_family_parameter_value(self, parameter_key):
         pass
 
+    @abstractmethod
+    def has_electrical_connector(self):
+        pass
+
     @abstractmethod
     def convert_to_volts(self, internal_value):
         pass
@@ -87,21 +126,151 @@ class ElectricalDataAcessor(ABC):
     def convert_to_watts(self, internal_value):
         pass
 
+class SnapshotReader(ABC):
+    """
+    Leitura dos dados extraídos do modelo, independente do formato do snapshot.
+    """
+    @abstractmethod
+    def iter_fixtures(self):
+        """
+        Yields:
+            (element_id, ElectricalDataAcessor) de cada luminária.
+        """
+        pass
+
+    @abstractmethod
+    def iter_devices(self):
+        """
+        Yields:
+            (element_id, name, space_or_room, dock_station, output_channels) de cada
+            dispositivo, onde dock_station e cada Saída são (element_id, name, ElectricalDataAcessor).
+        """
+        pass
+
+class ReportSink(ABC):
+    """
+    Destino do relatório da verificação, alimentado dispositivo a dispositivo.
+    """
+    @abstractmethod
+    def write_device(self, device):
+        """
+        Args:
+            device: BeyondDevice já verificado.
+        """
+        pass
+
+    def write_project_issues(self, project_issues):
+        """
+        Recebe as issues entre dispositivos, que não pertencem a um único
+        dispositivo. Os relatórios que não as gravam mantêm esta implementação.
+        Args:
+            project_issues: List[ProjectIssue] de SwitchIdConsistencyCheck.check.
+        """
+        pass
+
+    @abstractmethod
+    def close(self, summary=None):
+        """
+        Finaliza o relatório.
+        Args:
+            summary: resumo da execução (Logger.summary_message) ou None.
+        """
+        pass
+
+class ModelChangeSource(ABC):
+    """
+    Origem das notificações de alteração do modelo, consumidas pela verificação contínua.
+    """
+    @abstractmethod
+    def subscribe(self, on_change, on_idle=None):
+        """
+        Args:
+            on_change: chamada com um ModelChange a cada conjunto de alterações;
+            on_idle: chamada nos momentos ociosos, em que as alterações acumuladas podem ser verificadas.
+        """
+        pass
+
+    @abstractmethod
+    def unsubscribe(self):
+        pass
+
 #===================================================================================================================
 #==========================         INFRASTRUCTURE          ========================================================
 #===================================================================================================================
 
+ElectricalRecord = namedtuple(
+    "ElectricalRecord",
+    ("panel", "circuit_number", "switch_id", "voltage", "number_of_poles", "apparent_load", "has_connector"),
+)
+
+if REVIT_AVAILABLE:
+    # Mapas de parâmetros lidos por ElectricalData, construídos uma única vez.
+    FAMILY_PARAMETERS = (
+        ("panel"          , BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM),
+        ("circuit_number" , BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER),
+        ("switch_id"      , BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM),
+    )
+    CONNECTOR_PARAMETERS = (
+        ("voltage"         , ElementId(BuiltInParameter.RBS_ELEC_VOLTAGE)),
+        ("number_of_poles" , ElementId(BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES)),
+        ("apparent_load"   , ElementId(BuiltInParameter.RBS_ELEC_APPARENT_LOAD)),
+    )
+
+
 class ElectricalData(ElectricalDataAcessor):
     """
-    Relacionada a obtenção de parâmetros ElectricDomain no modelo Revit
+    Relacionada a obtenção de parâmetros ElectricDomain no modelo Revit.
+    Os parâmetros de família e do conector elétrico são lidos em uma única
+    passagem na criação e mantidos em um ElectricalRecord imutável.
     """
-    def __init__(self, family_instance):
+    FIXTURE_KEYS = ("panel", "circuit_number", "switch_id", "apparent_load")
+    CIRCUIT_FIXTURE_KEYS = ("switch_id", "apparent_load")
+    DOCK_STATION_KEYS = ("panel", "circuit_number", "voltage", "number_of_poles", "apparent_load")
+    OUTPUT_CHANNEL_KEYS = ("panel", "circuit_number", "switch_id")
+    CONNECTOR_KEYS = ("voltage", "number_of_poles", "apparent_load")
+    ALL_KEYS = OUTPUT_CHANNEL_KEYS + CONNECTOR_KEYS
+
+    def __init__(self, family_instance, parameter_keys=ALL_KEYS):
         """
         Define uma instância de ElectricalData para cada instância
         de BeyondDevice()
+        Args:
+            family_instance: FamilyInstance;
+            parameter_keys: chaves lidas do elemento (FIXTURE_KEYS, DOCK_STATION_KEYS ou
+            OUTPUT_CHANNEL_KEYS); o conector só é percorrido caso alguma chave de conector,
+            ou 'has_connector', seja pedida.
         """
         self.family_instance = family_instance
-        self.mep_connector_info = self._get_mep_connector_info()
+        self.mep_connector_info = None
+        self.record = self._read_parameters(parameter_keys)
+
+    def _read_parameters(self, parameter_keys):
+        """
+        Lê os parâmetros pedidos em uma única passagem.
+        Returns:
+            ElectricalRecord; chaves não lidas ficam None e has_connector é None
+            quando o conector não foi consultado.
+        """
+        values = dict.fromkeys(ElectricalRecord._fields)
+
+        for parameter_key, built_in_parameter in FAMILY_PARAMETERS:
+            if parameter_key not in parameter_keys: continue
+            PROFILER.count("get_Parameter")
+            parameter = self.family_instance.get_Parameter(built_in_parameter)
+            values[parameter_key] = (parameter.AsString() if parameter is not None else None) or "Nulo"
+
+        if "has_connector" in parameter_keys or any(parameter_key in parameter_keys for parameter_key in self.CONNECTOR_KEYS):
+            self.mep_connector_info = self._get_mep_connector_info()
+            values["has_connector"] = self.mep_connector_info is not None
+
+            if self.mep_connector_info is not None:
+                for parameter_key, parameter_id in CONNECTOR_PARAMETERS:
+                    if parameter_key not in parameter_keys: continue
+                    PROFILER.count("GetConnectorParameterValue")
+                    parameter_value = self.mep_connector_info.GetConnectorParameterValue(parameter_id)
+                    values[parameter_key] = (parameter_value.Value if parameter_value is not None else None) or None
+
+        return ElectricalRecord(**values)
     
     def _get_electrical_connector(self):
         """
@@ -119,6 +288,7 @@ class ElectricalData(ElectricalDataAcessor):
         connector_iterator = connector_set.ForwardIterator()
         
         while connector_iterator.MoveNext():
+            PROFILER.count("ConnectorIteration")
             connector = connector_iterator.Current
             
             if connector.Domain == Domain.DomainElectrical: 
@@ -145,19 +315,7 @@ class ElectricalData(ElectricalDataAcessor):
         Returns:
             O valor associado ao parâmetro ou None caso não houver.
         """
-        parameters_dic = {
-            "voltage"         : BuiltInParameter.RBS_ELEC_VOLTAGE,
-            "number_of_poles" : BuiltInParameter.RBS_ELEC_NUMBER_OF_POLES,
-            "apparent_load"   : BuiltInParameter.RBS_ELEC_APPARENT_LOAD
-        }
-        
-        built_in_parameter = parameters_dic.get(parameter_key)
-        parameter_value = self.mep_connector_info.GetConnectorParameterValue(ElementId(built_in_parameter)).Value
-        
-        if not parameter_value:
-            return None
-
-        return parameter_value
+        return getattr(self.record, parameter_key)
     
     def get_family_parameter_value(self, parameter_key):
         """
@@ -168,19 +326,14 @@ class ElectricalData(ElectricalDataAcessor):
         Returns:
             O valor associado ao parâmetro ou string 'Nulo' caso não houver.
         """
-        parameters_dic = {
-            "panel"          : BuiltInParameter.RBS_ELEC_CIRCUIT_PANEL_PARAM,
-            "circuit_number" : BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER,
-            "switch_id"      : BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM
-        }
-        
-        built_in_parameter = parameters_dic.get(parameter_key)
-        parameter_value = self.family_instance.get_Parameter(built_in_parameter).AsString()
-        
-        if not parameter_value or parameter_value == "":
-            return "Nulo"
-        
-        return parameter_value
+        return getattr(self.record, parameter_key) or "Nulo"
+
+    def has_electrical_connector(self):
+        """
+        Returns:
+            False caso a família não possua conector elétrico.
+        """
+        return self.record.has_connector is not False
 
     def convert_to_volts(self, internal_value):
         """
@@ -203,615 +356,5521 @@ class ElectricalData(ElectricalDataAcessor):
         """
         watts_value = UnitUtils.ConvertFromInternalUnits(internal_value, UnitTypeId.Watts)
         return round(watts_value, 0)
-    
 
-class BeyondParameterWriter():
+    @staticmethod
+    def unit_factors():
+        """
+        Fatores de conversão das unidades internas do Revit, gravados no
+        ModelSnapshot para a conversão na validação offline.
+        Returns:
+            {'volts': float, 'watts': float}
+        """
+        return {
+            "volts" : UnitUtils.ConvertFromInternalUnits(1.0, UnitTypeId.Volts),
+            "watts" : UnitUtils.ConvertFromInternalUnits(1.0, UnitTypeId.Watts)
+        }
+
+
+class UnitConverter:
     """
-    Responsável por escrever os valores nos parâmetros
-    de famílias da Beyond
+    Conversão das unidades internas do Revit para Volts e Watts com os fatores
+    de ElectricalData.unit_factors(), compartilhada por todos os dispositivos
+    de uma execução em vez de mantida em cada componente.
     """
-    def __init__(self, beyond_device):
-        self.beyond = beyond_device
+    __slots__ = ("unit_factors",)
 
-    def set_family_parameters(self):
+    def __init__(self, unit_factors):
         """
-        Escreve os valores obtidos em projeto nos parâmetros de cada
-        instância das famílias da Beyond.
+        Args:
+            unit_factors: {'volts': float, 'watts': float}
         """
-        
-        location = self.beyond.family_instance.LookupParameter("Beyond.LocalDeInstalação")
-        device_id = self.beyond.family_instance.LookupParameter("Beyond.IDObjeto")
-        switch_id = self.beyond.family_instance.LookupParameter("Beyond.IDComandos")
-        circuit_number = self.beyond.family_instance.LookupParameter("Beyond.NúmeroDoCircuito")
-        panel = self.beyond.family_instance.LookupParameter("Beyond.PainelDistribuição")
-        voltage = self.beyond.family_instance.LookupParameter("Beyond.Voltagem")
-        number_of_poles = self.beyond.family_instance.LookupParameter("Beyond.NúmeroDePolos")
-        apparent_load_channel_1 = self.beyond.family_instance.LookupParameter("Beyond.Iluminação.PotênciaAparente.Saída1")
-        apparent_load_channel_2 = self.beyond.family_instance.LookupParameter("Beyond.Iluminação.PotênciaAparente.Saída2")
-        apparent_load_channel_3 = self.beyond.family_instance.LookupParameter("Beyond.Iluminação.PotênciaAparente.Saída3")
-        
-        location.Set(self.beyond.space_or_room)
-        device_id.Set(self.beyond.device_id)
-        switch_id.Set(self.beyond.grouped_switch_id)
-        circuit_number.Set(self.beyond.circuit_number)
-        panel.Set(self.beyond.panel)
-        voltage.Set(self.beyond.voltage)
-        number_of_poles.Set(self.beyond.number_of_poles)
-        apparent_load_channel_1.Set(self.beyond.output_channel_1.apparent_load)
-        apparent_load_channel_2.Set(self.beyond.output_channel_2.apparent_load)
-        apparent_load_channel_3.Set(self.beyond.output_channel_3.apparent_load)
+        self.unit_factors = unit_factors
 
+    def convert_to_volts(self, internal_value):
+        return round(internal_value * self.unit_factors["volts"], 0)
 
-class Logger:
+    def convert_to_watts(self, internal_value):
+        return round(internal_value * self.unit_factors["watts"], 0)
+    
 
-    def __init__(self, doc, log_file_name):
+class VerificationScope:
+    """
+    Escopo da verificação: o documento inteiro, a seleção atual, os elementos
+    visíveis na vista ativa, um conjunto de níveis ou de worksets.
+    """
+    DOCUMENT = "document"
+    SELECTION = "selection"
+    ACTIVE_VIEW = "active_view"
+    LEVELS = "levels"
+    WORKSETS = "worksets"
+
+    def __init__(self, kind=DOCUMENT, uidoc=None, level_names=(), workset_names=()):
         """
-        Inicializa o logger.
-        O arquivo de log será salvo no mesmo diretório do documento do Revit.
         Args:
-            doc: instância atual do DocumentManager;
-            log_file_name (str): nome_do_arquivo.txt
+            kind: DOCUMENT || SELECTION || ACTIVE_VIEW || LEVELS || WORKSETS;
+            uidoc: UIDocument ativo, necessário para SELECTION;
+            level_names: nomes dos níveis, para LEVELS;
+            workset_names: nomes dos worksets, para WORKSETS.
         """
-        self.log_file_name = log_file_name
-        self.log_file_path = self._get_log_file_path(doc)
+        self.kind = kind or self.DOCUMENT
+        self.uidoc = uidoc
+        self.level_names = tuple(level_names)
+        self.workset_names = tuple(workset_names)
 
-    def _get_log_file_path(self, doc):
+    @property
+    def is_partial(self):
+        return self.kind != self.DOCUMENT
+
+    def description(self):
         """
-        Retorna o caminho do arquivo .rvt aberto na seção ativa do Revit
-        acrescido do nome do arquivo de log que será criado.
-        Args:
-            doc: instancia atual do DocumentManager;
         Returns:
-            caminho do arquivo de log: str
+            Descrição do escopo para o relatório de texto.
         """
-        if doc.IsWorkshared:
-            file_path = doc.GetWorksharingCentralModelPath()
-            file_path = ModelPathUtils.ConvertModelPathToUserVisiblePath(file_path)
-        else:
-            file_path = doc.PathName
-
-        document_directory = os.path.dirname(file_path)
-        log_file_path = os.path.join(document_directory, self.log_file_name)
-        
-        return log_file_path
+        descriptions = {
+            self.DOCUMENT    : "documento inteiro",
+            self.SELECTION   : "seleção atual",
+            self.ACTIVE_VIEW : "vista ativa",
+            self.LEVELS      : "nível(is) " + ", ".join(self.level_names),
+            self.WORKSETS    : "workset(s) " + ", ".join(self.workset_names),
+        }
+        return descriptions.get(self.kind, self.kind)
 
-    def write_to_log(self, message):
+    def collector(self, doc):
         """
-        Adiciona uma nova mensagem ao arquivo de texto do log.
-        Se o arquivo não existir, ele será criado.
-        Args:
-            message (string): mensagem de log.
+        Returns:
+            FilteredElementCollector restrito ao escopo ou None caso o escopo não possua elementos.
+        Raises:
+            ValueError: escopo desconhecido ou sem os dados necessários.
         """
-        timestamp = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        header = timestamp + " - Relatório das famílias Beyond instaladas no projeto"
-        log_message = f"{header}\n\n{message}\n\n"
+        if self.kind == self.DOCUMENT:
+            return FilteredElementCollector(doc)
+
+        if self.kind == self.SELECTION:
+            if self.uidoc is None:
+                raise ValueError("O escopo 'selection' requer o UIDocument ativo.")
+            selected_ids = self.uidoc.Selection.GetElementIds()
+            return FilteredElementCollector(doc, selected_ids) if len(selected_ids) else None
+
+        if self.kind == self.ACTIVE_VIEW:
+            return FilteredElementCollector(doc, doc.ActiveView.Id)
+
+        if self.kind == self.LEVELS:
+            levels = {level.Name: level.Id for level in FilteredElementCollector(doc).OfClass(Level).ToElements()}
+            element_filters = [ElementLevelFilter(levels[name]) for name in self._resolve(self.level_names, levels, "Nível(is)")]
+        elif self.kind == self.WORKSETS:
+            if not doc.IsWorkshared:
+                raise ValueError("O escopo 'worksets' requer um modelo com worksets.")
+            worksets = {workset.Name: workset.Id for workset in FilteredWorksetCollector(doc).OfKind(WorksetKind.UserWorkset)}
+            element_filters = [ElementWorksetFilter(worksets[name]) for name in self._resolve(self.workset_names, worksets, "Workset(s)")]
+        else:
+            raise ValueError(f"Escopo de verificação desconhecido: {self.kind}")
+
+        return FilteredElementCollector(doc).WherePasses(ModelCollector.any_of(element_filters))
 
-        with open(self.log_file_path, 'a') as logFile:
-            logFile.write(log_message)
-    
     @staticmethod
-    def log_message(beyond_devices):
+    def _resolve(names, available, label):
         """
-        Define a mensagem de log a ser escrita.
-        Args:
-            beyond_devices: Lista das instâncias de objetos
-            definidos por BeyondDevice().
+        Raises:
+            ValueError: caso algum nome não exista no modelo ou nenhum nome seja informado.
         """
-        if beyond_devices == None:
-            return "Não há famílias Beyond instaladas no projeto."
+        missing = [name for name in names if name not in available]
+        if missing or not names:
+            raise ValueError(f"{label} não encontrado(s) no modelo: " + (", ".join(missing) or "nenhum informado"))
+        return names
 
-        faulty_devices  = []
-        working_devices = []
-        
-        for device in beyond_devices:
-            log_issues = (" - " if device.issue_flag else "") + " / ".join(device.issues)
-            log_entry = f"{device.device_id} - Id {device.revit_element_id}"
-            (faulty_devices if device.issue_flag else working_devices).append(log_entry + log_issues)
-
-        return (
-            "Dispositivo(s) com instalação elétrica adequada:\n"
-            + "\n".join(working_devices) + "\n\n"
-            + "Dispositivo(s) com problemas de instalação elétrica no projeto:\n"
-            + "\n".join(faulty_devices)
-            )
-
-#===================================================================================================================
-#==========================         APPLICATION SERVICE        =====================================================
-#===================================================================================================================
 
-class LightingFixture:
+class ModelCollector:
     """
-    Classe relativa às luminárias presentes no Modelo.
+    Coletores do modelo com filtros nativos do Revit, avaliados antes de os
+    elementos atravessarem a fronteira .NET.
     """
-    def __init__(self, lighting_fixture, electrical_data: ElectricalDataAcessor):
+    @staticmethod
+    def any_of(element_filters):
         """
-        Define um objeto para cada luminária instalada no projeto.
-        Args:
-            lighting_fixture : ElementType= FamilyInstance, Category= Lighting Fixture;
-            electrical_data : Injeção do objeto que implementa ElectricalDataAcessor.
+        Returns:
+            LogicalOrFilter dos filtros informados, ou o próprio filtro caso seja apenas um.
         """
-        self.family_instance = lighting_fixture
-        self.electrical_data = electrical_data
-        self.panel = electrical_data.get_family_parameter_value("panel")
-        self.circuit_number = electrical_data.get_family_parameter_value("circuit_number")
-        self.switch_id = electrical_data.get_family_parameter_value("switch_id")                       
-        self.apparent_load = electrical_data.get_connector_parameter_value("apparent_load")
-
-
-class LightingService:
+        if len(element_filters) == 1:
+            return element_filters[0]
+        return LogicalOrFilter(List[ElementFilter](element_filters))
 
     @staticmethod
-    def sum_apparent_load_by_switch_id(lighting_objects_list):
+    def get_family_symbol_ids(doc, type_names):
         """
-        Calcula a carga aparente total para cada switch_id.
         Args:
-            lighting_objects_list: Lista de objetos de luminárias
+            type_names: nomes dos tipos de família procurados.
         Returns:
-            Uma lista de listas com os dados de cada interruptor [[panel, circuit_number, switch_id, apparent_load], [], ...[]]
+            List[ElementId] dos FamilySymbol de instalações elétricas com esses nomes.
         """
-        load_mapping = []
-        for lighting_fixture in lighting_objects_list:
-            
-            channel_key = [lighting_fixture.panel, lighting_fixture.circuit_number, lighting_fixture.switch_id]
-            apparent_load = lighting_fixture.apparent_load 
-            
-            if any(p == "Nulo" for p in channel_key) : continue
-
-            found = False
-            for properties in load_mapping:
-                if properties[0] == channel_key[0] and properties[1] == channel_key[1] and properties[2] == channel_key[2]:
-                    properties[3] += apparent_load
-                    found = True
-                    
-            if not found:
-                load_mapping.append([channel_key[0], channel_key[1], channel_key[2], apparent_load])
+        family_symbols = FilteredElementCollector(doc).OfClass(FamilySymbol).OfCategory(BuiltInCategory.OST_ElectricalFixtures).ToElements()
+        # SYMBOL_NAME_PARAM em vez de FamilySymbol.Name, que não é exposto pelo pythonnet em ElementType.
+        return [
+            family_symbol.Id for family_symbol in family_symbols
+            if family_symbol.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM).AsString() in type_names
+        ]
 
-        return load_mapping
+    @staticmethod
+    def _beyond_family_collector(doc, type_names, scope=None, element_ids=None):
+        """
+        Args:
+            element_ids: restringe a coleta a esses Ids, como os elementos alterados na verificação contínua.
+        Returns:
+            FilteredElementCollector das instâncias dos tipos Beyond no escopo, ou None.
+        """
+        if element_ids is not None:
+            collector = FilteredElementCollector(doc, List[ElementId](element_ids)) if element_ids else None
+        else:
+            collector = scope.collector(doc) if scope is not None else FilteredElementCollector(doc)
+        family_symbol_ids = ModelCollector.get_family_symbol_ids(doc, type_names)
+        if collector is None or not family_symbol_ids:
+            return None
 
-#===================================================================================================================
-#==========================         DOMAIN SERVICE           =======================================================
-#===================================================================================================================
+        family_filter = ModelCollector.any_of([FamilyInstanceFilter(doc, family_symbol_id) for family_symbol_id in family_symbol_ids])
+        return collector.OfCategory(BuiltInCategory.OST_ElectricalFixtures).WhereElementIsNotElementType().WherePasses(family_filter)
 
-class BeyondService:
+    @staticmethod
+    def get_beyond_families(doc, type_names, scope=None):
+        """
+        Coleta apenas as instâncias dos tipos Beyond, filtradas pelo Id do FamilySymbol.
+        Args:
+            type_names: nomes dos tipos de família Beyond (BEYOND_TYPE_NAMES);
+            scope: VerificationScope da execução ou None para o documento inteiro.
+        Returns:
+            List[FamilyInstance]
+        """
+        collector = ModelCollector._beyond_family_collector(doc, type_names, scope)
+        return collector.ToElements() if collector is not None else []
 
-    """
-    Contém a lógica de dados, comportamentos e validações para BeyondDevice.
-    """
-    def __init__(self, beyond_object):
+    @staticmethod
+    def get_beyond_family_ids(doc, type_names, scope=None, element_ids=None):
         """
-        Define um objeto Service para a instância de BeyondDevice
+        Variante de get_beyond_families para a execução em fluxo: apenas os Ids,
+        com os elementos obtidos sob demanda por iter_elements.
+        Returns:
+            List[ElementId]
         """
-        self.instance = beyond_object
+        collector = ModelCollector._beyond_family_collector(doc, type_names, scope, element_ids)
+        return collector.ToElementIds() if collector is not None else []
 
-    def set_issue_flag(self):
+    @staticmethod
+    def iter_elements(doc, element_ids):
         """
-        Atualiza a propriedade issue_flag.
+        Gera os elementos um a um, sem materializar a lista.
         """
-        if self.instance.issues: 
-            self.instance.issue_flag = True
-        return
-    
-    def check_device_panel(self):
+        for element_id in element_ids:
+            yield doc.GetElement(element_id)
+
+    @staticmethod
+    def get_device_numbers(doc, type_names):
         """
-        Compara todos os valores de painel atribuídos pelo projetista para um mesmo dispositivo 
-        (4 conectoers elétricos na família), caso haja divergência, mensagem indicativa 
-        é retornada para issues.
+        Numeração dos dispositivos no documento inteiro, para que uma verificação
+        com escopo atribua o mesmo device_id de uma verificação completa.
+        Returns:
+            {Id.Value: número do dispositivo}
         """
-        channels_panel = [self.instance.output_channel_1.panel, self.instance.output_channel_2.panel, self.instance.output_channel_3.panel]
-        dock_station_panel = self.instance.dock_station.panel  
-        
-        if any(panel != dock_station_panel for panel in channels_panel):   
-            self.instance.issues.append("Divergência no painel")
-            self.instance.panel = "Divergência no painel"
-            return
-        
-        if dock_station_panel == "Nulo":
-            self.instance.issues.append("Painel desconectado")
-            self.instance.panel = "Desconectado"
-            return
-        
-        self.instance.panel = self.instance.dock_station.panel
-        return
-    
-    def check_device_circuit(self):
+        collector = ModelCollector._beyond_family_collector(doc, type_names)
+        element_ids = collector.ToElementIds() if collector is not None else []
+        return {element_id.Value: number for number, element_id in enumerate(element_ids, start=1)}
+
+    @staticmethod
+    def get_channel_switch_ids(nested_family_index, beyond_families):
         """
-        Compara todos os circuitos atribuídos pelo projetista para um mesmo dispositivo
-        (4 conectoers elétricos na família), caso haja divergência, mensagem indicativa 
-        é retornada para issues.
+        Returns:
+            Set dos IDs de comando atribuídos às Saídas das famílias informadas.
+            Saídas sem o parâmetro são ignoradas e reportadas na verificação do dispositivo.
         """
-        channels_circuit = [self.instance.output_channel_1.circuit_number, self.instance.output_channel_2.circuit_number, self.instance.output_channel_3.circuit_number]
-        dock_station_circuit = self.instance.dock_station.circuit_number
-        
-        if any(circuit != dock_station_circuit for circuit in channels_circuit): 
-            self.instance.issues.append("Divergência no circuito")
-            self.instance.circuit_number = "Divergência no circuito"
-            return
-        
-        if dock_station_circuit == "Nulo":
-            self.instance.issues.append("Circuito desconectado")
-            self.instance.circuit_number = "Desconectado"
-            return
-        
-        self.instance.circuit_number = dock_station_circuit
-        return
-    
-    def check_output_channel_load(self, channel_number):
+        switch_ids = set()
+        for family_instance in beyond_families:
+            for output_channel in nested_family_index.get_nested_families(family_instance.Id.Value, NestedFamilyIndex.OUTPUT_CHANNEL):
+                parameter = output_channel.get_Parameter(BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM)
+                switch_id = parameter.AsString() if parameter is not None else None
+                if switch_id:
+                    switch_ids.add(switch_id)
+        return switch_ids
+
+    @staticmethod
+    def get_lighting_fixtures(doc, switch_ids=None):
         """
-        Verifica a carga aparente associada a cada canal de saída da beyond.
+        Coleta apenas as luminárias com ID de comando e número de circuito,
+        as únicas que podem carregar uma Saída Beyond.
         Args:
-            channel_number : 1 || 2 || 3.
+            switch_ids: restringe às luminárias com esses IDs de comando, em qualquer
+            nível ou vista, para somar a carga completa dos comandos de uma verificação com escopo.
+        Returns:
+            FilteredElementCollector, percorrido sob demanda, ou [] sem IDs de comando.
         """
-        channels = {
-            1: self.instance.output_channel_1,
-            2: self.instance.output_channel_2,
-            3: self.instance.output_channel_3
-        }
-        channel = channels.get(channel_number)
-        apparent_load = channel.electrical_data.convert_to_watts(channel.apparent_load)
-        switch_id = channel.switch_id
-        message = []
+        lighting_filter = ModelCollector._lighting_filter()
 
-        if switch_id == "Nulo":
-            message.append("ID não atribuído")
-
-        if switch_id != "Nulo" and apparent_load == 0:
-            message.append(f"ID({switch_id}) carga nula")
+        if switch_ids is not None:
+            if not switch_ids:
+                return []
+            switch_id_filters = [
+                ElementParameterFilter(ParameterFilterRuleFactory.CreateEqualsRule(ElementId(BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM), switch_id))
+                for switch_id in sorted(switch_ids)
+            ]
+            lighting_filter = LogicalAndFilter(lighting_filter, ModelCollector.any_of(switch_id_filters))
 
-        if apparent_load > 100:
-            message.append(f"ID({switch_id}) {apparent_load}VA")
+        return FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_LightingFixtures).WhereElementIsNotElementType().WherePasses(lighting_filter)
 
-        if message:
-            channel_name = str(channel)
-            message.insert(0, f"{channel_name}:")
-            self.instance.issues.append(" ".join(message))
+    @staticmethod
+    def _lighting_filter():
+        """
+        Returns:
+            Filtro das luminárias com ID de comando e número de circuito.
+        """
+        has_switch_id = ElementParameterFilter(ParameterFilterRuleFactory.CreateHasValueParameterRule(ElementId(BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM)))
+        has_circuit_number = ElementParameterFilter(ParameterFilterRuleFactory.CreateHasValueParameterRule(ElementId(BuiltInParameter.RBS_ELEC_CIRCUIT_NUMBER)))
+        return LogicalAndFilter(has_switch_id, has_circuit_number)
 
-    def check_dock_station_load(self):
+    @staticmethod
+    def get_lighting_fixtures_in(doc, element_ids):
         """
-        Verifica a carga aparente da tomada Beyond.
+        Variante de get_lighting_fixtures restrita aos Ids informados, com os mesmos filtros.
+        Returns:
+            FilteredElementCollector ou [] sem Ids.
         """
-        dock_station_load = self.instance.dock_station.electrical_data.convert_to_watts(self.instance.dock_station.apparent_load)
-        if dock_station_load == 0:
-            self.instance.issues.append("Tomada com carga nula")
-        
-        if dock_station_load > 100:
-            self.instance.issues.append("Tomada com carga excedida")
-        
-        return
-          
-    def assign_apparent_load_to_channel(self, channel_number, lighting_load_mapping):
+        if not element_ids:
+            return []
+        collector = FilteredElementCollector(doc, List[ElementId](element_ids)).OfCategory(BuiltInCategory.OST_LightingFixtures)
+        return collector.WhereElementIsNotElementType().WherePasses(ModelCollector._lighting_filter())
+
+    @staticmethod
+    def get_channel_circuits(nested_family_index):
         """
-        Atribui a carga aparente calculada correspondente ao canal de saída.
+        Circuitos de força (ElectricalSystem) conectados às Saídas do índice,
+        obtidos pelo MEPModel de cada Saída, sem percorrer os demais circuitos.
+        Returns:
+            List[ElectricalSystem] sem repetição, na ordem da primeira Saída conectada.
+        """
+        electrical_systems = {}
+        for output_channel in nested_family_index.iter_nested_families(NestedFamilyIndex.OUTPUT_CHANNEL):
+            mep_model = output_channel.MEPModel
+            if not mep_model: continue
+
+            PROFILER.count("GetElectricalSystems")
+            for electrical_system in mep_model.GetElectricalSystems():
+                if electrical_system.SystemType != ElectricalSystemType.PowerCircuit: continue
+                electrical_systems.setdefault(electrical_system.Id.Value, electrical_system)
+        return list(electrical_systems.values())
+
+    @staticmethod
+    def iter_circuit_lighting_fixtures(doc, electrical_systems):
+        """
+        Luminárias com ID de comando de cada circuito, filtradas entre os
+        elementos conectados ao circuito com os mesmos filtros de get_lighting_fixtures.
         Args:
-            channel_number : 1 || 2 || 3;
-            lighting_load_mapping : valor retornado por get_apparent_load_by_switch_id(light_objects).
+            electrical_systems: List[ElectricalSystem] de get_channel_circuits.
+        Yields:
+            (painel, circuito, FilteredElementCollector das luminárias do circuito)
         """
-        channels = {
-            1: self.instance.output_channel_1,
-            2: self.instance.output_channel_2,
-            3: self.instance.output_channel_3
-        }
-        channel = channels.get(channel_number)
-        key = [channel.panel, channel.circuit_number, channel.switch_id]
-        error_values = ["Nulo", "Divergência no painel", "Divergência no circuito", "Desconectado"]
+        has_switch_id = ElementParameterFilter(ParameterFilterRuleFactory.CreateHasValueParameterRule(ElementId(BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM)))
+        for electrical_system in electrical_systems:
+            member_ids = [element.Id for element in electrical_system.Elements]
+            if not member_ids: continue
 
-        if not lighting_load_mapping:
-            channel.apparent_load = 0
-            return
-        
-        for error in error_values:
-            if any(e == error for e in key): 
-                channel.apparent_load = 0
-                return
+            collector = FilteredElementCollector(doc, List[ElementId](member_ids)).OfCategory(BuiltInCategory.OST_LightingFixtures)
+            yield (
+                electrical_system.PanelName or "Nulo",
+                electrical_system.CircuitNumber or "Nulo",
+                collector.WhereElementIsNotElementType().WherePasses(has_switch_id),
+            )
 
-        for entry in lighting_load_mapping:    
-            if [entry[0], entry[1], entry[2]] == key:
-                channel.apparent_load = entry[3]
-                return
 
-    def group_switch_ids(self):
+class LightingLoadSource:
+    """
+    Origem das luminárias somadas às Saídas (LOAD_SOURCE):
+        FULL_SCAN: todas as luminárias do modelo com ID de comando e circuito;
+        CIRCUITS: apenas as luminárias dos circuitos conectados às Saídas Beyond,
+        com o painel e o circuito lidos do ElectricalSystem.
+    """
+    FULL_SCAN = "full_scan"
+    CIRCUITS = "circuits"
+    DESCRIPTIONS = {
+        FULL_SCAN : "varredura completa",
+        CIRCUITS  : "circuitos das Saídas",
+    }
+
+
+class NestedFamilyIndex:
+    """
+    Índice das famílias aninhadas (Beyond.Base e Saídas) agrupadas pelo
+    Id da família hospedeira (SuperComponent), obtido com um único coletor.
+    """
+    DOCK_STATION = "Beyond.Base"
+    OUTPUT_CHANNEL = "Saída"
+
+    def __init__(self):
+        self._nested_by_host = {}
+
+    @classmethod
+    def build(cls, doc, host_family_instances):
         """
-        Retorna uma string dos ids de interruptores para cada dispositivo Beyond.
+        Percorre uma única vez as instâncias de família do modelo e agrupa
+        as famílias aninhadas das famílias hospedeiras informadas.
+        Args:
+            doc: instância atual do DocumentManager;
+            host_family_instances: List[FamilyInstance] das famílias Beyond.
         Returns:
-            switch_ids(string): [a, Nulo, c]
+            NestedFamilyIndex
         """
-        ids_list = [self.instance.output_channel_1.switch_id, self.instance.output_channel_2.switch_id, self.instance.output_channel_3.switch_id]
-        formatted_ids = "[" + ", ".join(ids_list) + "]"
-        
-        return formatted_ids
-       
-    def _get_space(self):
+        return cls.build_for_host_ids(doc, [family_instance.Id for family_instance in host_family_instances])
+
+    @classmethod
+    def build_for_host_ids(cls, doc, host_ids):
+        """
+        Variante de build a partir dos Ids das famílias hospedeiras, para a
+        execução em fluxo, em que as famílias são obtidas sob demanda.
+        Args:
+            host_ids: List[ElementId] das famílias Beyond.
+        Returns:
+            NestedFamilyIndex
+        """
+        index = cls()
+        host_ids = set(host_id.Value for host_id in host_ids)
+        nested_collector = FilteredElementCollector(doc).OfClass(FamilyInstance).WhereElementIsNotElementType()
+
+        for nested_element in nested_collector:
+            super_component = nested_element.SuperComponent
+            if super_component is None: continue
+
+            host_id = super_component.Id.Value
+            if host_id in host_ids:
+                index._nested_by_host.setdefault(host_id, []).append((nested_element.Name, nested_element))
+
+        index._sort()
+        return index
+
+    @classmethod
+    def build_from_sub_components(cls, doc, host_family_instances):
+        """
+        Variante de build para poucas famílias hospedeiras, como nas verificações
+        com escopo: lê apenas os sub-componentes de cada uma, sem percorrer o modelo.
+        Returns:
+            NestedFamilyIndex
+        """
+        index = cls()
+        for family_instance in host_family_instances:
+            nested_elements = [doc.GetElement(element_id) for element_id in family_instance.GetSubComponentIds()]
+            index._nested_by_host[family_instance.Id.Value] = [(nested_element.Name, nested_element) for nested_element in nested_elements]
+
+        index._sort()
+        return index
+
+    def _sort(self):
+        for nested_families in self._nested_by_host.values():
+            nested_families.sort(key=lambda item: (self._channel_number(item[0]), item[0]))
+
+    @staticmethod
+    def _channel_number(nested_family_name):
+        """
+        Extrai o número do canal do nome da família aninhada (ex.: 'Saída 2' -> 2).
+        """
+        numbers = re.findall(r"\d+", nested_family_name)
+        return int(numbers[-1]) if numbers else float("inf")
+
+    def iter_nested_families(self, nested_family_name):
+        """
+        Yields:
+            FamilyInstance aninhadas com o nome informado, de todas as famílias hospedeiras do índice.
+        """
+        for nested_families in self._nested_by_host.values():
+            for name, nested_element in nested_families:
+                if name.startswith(nested_family_name):
+                    yield nested_element
+
+    def get_nested_families(self, host_id, nested_family_name):
+        """
+        Args:
+            host_id: Id inteiro da família hospedeira;
+            nested_family_name(string): 'Saída' || 'Beyond.Base'
+        Returns:
+            List[FamilyInstance] ordenada pelo número do canal no nome da família.
+        """
+        return [
+            nested_element for name, nested_element in self._nested_by_host.get(host_id, [])
+            if name.startswith(nested_family_name)
+        ]
+
+
+class SpaceRoomResolver:
+    """
+    Resolve o Espaço ou Ambiente de uma família a partir de índices espaciais
+    construídos uma única vez por execução, substituindo GetSpaceAtPoint e
+    GetRoomAtPoint por dispositivo. Os nomes resolvidos são memorizados por Id.
+    """
+    def __init__(self, doc, cell_size=10.0):
+        """
+        Args:
+            doc: instância atual do DocumentManager;
+            cell_size: tamanho da célula dos índices espaciais em pés.
+        """
+        self._names = {}
+        self.space_index = self._build_index(doc, BuiltInCategory.OST_MEPSpaces, cell_size)
+        self.room_index = self._build_index(doc, BuiltInCategory.OST_Rooms, cell_size)
+
+    @staticmethod
+    def _build_index(doc, built_in_category, cell_size):
+        """
+        Indexa as caixas envolventes dos Espaços ou Ambientes posicionados no modelo.
+        """
+        index = SpatialGridIndex(cell_size)
+        collector = FilteredElementCollector(doc).OfCategory(built_in_category).WhereElementIsNotElementType()
+
+        for element in collector:
+            if element.Location is None: continue
+            bounding_box = element.get_BoundingBox(None)
+            if bounding_box is None: continue
+
+            bbox_min, bbox_max = bounding_box.Min, bounding_box.Max
+            index.insert(element.LevelId.Value, element, (bbox_min.X, bbox_min.Y, bbox_min.Z), (bbox_max.X, bbox_max.Y, bbox_max.Z))
+
+        return index
+
+    def get_space_at_point(self, level_id, point):
+        """
+        Args:
+            level_id: ElementId do nível da família;
+            point: XYZ.
+        Returns:
+            Autodesk.Revit.DB.Mechanical.Space que contém o ponto ou None.
+        """
+        def contains(space):
+            PROFILER.count("IsPointInSpace")
+            return space.IsPointInSpace(point)
+
+        return self.space_index.query(level_id.Value, (point.X, point.Y, point.Z), contains)
+
+    def get_room_at_point(self, level_id, point):
+        """
+        Args:
+            level_id: ElementId do nível da família;
+            point: XYZ.
+        Returns:
+            Autodesk.Revit.DB.Architecture.Room que contém o ponto ou None.
+        """
+        def contains(room):
+            PROFILER.count("IsPointInRoom")
+            return room.IsPointInRoom(point)
+
+        return self.room_index.query(level_id.Value, (point.X, point.Y, point.Z), contains)
+
+    def get_name(self, element, built_in_parameter):
+        """
+        Retorna o nome do Espaço/Ambiente, memorizado por Id.
+        """
+        element_id = element.Id.Value
+        if element_id not in self._names:
+            PROFILER.count("get_Parameter")
+            name_parameter = element.get_Parameter(built_in_parameter)
+            self._names[element_id] = name_parameter.AsString() if name_parameter else None
+        return self._names[element_id]
+
+    def _get_space(self, family_instance):
         """
         Obtém o Espaço associado a uma instância de família.
         Returns:
             Autodesk.Revit.DB.Mechanical.Space: O Espaço, se houver.
         """
-        space = self.instance.family_instance.Space
+        space = family_instance.Space
         if space is not None:
             return space
             
-        location = self.instance.family_instance.Location
+        location = family_instance.Location
         
         if isinstance(location, LocationPoint):
-            space = doc.GetSpaceAtPoint(location.Point)
+            space = self.get_space_at_point(family_instance.LevelId, location.Point)
             return space
         
         return None
 
-    def _get_room(self):
+    def _get_room(self, family_instance):
         """
         Retorna o Ambiente associado a uma instância de família.
         Returns:
             room_name(string):O Ambiente associado.
         """
-        room = self.instance.family_instance.Room
+        room = family_instance.Room
         if room is not None:
             return room
 
-        location = self.instance.family_instance.Location
+        location = family_instance.Location
         if isinstance(location, LocationPoint):
-            room = doc.GetRoomAtPoint(location.Point)
+            room = self.get_room_at_point(family_instance.LevelId, location.Point)
             return room
         return None
 
-    def get_space_or_room(self):
+    def resolve(self, family_instance):
         """
-        Verifica se há Espaço ou Ambiente associado a família
         Returns:
-            valid_value(string): O nome do Espaço, Ambiente ou Mensagem indicaiva de valor Nulo.
+            (Id inteiro do Espaço ou Ambiente ou None, nome retornado por get_space_or_room)
         """
-        space = self._get_space()
+        space = self._get_space(family_instance)
         if space != None:
-            space_name = space.get_Parameter(BuiltInParameter.SPACE_NAME_PARAM)
+            space_name = self.get_name(space, BuiltInParameter.SPACE_NAME_PARAM)
             if space_name:
-                return space_name.AsString()
-        room = self._get_room()
+                return space.Id.Value, space_name
+        room = self._get_room(family_instance)
         if room is not None and room != "":
-            room_name = room.get_Parameter(BuiltInParameter.ROOM_NAME)
+            room_name = self.get_name(room, BuiltInParameter.ROOM_NAME)
             if room_name:
-                return room_name.AsString()
-        return "Espaço ou Ambiente não atribuído"
+                return room.Id.Value, room_name
+        return None, "Espaço ou Ambiente não atribuído"
 
-#===================================================================================================================
-#==========================         ENTITY          ================================================================
-#===================================================================================================================
+    def get_space_or_room(self, family_instance):
+        """
+        Verifica se há Espaço ou Ambiente associado a família
+        Returns:
+            valid_value(string): O nome do Espaço, Ambiente ou Mensagem indicaiva de valor Nulo.
+        """
+        return self.resolve(family_instance)[1]
 
-class BeyondDevice():
+
+class BeyondParameterCache:
     """
-    Relativa aos dispositivos da Beyond Domotics
+    Cache, por tipo de família, dos GUIDs dos parâmetros compartilhados Beyond.
+    Os parâmetros são resolvidos pelo nome uma única vez por tipo e acessados
+    por GUID nas demais instâncias.
     """
-    count_devices = 0
-
-    def __init__(self, beyond_family_instance):
+    def __init__(self, parameter_names):
         """
-        Uma instância da classe utiliza as famílias de Revit Beyond.ONE ou Beyond.POWER e 
-        suas subfamílias, recuperando informações do projeto .rvt para a instanciação.
+        Args:
+            parameter_names: nomes dos parâmetros escritos pelo BeyondParameterWriter.
         """
-        BeyondDevice.count_devices += 1
-        self.service = BeyondService(self)
-        self.family_instance = beyond_family_instance
-        self.name = self.family_instance.Name
-        self.revit_element_id = self.family_instance.Id
-        self.device_id = self.device_id()
-        self.dock_station = None
-        self.output_channel_1 = None
-        self.output_channel_2 = None
-        self.output_channel_3 = None
-        self.panel = None
-        self.circuit_number = None
-        self.voltage = None
-        self.number_of_poles = None
-        self.space_or_room = None
-        self.grouped_switch_id = None
-        self.issues = []
-        self.issue_flag = False
-    
-    def __str__(self):
-        return f"{self.name}"        
-            
-    def device_id (self):
+        self.parameter_names = parameter_names
+        self._guids_by_type = {}
+        self.missing_parameters = {}
+
+    def _resolve_family_type(self, family_instance):
         """
-        Gera o identificador único interno
-        Returns:
-            device_id(string): Identificador para cada dispositivo
-        """       
-        if BeyondDevice.count_devices <= 9:
-            return "BDO" + str(BeyondDevice.count_devices)
-        else:
-            return "BD" + str(BeyondDevice.count_devices)
+        Resolve os GUIDs dos parâmetros a partir da primeira instância de cada tipo.
+        Parâmetros não compartilhados são mantidos pelo nome e os ausentes
+        são registrados em missing_parameters.
+        """
+        guids = {}
+        missing = []
+        for parameter_name in self.parameter_names:
+            PROFILER.count("LookupParameter")
+            parameter = family_instance.LookupParameter(parameter_name)
+            if parameter is None:
+                guids[parameter_name] = None
+                missing.append(parameter_name)
+            else:
+                guids[parameter_name] = parameter.GUID if parameter.IsShared else parameter_name
+
+        if missing:
+            self.missing_parameters[family_instance.Name] = missing
+        return guids
 
-    def get_nested_families(self, nested_family_name):       
+    def get_parameters(self, family_instance):
         """
-        Recupera as famílias aninhadas na família principal.
         Args:
-            nested_family_name(string): 'Saída' || 'Beyond.Base'
+            family_instance: FamilyInstance Beyond.
         Returns:
-            dock_station -> FamilyInstance
-            output_channels -> List[FamilyInstance]
+            Dicionário {nome do parâmetro: Parameter} contendo apenas os
+            parâmetros existentes no tipo da família.
         """
-        nested_families = []
-        nested_element_ids = self.family_instance.GetDependentElements(ElementClassFilter(FamilyInstance))
-        for id in nested_element_ids:
-            
-            nested_element = doc.GetElement(id)
-            if nested_element.Name.startswith(nested_family_name):
-                
-                nested_families.append(nested_element)
-        
-        if   nested_family_name == "Beyond.Base":
-            return nested_families[0]
-        elif nested_family_name == "Saída":
-            return nested_families
-
-    def initialize_components(self, lighting_load_mapping):
-        
-        dock_station_family = self.get_nested_families("Beyond.Base")
-        self.dock_station = DockStation(dock_station_family, ElectricalData(dock_station_family))
-        
-        output_channel_families = self.get_nested_families("Saída")
-        output_channel_1_family = output_channel_families[0]
-        output_channel_2_family = output_channel_families[1]
-        output_channel_3_family = output_channel_families[2]
-
-        electrical_data_channel_1 = ElectricalData(output_channel_1_family)
-        electrical_data_channel_2 = ElectricalData(output_channel_2_family)
-        electrical_data_channel_3 = ElectricalData(output_channel_3_family)
-
-        self.output_channel_1 = OutputChannel(output_channel_1_family, electrical_data_channel_1)
-        self.output_channel_2 = OutputChannel(output_channel_2_family, electrical_data_channel_2)
-        self.output_channel_3 = OutputChannel(output_channel_3_family, electrical_data_channel_3)
-        
-        self.service.check_device_panel()
-        self.service.check_device_circuit()
-        
-        self.grouped_switch_id = self.service.group_switch_ids()
-        self.voltage = self.dock_station.voltage
-        self.number_of_poles = self.dock_station.number_of_poles
-        self.space_or_room = self.service.get_space_or_room()
+        type_id = family_instance.GetTypeId().Value
+        guids = self._guids_by_type.get(type_id)
+        if guids is None:
+            guids = self._guids_by_type[type_id] = self._resolve_family_type(family_instance)
 
-        self.service.assign_apparent_load_to_channel(1, lighting_load_mapping)
-        self.service.assign_apparent_load_to_channel(2, lighting_load_mapping)
-        self.service.assign_apparent_load_to_channel(3, lighting_load_mapping)
+        parameters = {}
+        for parameter_name, guid in guids.items():
+            if guid is None: continue
+            if isinstance(guid, str):
+                PROFILER.count("LookupParameter")
+                parameters[parameter_name] = family_instance.LookupParameter(guid)
+            else:
+                PROFILER.count("get_Parameter")
+                parameters[parameter_name] = family_instance.get_Parameter(guid)
+        return parameters
 
-        self.service.check_dock_station_load()
-        self.service.check_output_channel_load(1)
-        self.service.check_output_channel_load(2)
-        self.service.check_output_channel_load(3)
 
-        self.service.set_issue_flag()
-
-    
-class DockStation:
+class BeyondParameterWriter():
     """
-    Classe relativa ao dispositivo Base Beyond.
+    Responsável por escrever os valores nos parâmetros
+    de famílias da Beyond
     """
-    def __init__(self, dock_station_family, electrical_data: ElectricalDataAcessor):
-
-        self.family_instance = dock_station_family
-        self.electrical_data = electrical_data
-        self.panel = self.electrical_data.get_family_parameter_value("panel")
-        self.circuit_number = self.electrical_data.get_family_parameter_value("circuit_number")
-        self.number_of_poles = self.electrical_data.get_connector_parameter_value("number_of_poles")
-        self.voltage = self.electrical_data.get_connector_parameter_value("voltage")
-        self.apparent_load = self.electrical_data.get_connector_parameter_value("apparent_load")
-
-    def __str__(self):
-
-        return f"{self.family_instance.Name}"
+    PARAMETER_NAMES = (
+        "Beyond.LocalDeInstalação",
+        "Beyond.IDObjeto",
+        "Beyond.IDComandos",
+        "Beyond.NúmeroDoCircuito",
+        "Beyond.PainelDistribuição",
+        "Beyond.Voltagem",
+        "Beyond.NúmeroDePolos",
+        "Beyond.Iluminação.PotênciaAparente.Saída1",
+        "Beyond.Iluminação.PotênciaAparente.Saída2",
+        "Beyond.Iluminação.PotênciaAparente.Saída3",
+    )
 
+    def __init__(self, beyond_device, parameter_cache, family_instance):
+        """
+        Args:
+            beyond_device: BeyondDevice;
+            parameter_cache: BeyondParameterCache compartilhado entre todos os dispositivos;
+            family_instance: FamilyInstance do dispositivo, obtida pelo revit_element_id.
+        """
+        self.beyond = beyond_device
+        self.parameter_cache = parameter_cache
+        self.family_instance = family_instance
 
-class OutputChannel:
-    """
-    Classe relativa às Saídas/Canais de iluminação Beyond.
-    """
-    def __init__(self, output_channel_family, electrical_data: ElectricalDataAcessor):
+    def _parameter_values(self):
+        """
+        Returns:
+            Dicionário {nome do parâmetro: valor} a ser escrito na família.
+        """
+        return {
+            "Beyond.LocalDeInstalação"                  : self.beyond.space_or_room,
+            "Beyond.IDObjeto"                           : self.beyond.device_id,
+            "Beyond.IDComandos"                         : self.beyond.grouped_switch_id,
+            "Beyond.NúmeroDoCircuito"                   : self.beyond.circuit_number,
+            "Beyond.PainelDistribuição"                 : self.beyond.panel,
+            "Beyond.Voltagem"                           : self.beyond.voltage,
+            "Beyond.NúmeroDePolos"                      : self.beyond.number_of_poles,
+            "Beyond.Iluminação.PotênciaAparente.Saída1" : self.beyond.output_channel_1.apparent_load,
+            "Beyond.Iluminação.PotênciaAparente.Saída2" : self.beyond.output_channel_2.apparent_load,
+            "Beyond.Iluminação.PotênciaAparente.Saída3" : self.beyond.output_channel_3.apparent_load,
+        }
 
-        self.family_instance = output_channel_family
-        self.electrical_data = electrical_data
-        self.panel = self.electrical_data.get_family_parameter_value("panel")
-        self.circuit_number = self.electrical_data.get_family_parameter_value("circuit_number")
-        self.switch_id = self.electrical_data.get_family_parameter_value("switch_id")
-        self.apparent_load = 0
+    @staticmethod
+    def _is_unchanged(parameter, value):
+        """
+        Compara o valor atual do parâmetro com o valor a ser escrito.
+        """
+        storage_type = parameter.StorageType
+        if storage_type == StorageType.String:
+            return (parameter.AsString() or "") == (value or "")
+        if value is None:
+            return False
+        if storage_type == StorageType.Double:
+            return abs(parameter.AsDouble() - value) < 1e-9
+        if storage_type == StorageType.Integer:
+            return parameter.AsInteger() == value
+        return False
 
-    def __str__(self):
+    def get_pending_writes(self):
+        """
+        Lê os valores atuais, fora de transação, e retorna apenas os
+        parâmetros cujo valor difere do calculado. Parâmetros ausentes no
+        tipo da família são ignorados e reportados pelo BeyondParameterCache.
+        Returns:
+            List[(Parameter, valor)]
+        """
+        parameters = self.parameter_cache.get_parameters(self.family_instance)
+        pending_writes = []
 
-        return f"{self.family_instance.Name}"
+        for parameter_name, value in self._parameter_values().items():
+            parameter = parameters.get(parameter_name)
+            if parameter is None or self._is_unchanged(parameter, value): continue
+            pending_writes.append((parameter, value))
 
-#===================================================================================================================
-#==========================         FACTORY          ===============================================================
-#===================================================================================================================
+        return pending_writes
 
-class LightingFactory:
-    
-    @staticmethod
-    def create_lighting_fixtures(lighting_fixtures_collector):
+    def set_family_parameters(self, pending_writes=None):
         """
-        Contém a logica para criar os Objetos de LightingFixture.
+        Escreve os valores obtidos em projeto nos parâmetros de cada
+        instância das famílias da Beyond que foram alterados.
         Args:
-            lighting_fixtures_collector: Lista contendo instâncias de famílias de luminária
+            pending_writes: valor retornado por get_pending_writes(), caso já calculado.
         Returns:
-            Retorna uma lista de objetos LightingFixture
+            Quantidade de parâmetros escritos.
         """
-        light_objects = []
+        if pending_writes is None:
+            pending_writes = self.get_pending_writes()
 
-        for family_instance in lighting_fixtures_collector:
+        PROFILER.count("Set", len(pending_writes))
+        for parameter, value in pending_writes:
+            parameter.Set(value)
 
-            electrical_data = ElectricalData(family_instance)
-            light_fixture = LightingFixture(family_instance, electrical_data)
-            light_objects.append(light_fixture)
+        return len(pending_writes)
 
-        return light_objects
-        
-    @staticmethod
-    def get_apparent_load_by_switch_id(light_objects):
-        
-        return LightingService.sum_apparent_load_by_switch_id(light_objects)
 
+if REVIT_AVAILABLE:
 
-class BeyondFactory():
+    class WarningSwallower(IFailuresPreprocessor):
+        """
+        Descarta os avisos gerados na escrita dos parâmetros para que
+        não interrompam a transação em lote.
+        """
+        __namespace__ = "BeyondRevitAutomation"
+
+        def PreprocessFailures(self, failures_accessor):
+            for failure in failures_accessor.GetFailureMessages():
+                if failure.GetSeverity() == FailureSeverity.Warning:
+                    failures_accessor.DeleteWarning(failure)
+            return FailureProcessingResult.Continue
+
+
+class BeyondParameterWriteBack:
+    """
+    Orquestra a escrita dos parâmetros Beyond em transações por lotes,
+    abrindo transações apenas para os dispositivos com valores alterados.
+    """
+    TRANSACTION_NAME = "Verificação de famílias Beyond"
 
-    def create_devices(beyond_family_instances, lighting_load_mapping):
+    def __init__(self, doc, parameter_cache, chunk_size=500):
         """
-        Contém a logica para a ciração de BeyondDevice
         Args:
-            beyond_family_instances: List[FamilyInstance]
-            lighting_load_mapping: valor retornado por get_apparent_load_by_switch_id(light_objects).
+            doc: instância atual do DocumentManager;
+            parameter_cache: BeyondParameterCache;
+            chunk_size: quantidade de dispositivos por transação.
         """
-        beyond_objects = []
-        for family_instance in beyond_family_instances:
-            device = BeyondDevice(family_instance)
-            device.initialize_components(lighting_load_mapping)
-            beyond_objects.append(device)
-        return beyond_objects
+        self.doc = doc
+        self.parameter_cache = parameter_cache
+        self.chunk_size = max(1, chunk_size)
+        self.elements_touched = 0
+        self.parameters_touched = 0
 
-#===================================================================================================================
-#==========================         M A I N          ===============================================================
-#===================================================================================================================
+    def _commit_chunk(self, chunk, chunk_number):
+        """
+        Escreve um lote de dispositivos em uma única transação.
+        Args:
+            chunk: List[(BeyondParameterWriter, pending_writes)]
+        """
+        t = Transaction(self.doc, f"{self.TRANSACTION_NAME} ({chunk_number})")
+        failure_options = t.GetFailureHandlingOptions()
+        failure_options.SetFailuresPreprocessor(WarningSwallower())
+        failure_options.SetClearAfterRollback(True)
+        t.SetFailureHandlingOptions(failure_options)
+
+        t.Start()
+        try:
+            parameters_touched = sum(setter.set_family_parameters(pending_writes) for setter, pending_writes in chunk)
+            status = t.Commit()
+        except Exception:
+            if t.HasStarted():
+                t.RollBack()
+            raise
 
-#DOCUMENT AND APPLICATION
-doc = DocumentManager.Instance.CurrentDBDocument
-uiapp = DocumentManager.Instance.CurrentUIApplication
-app = uiapp.Application
-uidoc = uiapp.ActiveUIDocument
+        if status != TransactionStatus.Committed:
+            raise RuntimeError(f"A transação '{self.TRANSACTION_NAME} ({chunk_number})' não foi confirmada: {status}")
+        self.parameters_touched += parameters_touched
+        self.elements_touched += len(chunk)
 
-#===================================================================================================================
-#COLLECTORS
-electrical_fixtures_collector = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_ElectricalFixtures).WhereElementIsNotElementType().ToElements()
-lighting_fixtures_collector = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_LightingFixtures).WhereElementIsNotElementType().ToElements()
+    def write(self, beyond_devices):
+        """
+        Escreve os parâmetros de todos os dispositivos.
+        Args:
+            beyond_devices: List[BeyondDevice]
+        """
+        for _ in self.write_stream(beyond_devices): pass
 
-#===================================================================================================================
+    def write_stream(self, beyond_devices):
+        """
+        Estágio de escrita da execução em fluxo: lê as escritas pendentes de cada
+        dispositivo à medida que chega da verificação e confirma uma transação a
+        cada chunk_size dispositivos alterados, todas no mesmo TransactionGroup.
+        Caso uma transação não seja confirmada, ou a execução seja interrompida
+        por um erro em outro estágio, o TransactionGroup é desfeito e nenhuma
+        escrita da execução é mantida.
+        Args:
+            beyond_devices: iterável de BeyondDevice.
+        Yields:
+            BeyondDevice, na ordem de entrada.
+        Raises:
+            RuntimeError: caso uma transação não seja confirmada.
+        """
+        pending = []
+        chunk_number = 0
+        transaction_group = None
 
-if lighting_fixtures_collector:
+        try:
+            for device in beyond_devices:
+                with PROFILER.phase("write-back"):
+                    family_instance = self.doc.GetElement(ElementId(device.revit_element_id))
+                    setter = BeyondParameterWriter(device, self.parameter_cache, family_instance)
+                    pending_writes = setter.get_pending_writes()
+                    if pending_writes:
+                        pending.append((setter, pending_writes))
 
-    lighting_fixtures = LightingFactory.create_lighting_fixtures(lighting_fixtures_collector)
-    apparent_load_mapping = LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+                    if len(pending) >= self.chunk_size:
+                        if transaction_group is None:
+                            transaction_group = TransactionGroup(self.doc, self.TRANSACTION_NAME)
+                            transaction_group.Start()
+                        chunk_number += 1
+                        self._commit_chunk(pending, chunk_number)
+                        pending = []
 
-else: apparent_load_mapping = None
+                yield device
 
-#===================================================================================================================
+            with PROFILER.phase("write-back"):
+                if pending:
+                    if transaction_group is None:
+                        transaction_group = TransactionGroup(self.doc, self.TRANSACTION_NAME)
+                        transaction_group.Start()
+                    self._commit_chunk(pending, chunk_number + 1)
 
-if electrical_fixtures_collector:
+        # BaseException inclui o GeneratorExit do fechamento do gerador quando um estágio seguinte falha.
+        except BaseException:
+            if transaction_group is not None:
+                transaction_group.RollBack()
+                self.elements_touched = self.parameters_touched = 0
+            raise
 
-    beyond_families = list(filter(lambda x : x.Name == ("ONE.Black") or x.Name == ("ONE.White") or x.Name == ("POWER.Black") or x.Name == ("POWER.White"), electrical_fixtures_collector))
-    if beyond_families:
+        if transaction_group is not None:
+            transaction_group.Assimilate()
 
-        beyond_objects = BeyondFactory.create_devices(beyond_families, apparent_load_mapping)
 
-        t = Transaction(doc, "Verificação de famílias Beyond")
-        t.Start()
-        for device in beyond_objects:
+class IncrementalState:
+    """
+    Estado da verificação incremental, salvo em arquivo ao lado do log.
+    Guarda, para cada elemento, a impressão digital dos valores dos quais as
+    verificações dependem e, para cada dispositivo, o resultado da última
+    verificação, reaproveitado quando nem o dispositivo nem as luminárias dos
+    seus comandos foram alterados.
+    """
+    FILE_NAME = "beyond_state.json"
+    VERSION = 3
 
-            setter = BeyondParameterWriter(device)
-            setter.set_family_parameters()
+    def __init__(self, state_file_path, force_full_rebuild=False, partial=False, rules_signature=None):
+        """
+        Args:
+            state_file_path: caminho do arquivo de estado;
+            force_full_rebuild: ignora o estado salvo e verifica todos os dispositivos;
+            partial: execução com escopo, que preserva o estado dos elementos fora do escopo;
+            rules_signature: RulePlan.signature() da execução; resultados de outras regras não são reaproveitados.
+        """
+        self.state_file_path = state_file_path
+        self.partial = partial
+        self.rules_signature = rules_signature
+        self.previous = self._empty_state() if force_full_rebuild else self._load()
+        self.current = self._empty_state()
+        self.dirty_keys = set()
+        self.reused_devices = 0
+        self.validated_devices = 0
 
-        t.Commit()
+    def _empty_state(self):
+        return {"version": self.VERSION, "rules": self.rules_signature, "fixtures": {}, "devices": {}}
 
-    else: beyond_objects = None
+    def _load(self):
+        """
+        Lê o arquivo de estado. Arquivos ausentes, corrompidos, de outra
+        versão ou de outras regras resultam em uma verificação completa.
+        """
+        try:
+            with open(self.state_file_path, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return self._empty_state()
 
-#===================================================================================================================
+        if state.get("version") != self.VERSION or state.get("rules") != self.rules_signature:
+            return self._empty_state()
+        return state
 
-log = Logger(doc, "beyond_log.txt")
-log_message = Logger.log_message(beyond_objects)
-log.write_to_log(log_message)
+    def save(self):
+        """
+        Grava o estado da execução atual. Em uma execução com escopo, mantém o
+        estado dos dispositivos fora do escopo e o das luminárias da última
+        execução, de modo que as luminárias alteradas desde então continuem
+        invalidando os dispositivos que ainda não foram verificados novamente.
+        """
+        state = self.current
+        if self.partial:
+            state = {
+                "version"  : self.VERSION,
+                "rules"    : self.rules_signature,
+                "fixtures" : self.previous["fixtures"],
+                "devices"  : dict(self.previous["devices"], **self.current["devices"]),
+            }
+        with open(self.state_file_path, 'w', encoding='utf-8') as state_file:
+            json.dump(state, state_file, ensure_ascii=False)
 
-#===================================================================================================================
-OUT = [beyond_objects, lighting_fixtures]
\ No newline at end of file
+    @staticmethod
+    def fingerprint(values):
+        """
+        Returns:
+            Hash (string) dos valores informados.
+        """
+        return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _location(family_instance):
+        location = family_instance.Location
+        if isinstance(location, LocationPoint):
+            point = location.Point
+            return (round(point.X, 6), round(point.Y, 6), round(point.Z, 6))
+        return None
+
+    def update_fixtures(self, lighting_fixtures):
+        """
+        Registra as luminárias da execução atual e marca como alterados os
+        comandos (panel, circuit_number, switch_id) das luminárias novas,
+        removidas ou modificadas desde a última execução.
+        Args:
+            lighting_fixtures: List[LightingFixture]
+        """
+        for _ in self.track_fixtures(lighting_fixtures): pass
+
+    def track_fixtures(self, lighting_fixtures):
+        """
+        Versão em fluxo de update_fixtures: registra cada luminária ao repassá-la.
+        As luminárias removidas são marcadas ao final da iteração.
+        Args:
+            lighting_fixtures: iterável de LightingFixture.
+        Yields:
+            LightingFixture
+        """
+        previous_fixtures = self.previous["fixtures"]
+        current_fixtures = self.current["fixtures"]
+
+        for lighting_fixture in lighting_fixtures:
+            key = [lighting_fixture.panel, lighting_fixture.circuit_number, lighting_fixture.switch_id]
+            fingerprint = self.fingerprint((key, lighting_fixture.apparent_load))
+            element_id = str(lighting_fixture.element_id)
+            current_fixtures[element_id] = {"fingerprint": fingerprint, "key": key}
+
+            previous_fixture = previous_fixtures.get(element_id)
+            if previous_fixture is None or previous_fixture["fingerprint"] != fingerprint:
+                self.dirty_keys.add(tuple(key))
+                if previous_fixture is not None:
+                    self.dirty_keys.add(tuple(previous_fixture["key"]))
+
+            yield lighting_fixture
+
+        for element_id, previous_fixture in previous_fixtures.items():
+            if element_id not in current_fixtures:
+                self.dirty_keys.add(tuple(previous_fixture["key"]))
+
+    def device_fingerprint(self, device, space_or_room=None):
+        """
+        Chamado antes de BeyondDevice.release_element(), enquanto a posição pode ser lida.
+        Args:
+            space_or_room: (Id, nome) do Espaço ou Ambiente de SpaceRoomResolver.resolve, de modo
+            que a renomeação ou a alteração dos limites do Espaço invalide o resultado salvo.
+        Returns:
+            Hash dos parâmetros da Base, das Saídas, da posição e do Espaço ou Ambiente do dispositivo.
+        """
+        dock_station = device.dock_station
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        return self.fingerprint((
+            self._location(device.family_instance),
+            space_or_room,
+            (dock_station.panel, dock_station.circuit_number, dock_station.voltage, dock_station.number_of_poles, dock_station.apparent_load),
+            [(channel.panel, channel.circuit_number, channel.switch_id) for channel in channels],
+        ))
+
+    def restore_device(self, device, fingerprint):
+        """
+        Reaproveita o resultado da última verificação caso o dispositivo e os
+        comandos das suas Saídas não tenham sido alterados.
+        Returns:
+            True se o resultado foi restaurado.
+        """
+        cached_device = self.previous["devices"].get(str(device.revit_element_id))
+        if cached_device is None or cached_device["fingerprint"] != fingerprint:
+            return False
+
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        if any((channel.panel, channel.circuit_number, channel.switch_id) in self.dirty_keys for channel in channels):
+            return False
+
+        result = cached_device["result"]
+        device.panel = result["panel"]
+        device.circuit_number = result["circuit_number"]
+        device.space_or_room = result["space_or_room"]
+        device.grouped_switch_id = result["grouped_switch_id"]
+        for channel_number, apparent_load in enumerate(result["apparent_loads"], start=1):
+            device.set_channel_apparent_load(channel_number, apparent_load)
+        device.issues = list(result["issues"])
+        device.issue_codes = list(result["issue_codes"])
+        device.service.set_issue_flag()
+
+        self.reused_devices += 1
+        return True
+
+    def store_device(self, device, fingerprint):
+        """
+        Registra o resultado da verificação do dispositivo para a próxima execução.
+        """
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        self.current["devices"][str(device.revit_element_id)] = {
+            "fingerprint": fingerprint,
+            "result": {
+                "panel": device.panel,
+                "circuit_number": device.circuit_number,
+                "space_or_room": device.space_or_room,
+                "grouped_switch_id": device.grouped_switch_id,
+                "apparent_loads": [channel.apparent_load for channel in channels],
+                "issues": device.issues,
+                "issue_codes": device.issue_codes,
+            },
+        }
+        self.validated_devices = len(self.current["devices"]) - self.reused_devices
+
+
+class RunProfiler:
+    """
+    Instrumentação opcional da execução: tempo de cada fase e de cada
+    dispositivo, contagem das chamadas à API do Revit por tipo e pico de
+    memória alocada pelo Python. Desabilitado, cada chamada retorna imediatamente.
+    """
+    FILE_NAME = "beyond_profile.json"
+
+    def __init__(self, enabled=False):
+        self.reset(enabled)
+
+    def reset(self, enabled):
+        """
+        Reinicia as medições e habilita ou desabilita a instrumentação.
+        """
+        self.enabled = enabled
+        self.phases = {}
+        self.api_calls = {}
+        self.device_times = {}
+        self.peak_memory = None
+
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.enabled and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, phase_name):
+        """
+        Mede o tempo do bloco 'with' e acumula na fase informada.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase_name] = self.phases.get(phase_name, 0.0) + time.perf_counter() - start
+
+    def count(self, call_kind, calls=1):
+        """
+        Contabiliza chamadas à API do Revit.
+        Args:
+            call_kind: 'GetElement' || 'LookupParameter' || 'get_Parameter' || 'Set' || ...
+        """
+        if not self.enabled: return
+        self.api_calls[call_kind] = self.api_calls.get(call_kind, 0) + calls
+
+    def device_time(self, element_id, seconds):
+        if not self.enabled: return
+        self.device_times[str(element_id)] = seconds
+
+    def to_dict(self):
+        device_seconds = list(self.device_times.values())
+        slowest_devices = sorted(self.device_times.items(), key=lambda item: item[1], reverse=True)[:10]
+        return {
+            "phases"            : self.phases,
+            "api_calls"         : self.api_calls,
+            "peak_memory_bytes" : self.peak_memory,
+            "devices"           : {
+                "count"   : len(device_seconds),
+                "total"   : sum(device_seconds),
+                "mean"    : sum(device_seconds) / len(device_seconds) if device_seconds else 0.0,
+                "max"     : max(device_seconds) if device_seconds else 0.0,
+                "slowest" : slowest_devices,
+                "times"   : self.device_times,
+            },
+        }
+
+    def save(self, profile_file_path):
+        """
+        Grava o perfil da execução em JSON.
+        """
+        with open(profile_file_path, 'w', encoding='utf-8') as profile_file:
+            json.dump(self.to_dict(), profile_file, indent=1)
+
+    def summary_message(self):
+        """
+        Resumo do perfil para o relatório de texto.
+        """
+        phases = " / ".join(f"{phase_name} {seconds:.2f} s" for phase_name, seconds in self.phases.items())
+        api_calls = ", ".join(f"{call_kind}: {calls}" for call_kind, calls in sorted(self.api_calls.items()))
+        message = f"Perfil de execução: {phases}\nChamadas à API do Revit: {api_calls}"
+        if self.device_times:
+            device_seconds = self.device_times.values()
+            message += f"\nTempo por dispositivo: médio {sum(device_seconds) / len(device_seconds) * 1000:.1f} ms, máximo {max(device_seconds) * 1000:.1f} ms"
+        if self.peak_memory is not None:
+            message += f"\nPico de memória (Python): {self.peak_memory / 2 ** 20:.1f} MB"
+        return message
+
+
+PROFILER = RunProfiler()
+
+
+class Logger:
+    WORKING_DEVICES_TITLE = "Dispositivo(s) com instalação elétrica adequada:"
+    FAULTY_DEVICES_TITLE = "Dispositivo(s) com problemas de instalação elétrica no projeto:"
+    NO_DEVICES_MESSAGE = "Não há famílias Beyond instaladas no projeto."
+
+    def __init__(self, doc, log_file_name, log_directory=None):
+        """
+        Inicializa o logger.
+        O arquivo de log será salvo no mesmo diretório do documento do Revit.
+        Args:
+            doc: instância atual do DocumentManager, ou None na execução offline;
+            log_file_name (str): nome_do_arquivo.txt;
+            log_directory (str): diretório do log, usado no lugar do diretório do documento.
+        """
+        self.log_file_name = log_file_name
+        if log_directory is not None:
+            self.log_file_path = os.path.join(log_directory, log_file_name)
+        else:
+            self.log_file_path = self._get_log_file_path(doc)
+
+    def _get_log_file_path(self, doc):
+        """
+        Retorna o caminho do arquivo .rvt aberto na seção ativa do Revit
+        acrescido do nome do arquivo de log que será criado.
+        Args:
+            doc: instancia atual do DocumentManager;
+        Returns:
+            caminho do arquivo de log: str
+        """
+        if doc.IsWorkshared:
+            file_path = doc.GetWorksharingCentralModelPath()
+            file_path = ModelPathUtils.ConvertModelPathToUserVisiblePath(file_path)
+        else:
+            file_path = doc.PathName
+
+        document_directory = os.path.dirname(file_path)
+        log_file_path = os.path.join(document_directory, self.log_file_name)
+        
+        return log_file_path
+
+    @staticmethod
+    def header():
+        timestamp = datetime.now().strftime("%d-%m-%Y %H:%M:%S")
+        return timestamp + " - Relatório das famílias Beyond instaladas no projeto"
+
+    def write_to_log(self, message):
+        """
+        Adiciona uma nova mensagem ao arquivo de texto do log.
+        Se o arquivo não existir, ele será criado.
+        Args:
+            message (string): mensagem de log.
+        """
+        log_message = f"{self.header()}\n\n{message}\n\n"
+
+        with open(self.log_file_path, 'a') as logFile:
+            logFile.write(log_message)
+
+    @staticmethod
+    def device_entry(device):
+        """
+        Returns:
+            Linha do dispositivo no relatório de texto.
+        """
+        log_issues = (" - " if device.issue_flag else "") + " / ".join(device.issues)
+        return f"{device.device_id} - Id {device.revit_element_id}" + log_issues
+    
+    @staticmethod
+    def live_message(verified_devices, removed_device_ids=()):
+        """
+        Mensagem de uma descarga da verificação contínua.
+        Args:
+            verified_devices: List[BeyondDevice] verificados novamente;
+            removed_device_ids: Ids inteiros dos dispositivos removidos do modelo.
+        """
+        message = (
+            f"Verificação contínua: {len(verified_devices)} dispositivo(s) verificado(s) novamente, "
+            f"{len(removed_device_ids)} removido(s)"
+            )
+        faulty_devices = [Logger.device_entry(device) for device in verified_devices if device.issue_flag]
+        if faulty_devices:
+            message += "\n" + Logger.FAULTY_DEVICES_TITLE + "\n" + "\n".join(faulty_devices)
+        if removed_device_ids:
+            message += "\nDispositivo(s) removido(s): Id " + ", ".join(str(element_id) for element_id in removed_device_ids)
+        return message
+
+    @staticmethod
+    def log_message(beyond_devices, missing_parameters=None, write_back=None, incremental_state=None, profiler=None, scope=None,
+                    lighting_load_mapping=None):
+        """
+        Define a mensagem de log a ser escrita.
+        Args:
+            beyond_devices: Lista das instâncias de objetos
+            definidos por BeyondDevice();
+            missing_parameters: {tipo de família: [parâmetros]} ausentes,
+            reportado pelo BeyondParameterCache;
+            write_back: BeyondParameterWriteBack executado, para o resumo da escrita;
+            incremental_state: IncrementalState da execução, para o resumo da verificação incremental;
+            profiler: RunProfiler habilitado, para o resumo do perfil de execução;
+            scope: VerificationScope de uma execução com escopo;
+            lighting_load_mapping: LightingLoadIndex, para as luminárias sem conector elétrico.
+        """
+        if beyond_devices == None:
+            return Logger.NO_DEVICES_MESSAGE
+
+        faulty_devices  = []
+        working_devices = []
+        
+        for device in beyond_devices:
+            (faulty_devices if device.issue_flag else working_devices).append(Logger.device_entry(device))
+
+        message = (
+            Logger.WORKING_DEVICES_TITLE + "\n"
+            + "\n".join(working_devices) + "\n\n"
+            + Logger.FAULTY_DEVICES_TITLE + "\n"
+            + "\n".join(faulty_devices)
+            )
+
+        return message + Logger.summary_message(missing_parameters, write_back, incremental_state, profiler, scope, lighting_load_mapping)
+
+    @staticmethod
+    def summary_message(missing_parameters=None, write_back=None, incremental_state=None, profiler=None, scope=None,
+                        lighting_load_mapping=None, load_source_mismatches=None, project_issues=None):
+        """
+        Resumo da execução acrescentado após a lista de dispositivos.
+        Args:
+            os mesmos de log_message;
+            load_source_mismatches: divergências de compare_load_sources, quando CHECK_LOAD_SOURCE;
+            project_issues: List[ProjectIssue] de SwitchIdConsistencyCheck, quando CHECK_SWITCH_ID_CONSISTENCY.
+        """
+        message = ""
+
+        if missing_parameters:
+            missing_entries = [f"{family_type} - " + ", ".join(names) for family_type, names in missing_parameters.items()]
+            message += "\n\nParâmetro(s) Beyond ausente(s) nas famílias:\n" + "\n".join(missing_entries)
+
+        if lighting_load_mapping is not None and lighting_load_mapping.fixtures_without_connector:
+            fixture_ids = ", ".join(str(element_id) for element_id in lighting_load_mapping.fixtures_without_connector)
+            message += f"\n\nLuminária(s) sem conector elétrico, não somada(s) às cargas: Id {fixture_ids}"
+
+        if write_back is not None:
+            message += (
+                f"\n\nParâmetro(s) atualizado(s): {write_back.parameters_touched} "
+                f"em {write_back.elements_touched} dispositivo(s)"
+                )
+
+        if scope is not None and scope.is_partial:
+            message += f"\nEscopo da verificação: {scope.description()}"
+
+        if incremental_state is not None:
+            message += (
+                f"\nVerificação incremental: {incremental_state.validated_devices} dispositivo(s) verificado(s), "
+                f"{incremental_state.reused_devices} reaproveitado(s)"
+                )
+
+        if load_source_mismatches is not None:
+            message += f"\nDivergência entre as origens de cargas: {len(load_source_mismatches)} comando(s)"
+            for (panel, circuit_number, switch_id), reference, candidate in load_source_mismatches:
+                message += f"\n    {panel} / {circuit_number} / {switch_id}: {Logger._load_entry(reference)} x {Logger._load_entry(candidate)}"
+
+        if project_issues is not None:
+            message += "\n" + Logger.consistency_message(project_issues)
+
+        if profiler is not None and profiler.enabled:
+            message += "\n\n" + profiler.summary_message()
+
+        return message
+
+    @staticmethod
+    def consistency_message(project_issues):
+        """
+        Resumo das issues entre dispositivos. Apenas os conflitos são listados;
+        das Saídas e dos comandos órfãos, a contagem, com o detalhe no relatório JSONL.
+        """
+        issue_counts = {code: 0 for code in SwitchIdConsistencyCheck.SEVERITIES}
+        conflict_entries = []
+        orphan_fixture_count = 0
+        for project_issue in project_issues:
+            issue_counts[project_issue.code] += 1
+            if project_issue.code == IssueCode.ORPHAN_FIXTURES:
+                orphan_fixture_count += len(project_issue.fixture_ids)
+            elif project_issue.code == IssueCode.SWITCH_ID_CONFLICT:
+                channels = ", ".join(f"{device_id} (Id {element_id}) Saída {channel_number}"
+                                     for element_id, device_id, channel_number in project_issue.channels)
+                conflict_entries.append(f"\n    {' / '.join(str(value) for value in project_issue.key)}: {channels}")
+
+        return (
+            f"Consistência dos comandos: {issue_counts[IssueCode.SWITCH_ID_CONFLICT]} conflito(s), "
+            f"{issue_counts[IssueCode.ORPHAN_CHANNEL]} Saída(s) sem luminárias, "
+            f"{issue_counts[IssueCode.ORPHAN_FIXTURES]} comando(s) sem Saída Beyond ({orphan_fixture_count} luminária(s))"
+            + "".join(conflict_entries)
+            )
+
+    @staticmethod
+    def _load_entry(load_entry):
+        """
+        Args:
+            load_entry: (carga em VA, quantidade de luminárias) ou None.
+        """
+        if load_entry is None:
+            return "ausente"
+        apparent_load, fixture_count = load_entry
+        return f"{apparent_load:.1f} VA ({fixture_count} luminária(s))"
+
+
+class DeviceReportRecord:
+    """
+    Registro estruturado de um dispositivo verificado, gravado pelos relatórios
+    JSONL e CSV. Cargas em VA e tensão em Volts.
+    """
+    CSV_FIELDS = (
+        "element_id", "device_id", "name", "panel", "circuit_number", "space_or_room",
+        "voltage", "number_of_poles", "dock_station_load",
+        "switch_id_1", "switch_id_2", "switch_id_3",
+        "channel_load_1", "channel_load_2", "channel_load_3",
+        "issue_flag", "issue_codes", "issues",
+    )
+
+    @staticmethod
+    def build(device):
+        """
+        Returns:
+            dict com os valores do dispositivo e os códigos das suas issues.
+        """
+        dock_station = device.dock_station
+        units = device.units
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        return {
+            "element_id"        : device.revit_element_id,
+            "device_id"         : device.device_id,
+            "name"              : device.name,
+            "panel"             : device.panel,
+            "circuit_number"    : device.circuit_number,
+            "space_or_room"     : device.space_or_room,
+            "voltage"           : units.convert_to_volts(device.voltage) if device.voltage is not None else None,
+            "number_of_poles"   : device.number_of_poles,
+            "dock_station_load" : units.convert_to_watts(dock_station.apparent_load or 0),
+            "switch_ids"        : [channel.switch_id for channel in channels],
+            "channel_loads"     : [units.convert_to_watts(channel.apparent_load or 0) for channel in channels],
+            "issue_flag"        : device.issue_flag,
+            "issue_codes"       : device.issue_codes,
+            "issues"            : device.issues,
+        }
+
+    @staticmethod
+    def csv_row(record):
+        """
+        Achata o registro nas colunas de CSV_FIELDS. Os códigos são gravados
+        como CODIGO ou CODIGO@saída, separados por ';'.
+        """
+        row = {key: value for key, value in record.items() if key in DeviceReportRecord.CSV_FIELDS}
+        for number, (switch_id, channel_load) in enumerate(zip(record["switch_ids"], record["channel_loads"]), start=1):
+            row[f"switch_id_{number}"] = switch_id
+            row[f"channel_load_{number}"] = channel_load
+        row["issue_codes"] = ";".join(
+            issue_code["code"] + (f"@{issue_code['channel']}" if "channel" in issue_code else "")
+            for issue_code in record["issue_codes"]
+        )
+        row["issues"] = " / ".join(record["issues"])
+        return row
+
+
+class ReportArchive:
+    """
+    Diretório dos relatórios de cada execução, ao lado do log. Cada execução
+    grava os seus próprios arquivos, identificados pelo horário, e apenas os
+    das últimas execuções são mantidos.
+    """
+    DIRECTORY_NAME = "beyond_reports"
+    FILE_PREFIX = "beyond_report_"
+    LOG_PREFIX = "beyond_log_"
+
+    def __init__(self, log_directory, retention=10):
+        """
+        Args:
+            log_directory: diretório do log;
+            retention: quantidade de execuções mantidas para cada formato, ao menos 1.
+        Raises:
+            ValueError: caso retention seja menor que 1.
+        """
+        if retention < 1:
+            raise ValueError(f"REPORT_RETENTION deve ser ao menos 1: {retention}")
+        self.directory = os.path.join(log_directory, self.DIRECTORY_NAME)
+        self.retention = retention
+        self.run_stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+    def path_for(self, extension):
+        """
+        Returns:
+            caminho do relatório da execução atual no formato informado.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{self.FILE_PREFIX}{self.run_stamp}.{extension}")
+
+    def archive_log(self, log_file_path, max_bytes):
+        """
+        Move o log de texto para o diretório dos relatórios quando ele
+        ultrapassa max_bytes, iniciando um novo arquivo na próxima escrita.
+        """
+        try:
+            if os.path.getsize(log_file_path) <= max_bytes:
+                return
+        except OSError:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        os.replace(log_file_path, os.path.join(self.directory, f"{self.LOG_PREFIX}{self.run_stamp}.txt"))
+
+    def apply_retention(self):
+        """
+        Remove os arquivos mais antigos, mantendo as últimas `retention`
+        execuções de cada formato e dos logs arquivados.
+        """
+        try:
+            file_names = sorted(os.listdir(self.directory))
+        except OSError:
+            return
+
+        groups = {}
+        for file_name in file_names:
+            prefix = next((prefix for prefix in (self.FILE_PREFIX, self.LOG_PREFIX) if file_name.startswith(prefix)), None)
+            if prefix is None: continue
+            groups.setdefault((prefix, os.path.splitext(file_name)[1]), []).append(file_name)
+
+        for group_file_names in groups.values():
+            for file_name in group_file_names[:-self.retention]:
+                os.remove(os.path.join(self.directory, file_name))
+
+
+class JsonlReportSink(ReportSink):
+    """
+    Relatório JSON Lines: um DeviceReportRecord por linha, uma linha
+    {"project_issue": ...} para cada issue entre dispositivos e, ao final, uma
+    linha {"summary": ...} com as contagens de dispositivos e de cada código
+    de issue e o resumo da execução.
+    """
+    EXTENSION = "jsonl"
+
+    def __init__(self, report_file_path):
+        self.report_file_path = report_file_path
+        self._file = open(report_file_path, 'w', encoding='utf-8')
+        self.device_count = 0
+        self.faulty_device_count = 0
+        self.issue_code_counts = {}
+        self.project_issue_counts = {}
+
+    def write_device(self, device):
+        record = DeviceReportRecord.build(device)
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        self.device_count += 1
+        self.faulty_device_count += 1 if device.issue_flag else 0
+        for issue_code in record["issue_codes"]:
+            self.issue_code_counts[issue_code["code"]] = self.issue_code_counts.get(issue_code["code"], 0) + 1
+
+    def write_project_issues(self, project_issues):
+        for project_issue in project_issues:
+            self._file.write(json.dumps({"project_issue": project_issue.to_record()}, ensure_ascii=False) + "\n")
+            self.project_issue_counts[project_issue.code] = self.project_issue_counts.get(project_issue.code, 0) + 1
+
+    def close(self, summary=None):
+        self._file.write(json.dumps({"summary": {
+            "devices"       : self.device_count,
+            "faulty_devices": self.faulty_device_count,
+            "issue_codes"   : self.issue_code_counts,
+            "project_issues": self.project_issue_counts,
+            "message"       : (summary or "").strip(),
+        }}, ensure_ascii=False) + "\n")
+        self._file.close()
+
+
+class CsvReportSink(ReportSink):
+    """
+    Relatório CSV com as colunas de DeviceReportRecord.CSV_FIELDS. O resumo da
+    execução não é gravado no CSV.
+    """
+    EXTENSION = "csv"
+
+    def __init__(self, report_file_path):
+        self.report_file_path = report_file_path
+        self._file = open(report_file_path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=DeviceReportRecord.CSV_FIELDS)
+        self._writer.writeheader()
+
+    def write_device(self, device):
+        self._writer.writerow(DeviceReportRecord.csv_row(DeviceReportRecord.build(device)))
+
+    def close(self, summary=None):
+        self._file.close()
+
+
+class TextReportSink(ReportSink):
+    """
+    Relatório de texto em português, acrescentado ao log. As linhas dos
+    dispositivos são gravadas em arquivos temporários à medida que chegam e
+    copiadas para o log no fechamento, agrupadas como em Logger.log_message.
+    """
+    def __init__(self, log):
+        """
+        Args:
+            log: Logger da execução.
+        """
+        self.log = log
+        self._working_devices = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._faulty_devices = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._device_count = 0
+
+    def write_device(self, device):
+        spool = self._faulty_devices if device.issue_flag else self._working_devices
+        if spool.tell():
+            spool.write("\n")
+        spool.write(Logger.device_entry(device))
+        self._device_count += 1
+
+    def close(self, summary=None):
+        """
+        Args:
+            summary: texto retornado por Logger.summary_message.
+        """
+        with open(self.log.log_file_path, 'a') as log_file:
+            log_file.write(f"{self.log.header()}\n\n")
+            if self._device_count:
+                log_file.write(Logger.WORKING_DEVICES_TITLE + "\n")
+                self._copy(self._working_devices, log_file)
+                log_file.write("\n\n" + Logger.FAULTY_DEVICES_TITLE + "\n")
+                self._copy(self._faulty_devices, log_file)
+                log_file.write(summary or "")
+            else:
+                log_file.write(Logger.NO_DEVICES_MESSAGE)
+            log_file.write("\n\n")
+
+        self._working_devices.close()
+        self._faulty_devices.close()
+
+    @staticmethod
+    def _copy(spool, log_file):
+        spool.seek(0)
+        shutil.copyfileobj(spool, log_file)
+
+
+class CompositeReportSink(ReportSink):
+    """
+    Repassa cada dispositivo a todos os relatórios configurados.
+    """
+    def __init__(self, report_sinks, report_archive=None):
+        """
+        Args:
+            report_sinks: List[ReportSink];
+            report_archive: ReportArchive cuja retenção é aplicada no fechamento.
+        """
+        self.report_sinks = report_sinks
+        self.report_archive = report_archive
+
+    def write_device(self, device):
+        for report_sink in self.report_sinks:
+            report_sink.write_device(device)
+
+    def write_project_issues(self, project_issues):
+        for report_sink in self.report_sinks:
+            report_sink.write_project_issues(project_issues)
+
+    def close(self, summary=None):
+        for report_sink in self.report_sinks:
+            report_sink.close(summary)
+        if self.report_archive is not None:
+            self.report_archive.apply_retention()
+
+
+class SnapshotElement:
+    """
+    Substituto de FamilyInstance na validação offline, contendo apenas o Id e o nome.
+    """
+    def __init__(self, element_id, name):
+        self.Id = element_id
+        self.Name = name
+
+
+class SnapshotElectricalData(ElectricalDataAcessor):
+    """
+    Implementação de ElectricalDataAcessor sobre os valores de um ModelSnapshot,
+    sem dependência da API do Revit.
+    """
+    def __init__(self, record, unit_factors):
+        """
+        Args:
+            record: dicionário do elemento no snapshot;
+            unit_factors: fatores de conversão retornados por ElectricalData.unit_factors().
+        """
+        self.record = record
+        self.unit_factors = unit_factors
+
+    def _get_electrical_connector(self):
+        return None
+
+    def _get_mep_connector_info(self):
+        return None
+
+    def get_connector_parameter_value(self, parameter_key):
+        """
+        Args:
+            parameter_key -> 'voltage' || 'number_of_poles' || 'apparent_load'
+        Returns:
+            O valor associado ao parâmetro ou None caso não houver.
+        """
+        parameter_value = self.record.get(parameter_key)
+
+        if not parameter_value:
+            return None
+
+        return parameter_value
+
+    def get_family_parameter_value(self, parameter_key):
+        """
+        Args:
+            parameter_key -> 'panel' || 'circuit_number' || 'switch_id'
+        Returns:
+            O valor associado ao parâmetro ou string 'Nulo' caso não houver.
+        """
+        parameter_value = self.record.get(parameter_key)
+
+        if not parameter_value or parameter_value == "":
+            return "Nulo"
+
+        return parameter_value
+
+    def has_electrical_connector(self):
+        return self.record.get("has_connector", True)
+
+    def convert_to_volts(self, internal_value):
+        return round(internal_value * self.unit_factors["volts"], 0)
+
+    def convert_to_watts(self, internal_value):
+        return round(internal_value * self.unit_factors["watts"], 0)
+
+
+class SnapshotSpaceRoomResolver:
+    """
+    Substituto de SpaceRoomResolver na validação offline: o nome do Espaço ou
+    Ambiente de cada dispositivo já foi resolvido na extração do snapshot.
+    """
+    def __init__(self, names_by_element_id):
+        self._names = names_by_element_id
+
+    def get_space_or_room(self, family_instance):
+        return self._names.get(family_instance.Id) or "Espaço ou Ambiente não atribuído"
+
+
+class ModelSnapshot(SnapshotReader):
+    """
+    Snapshot portátil (JSON) dos dados do modelo dos quais as verificações dependem:
+    dispositivos Beyond com as suas Bases e Saídas, luminárias e o Espaço ou
+    Ambiente de cada dispositivo. Valores elétricos em unidade interna do Revit.
+    """
+    FORMAT = "beyond-snapshot"
+    VERSION = 1
+    FILE_NAME = "beyond_snapshot.json"
+
+    def __init__(self, document_name, unit_factors, devices, fixtures):
+        self.document_name = document_name
+        self.unit_factors = unit_factors
+        self.devices = devices
+        self.fixtures = fixtures
+
+    @staticmethod
+    def _element_id(element_id):
+        return element_id.Value if hasattr(element_id, "Value") else int(element_id)
+
+    @classmethod
+    def is_snapshot(cls, snapshot_path):
+        """
+        Verifica, pelo início do arquivo, se é um snapshot JSON gravado por save().
+        """
+        with open(snapshot_path, 'r', encoding='utf-8', errors='ignore') as snapshot_file:
+            return snapshot_file.read(64).replace(" ", "").startswith(f'{{"format":"{cls.FORMAT}"')
+
+    @staticmethod
+    def _family_value(parameter_value):
+        return None if parameter_value == "Nulo" else parameter_value
+
+    @classmethod
+    def from_model(cls, document_name, beyond_devices, lighting_fixtures, unit_factors):
+        """
+        Extrai os valores de entrada das verificações a partir dos objetos já
+        criados pelas factories na execução dentro do Revit.
+        Args:
+            document_name: nome do documento Revit;
+            beyond_devices: List[BeyondDevice] ou None;
+            lighting_fixtures: List[LightingFixture];
+            unit_factors: valor retornado por ElectricalData.unit_factors().
+        Returns:
+            ModelSnapshot
+        """
+        fixtures = [
+            {
+                "element_id"     : lighting_fixture.element_id,
+                "panel"          : cls._family_value(lighting_fixture.panel),
+                "circuit_number" : cls._family_value(lighting_fixture.circuit_number),
+                "switch_id"      : cls._family_value(lighting_fixture.switch_id),
+                "apparent_load"  : lighting_fixture.apparent_load,
+                "has_connector"  : lighting_fixture.has_connector,
+            }
+            for lighting_fixture in lighting_fixtures
+        ]
+
+        devices = []
+        for device in beyond_devices or []:
+            dock_station = device.dock_station
+            channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+            devices.append({
+                "element_id"    : device.revit_element_id,
+                "name"          : device.name,
+                "space_or_room" : device.space_or_room,
+                "dock_station"  : {
+                    "element_id"      : dock_station.element_id,
+                    "name"            : str(dock_station),
+                    "panel"           : cls._family_value(dock_station.panel),
+                    "circuit_number"  : cls._family_value(dock_station.circuit_number),
+                    "voltage"         : dock_station.voltage,
+                    "number_of_poles" : dock_station.number_of_poles,
+                    "apparent_load"   : dock_station.apparent_load,
+                    "has_connector"   : dock_station.has_connector,
+                },
+                "output_channels" : [
+                    {
+                        "element_id"     : channel.element_id,
+                        "name"           : str(channel),
+                        "panel"          : cls._family_value(channel.panel),
+                        "circuit_number" : cls._family_value(channel.circuit_number),
+                        "switch_id"      : cls._family_value(channel.switch_id),
+                    }
+                    for channel in channels
+                ],
+            })
+
+        return cls(document_name, unit_factors, devices, fixtures)
+
+    def save(self, snapshot_path):
+        """
+        Grava o snapshot em JSON (UTF-8).
+        """
+        snapshot = {
+            "format"        : self.FORMAT,
+            "version"       : self.VERSION,
+            "document_name" : self.document_name,
+            "unit_factors"  : self.unit_factors,
+            "devices"       : self.devices,
+            "fixtures"      : self.fixtures,
+        }
+        with open(snapshot_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, snapshot_path):
+        """
+        Lê um snapshot gravado por save().
+        Raises:
+            ValueError: caso o arquivo não seja um snapshot Beyond compatível.
+        """
+        with open(snapshot_path, 'r', encoding='utf-8') as snapshot_file:
+            snapshot = json.load(snapshot_file)
+
+        if snapshot.get("format") != cls.FORMAT or snapshot.get("version") != cls.VERSION:
+            raise ValueError(f"{snapshot_path} não é um snapshot Beyond compatível (versão {cls.VERSION}).")
+
+        return cls(snapshot["document_name"], snapshot["unit_factors"], snapshot["devices"], snapshot["fixtures"])
+
+    def iter_fixtures(self):
+        for record in self.fixtures:
+            yield record["element_id"], SnapshotElectricalData(record, self.unit_factors)
+
+    def _component(self, record):
+        return record["element_id"], record["name"], SnapshotElectricalData(record, self.unit_factors)
+
+    def iter_devices(self):
+        for record in self.devices:
+            yield (
+                record["element_id"],
+                record["name"],
+                record["space_or_room"],
+                self._component(record["dock_station"]),
+                [self._component(channel) for channel in record["output_channels"]],
+            )
+
+
+class ColumnarElectricalData(ElectricalDataAcessor):
+    """
+    Implementação de ElectricalDataAcessor sobre uma linha de um ColumnarSnapshot.
+    Os valores são lidos diretamente das colunas mapeadas em memória.
+    """
+    def __init__(self, snapshot, row):
+        """
+        Args:
+            snapshot: ColumnarSnapshot aberto;
+            row: índice da linha do elemento.
+        """
+        self.snapshot = snapshot
+        self.row = row
+
+    def _get_electrical_connector(self):
+        return None
+
+    def _get_mep_connector_info(self):
+        return None
+
+    def get_connector_parameter_value(self, parameter_key):
+        """
+        Args:
+            parameter_key -> 'voltage' || 'number_of_poles' || 'apparent_load'
+        Returns:
+            O valor associado ao parâmetro ou None caso não houver.
+        """
+        parameter_value = self.snapshot.get_number(parameter_key, self.row)
+
+        if not parameter_value:
+            return None
+
+        return parameter_value
+
+    def get_family_parameter_value(self, parameter_key):
+        """
+        Args:
+            parameter_key -> 'panel' || 'circuit_number' || 'switch_id'
+        Returns:
+            O valor associado ao parâmetro ou string 'Nulo' caso não houver.
+        """
+        parameter_value = self.snapshot.get_string(parameter_key, self.row)
+
+        if not parameter_value or parameter_value == "":
+            return "Nulo"
+
+        return parameter_value
+
+    def has_electrical_connector(self):
+        return self.snapshot.has_connector(self.row)
+
+    def convert_to_volts(self, internal_value):
+        return round(internal_value * self.snapshot.unit_factors["volts"], 0)
+
+    def convert_to_watts(self, internal_value):
+        return round(internal_value * self.snapshot.unit_factors["watts"], 0)
+
+
+class ColumnarSnapshot(SnapshotReader):
+    """
+    Formato binário colunar do snapshot, aberto com mmap (leitura sem cópia).
+
+    Layout: MAGIC, tamanho do cabeçalho (uint64), cabeçalho JSON (fatores de
+    conversão, dicionário de strings e posição de cada coluna) e as colunas,
+    alinhadas em 8 bytes. Cada elemento (dispositivo, Base, Saída ou luminária)
+    ocupa uma linha; Bases e Saídas seguem a linha do seu dispositivo. Colunas
+    de texto são codificadas no dicionário (0 = nulo), colunas numéricas têm
+    largura fixa (NaN ou -1 = nulo) e o índice ordenado por element_id permite
+    o acesso por Id em O(log n).
+    """
+    MAGIC = b"BEYONDC1"
+    VERSION = 1
+    FILE_NAME = "beyond_snapshot.bcol"
+
+    FIXTURE, DEVICE, DOCK_STATION, OUTPUT_CHANNEL = range(4)
+
+    COLUMNS = {
+        "element_id"      : "q",
+        "kind"            : "B",
+        "host_row"        : "i",
+        "name"            : "I",
+        "panel"           : "I",
+        "circuit_number"  : "I",
+        "switch_id"       : "I",
+        "space_or_room"   : "I",
+        "apparent_load"   : "d",
+        "voltage"         : "d",
+        "number_of_poles" : "i",
+        "has_connector"   : "B",
+        "index_ids"       : "q",
+        "index_rows"      : "i",
+    }
+    STRING_COLUMNS = ("name", "panel", "circuit_number", "switch_id", "space_or_room")
+
+    def __init__(self, snapshot_path):
+        """
+        Abre e mapeia o arquivo em memória. Utilize close() ou o bloco 'with'.
+        Raises:
+            ValueError: caso o arquivo não seja um snapshot colunar compatível.
+        """
+        self._file = open(snapshot_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(self.MAGIC)] != self.MAGIC:
+            self.close()
+            raise ValueError(f"{snapshot_path} não é um snapshot colunar Beyond.")
+
+        header_start = len(self.MAGIC) + 8
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(self.MAGIC))
+        header = json.loads(self._mmap[header_start:header_start + header_length].decode('utf-8'))
+
+        if header["version"] != self.VERSION or header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{snapshot_path} não é um snapshot colunar compatível (versão {self.VERSION}).")
+
+        self.document_name = header["document_name"]
+        self.unit_factors = header["unit_factors"]
+        self.row_count = header["row_count"]
+        self.strings = header["strings"]
+
+        buffer = memoryview(self._mmap)
+        self._buffer = buffer
+        self.columns = {}
+        for name, (offset, length) in header["columns"].items():
+            typecode = self.COLUMNS[name]
+            self.columns[name] = buffer[offset:offset + length * array(typecode).itemsize].cast(typecode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Libera as colunas e o mapeamento em memória.
+        """
+        for column in getattr(self, "columns", {}).values():
+            column.release()
+        self.columns = {}
+        if getattr(self, "_buffer", None) is not None:
+            self._buffer.release()
+            self._buffer = None
+        if not self._mmap.closed:
+            self._mmap.close()
+        self._file.close()
+
+    @staticmethod
+    def is_columnar(snapshot_path):
+        with open(snapshot_path, 'rb') as snapshot_file:
+            return snapshot_file.read(len(ColumnarSnapshot.MAGIC)) == ColumnarSnapshot.MAGIC
+
+    def get_string(self, column_name, row):
+        return self.strings[self.columns[column_name][row]]
+
+    def get_number(self, column_name, row):
+        value = self.columns[column_name][row]
+        if column_name == "number_of_poles":
+            return None if value < 0 else value
+        return None if math.isnan(value) else value
+
+    def has_connector(self, row):
+        """
+        Snapshots gravados antes da coluna has_connector consideram todos os conectores presentes.
+        """
+        column = self.columns.get("has_connector")
+        return bool(column[row]) if column is not None else True
+
+    def find_row(self, element_id):
+        """
+        Busca binária no índice ordenado por element_id.
+        Returns:
+            Índice da linha do elemento ou None.
+        """
+        index_ids = self.columns["index_ids"]
+        position = bisect.bisect_left(index_ids, element_id)
+        if position < len(index_ids) and index_ids[position] == element_id:
+            return self.columns["index_rows"][position]
+        return None
+
+    def get_electrical_data(self, element_id):
+        """
+        Returns:
+            ColumnarElectricalData do elemento ou None caso o Id não exista no snapshot.
+        """
+        row = self.find_row(element_id)
+        return ColumnarElectricalData(self, row) if row is not None else None
+
+    def _component(self, row):
+        return self.columns["element_id"][row], self.get_string("name", row), ColumnarElectricalData(self, row)
+
+    def iter_fixtures(self):
+        kind = self.columns["kind"]
+        for row in range(self.row_count):
+            if kind[row] == self.FIXTURE:
+                yield self.columns["element_id"][row], ColumnarElectricalData(self, row)
+
+    def iter_devices(self):
+        kind = self.columns["kind"]
+        host_row = self.columns["host_row"]
+        for row in range(self.row_count):
+            if kind[row] != self.DEVICE: continue
+
+            dock_station = None
+            output_channels = []
+            child_row = row + 1
+            while child_row < self.row_count and host_row[child_row] == row:
+                if kind[child_row] == self.DOCK_STATION:
+                    dock_station = self._component(child_row)
+                else:
+                    output_channels.append(self._component(child_row))
+                child_row += 1
+
+            yield (
+                self.columns["element_id"][row],
+                self.get_string("name", row),
+                self.get_string("space_or_room", row),
+                dock_station,
+                output_channels,
+            )
+
+    @classmethod
+    def write(cls, snapshot_path, model_snapshot):
+        """
+        Converte um ModelSnapshot para o formato colunar.
+        Args:
+            snapshot_path: caminho do arquivo .bcol;
+            model_snapshot: ModelSnapshot.
+        """
+        strings = [None]
+        string_codes = {None: 0}
+        columns = {name: array(typecode) for name, typecode in cls.COLUMNS.items()}
+
+        def encode(value):
+            code = string_codes.get(value)
+            if code is None:
+                code = string_codes[value] = len(strings)
+                strings.append(value)
+            return code
+
+        def append_row(kind, host_row, record):
+            columns["element_id"].append(record["element_id"])
+            columns["kind"].append(kind)
+            columns["host_row"].append(host_row)
+            for name in cls.STRING_COLUMNS:
+                columns[name].append(encode(record.get(name)))
+            for name in ("apparent_load", "voltage"):
+                value = record.get(name)
+                columns[name].append(float("nan") if value is None else value)
+            number_of_poles = record.get("number_of_poles")
+            columns["number_of_poles"].append(-1 if number_of_poles is None else number_of_poles)
+            columns["has_connector"].append(record.get("has_connector", True))
+            return len(columns["element_id"]) - 1
+
+        for device in model_snapshot.devices:
+            device_row = append_row(cls.DEVICE, -1, device)
+            append_row(cls.DOCK_STATION, device_row, device["dock_station"])
+            for channel in device["output_channels"]:
+                append_row(cls.OUTPUT_CHANNEL, device_row, channel)
+
+        for fixture in model_snapshot.fixtures:
+            append_row(cls.FIXTURE, -1, fixture)
+
+        sorted_rows = sorted(range(len(columns["element_id"])), key=columns["element_id"].__getitem__)
+        columns["index_ids"].extend(columns["element_id"][row] for row in sorted_rows)
+        columns["index_rows"].extend(sorted_rows)
+
+        header = {
+            "version"       : cls.VERSION,
+            "byteorder"     : sys.byteorder,
+            "document_name" : model_snapshot.document_name,
+            "unit_factors"  : model_snapshot.unit_factors,
+            "row_count"     : len(columns["element_id"]),
+            "strings"       : strings,
+            "columns"       : {},
+        }
+
+        # As posições das colunas dependem do tamanho do cabeçalho, que por sua vez
+        # contém as posições: recalcula até estabilizar.
+        header_bytes = b""
+        while True:
+            offset = cls._align(len(cls.MAGIC) + 8 + len(header_bytes))
+            for name, column in columns.items():
+                header["columns"][name] = [offset, len(column)]
+                offset = cls._align(offset + len(column) * column.itemsize)
+            new_header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+            if len(new_header_bytes) == len(header_bytes):
+                header_bytes = new_header_bytes
+                break
+            header_bytes = new_header_bytes
+
+        with open(snapshot_path, 'wb') as snapshot_file:
+            snapshot_file.write(cls.MAGIC)
+            snapshot_file.write(struct.pack("<Q", len(header_bytes)))
+            snapshot_file.write(header_bytes)
+            for name, column in columns.items():
+                offset = header["columns"][name][0]
+                snapshot_file.write(b"\0" * (offset - snapshot_file.tell()))
+                snapshot_file.write(column.tobytes())
+
+    @staticmethod
+    def _align(offset, alignment=8):
+        return (offset + alignment - 1) // alignment * alignment
+
+
+class BatchManifest:
+    """
+    Lista dos modelos de uma auditoria em lote: os snapshots de um diretório
+    ou os modelos de um manifesto JSON
+        {"models": [{"name": ..., "model": "projeto.rvt", "snapshot": "projeto.json"}, ...]}
+    com caminhos relativos ao manifesto. Modelos sem snapshot são extraídos
+    no Revit com extract_models antes da validação.
+    """
+    SNAPSHOT_EXTENSIONS = (".json", ".bcol")
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: List[{'name', 'model', 'snapshot'}], com nomes únicos.
+        """
+        self.entries = entries
+
+    @staticmethod
+    def _unique_name(name, used_names):
+        unique_name = name
+        suffix = 2
+        while unique_name in used_names:
+            unique_name = f"{name}_{suffix}"
+            suffix += 1
+        used_names.add(unique_name)
+        return unique_name
+
+    @classmethod
+    def from_directory(cls, directory):
+        """
+        Todos os snapshots (JSON ou colunares) do diretório, em ordem alfabética.
+        """
+        entries = []
+        used_names = set()
+        for file_name in sorted(os.listdir(directory)):
+            snapshot_path = os.path.join(directory, file_name)
+            stem, extension = os.path.splitext(file_name)
+            if extension not in cls.SNAPSHOT_EXTENSIONS or not os.path.isfile(snapshot_path): continue
+            if extension == ".json" and not ModelSnapshot.is_snapshot(snapshot_path): continue
+            if extension == ".bcol" and not ColumnarSnapshot.is_columnar(snapshot_path): continue
+
+            entries.append({"name": cls._unique_name(stem, used_names), "model": None, "snapshot": snapshot_path})
+        return cls(entries)
+
+    @classmethod
+    def load(cls, manifest_path):
+        """
+        Raises:
+            ValueError: caso um modelo não informe 'model' nem 'snapshot'.
+        """
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+
+        base_directory = os.path.dirname(os.path.abspath(manifest_path))
+        entries = []
+        used_names = set()
+        for model in manifest.get("models", []):
+            model_path = model.get("model")
+            snapshot_path = model.get("snapshot")
+            if not model_path and not snapshot_path:
+                raise ValueError(f"Modelo sem 'model' ou 'snapshot' no manifesto {manifest_path}: {model}")
+
+            if model_path:
+                model_path = os.path.join(base_directory, model_path)
+            if not snapshot_path:
+                snapshot_path = os.path.splitext(model_path)[0] + ".json"
+            snapshot_path = os.path.join(base_directory, snapshot_path)
+
+            name = model.get("name") or os.path.splitext(os.path.basename(model_path or snapshot_path))[0]
+            entries.append({"name": cls._unique_name(name, used_names), "model": model_path, "snapshot": snapshot_path})
+        return cls(entries)
+
+    def pending_extraction(self):
+        """
+        Returns:
+            Modelos do manifesto cujo snapshot ainda não foi extraído.
+        """
+        return [entry for entry in self.entries if entry["model"] and not os.path.exists(entry["snapshot"])]
+
+
+class BatchProgress:
+    """
+    Progresso de uma auditoria em lote, gravado no diretório de saída a cada
+    modelo concluído. Na retomada, os modelos concluídos cujo snapshot não foi
+    alterado desde então não são validados novamente.
+    """
+    FILE_NAME = "beyond_batch_state.json"
+    VERSION = 1
+
+    def __init__(self, output_directory, restart=False, rules_signature=None):
+        """
+        Args:
+            output_directory: diretório de saída da auditoria;
+            restart: ignora o progresso salvo e valida todos os modelos;
+            rules_signature: RulePlan.signature(); o progresso de outras regras é descartado.
+        """
+        self.state_file_path = os.path.join(output_directory, self.FILE_NAME)
+        self.rules_signature = rules_signature
+        self.models = {} if restart else self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_file_path, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+        if state.get("version") != self.VERSION or state.get("rules") != self.rules_signature:
+            return {}
+        return state.get("models", {})
+
+    @staticmethod
+    def snapshot_fingerprint(snapshot_path):
+        """
+        Returns:
+            Tamanho e data de modificação do snapshot.
+        """
+        stat = os.stat(snapshot_path)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+    def completed_result(self, entry):
+        """
+        Returns:
+            Resultado salvo do modelo ou None caso precise ser validado.
+        """
+        model = self.models.get(entry["name"])
+        if model is None or model["snapshot"] != entry["snapshot"]:
+            return None
+        if model["fingerprint"] != self.snapshot_fingerprint(entry["snapshot"]):
+            return None
+        return model["result"]
+
+    def complete(self, entry, result):
+        """
+        Registra o modelo concluído e grava o progresso (substituição atômica do arquivo).
+        """
+        self.models[entry["name"]] = {
+            "snapshot"    : entry["snapshot"],
+            "fingerprint" : self.snapshot_fingerprint(entry["snapshot"]),
+            "result"      : result,
+        }
+        temporary_path = self.state_file_path + ".tmp"
+        with open(temporary_path, 'w', encoding='utf-8') as state_file:
+            json.dump({"version": self.VERSION, "rules": self.rules_signature, "models": self.models}, state_file, ensure_ascii=False)
+        os.replace(temporary_path, self.state_file_path)
+
+ModelChange = namedtuple("ModelChange", ("added_ids", "modified_ids", "deleted_ids"))
+
+
+class DocumentChangedSource(ModelChangeSource):
+    """
+    ModelChangeSource sobre o evento Application.DocumentChanged, notificado ao
+    final de cada transação, restrito às luminárias e às instalações elétricas
+    (famílias Beyond, Beyond.Base e Saídas). UIApplication.Idling, quando
+    informado, sinaliza os momentos ociosos. Os handlers apenas repassam os
+    Ids, pois o documento não pode ser alterado durante DocumentChanged.
+    """
+    def __init__(self, doc, ui_application=None):
+        """
+        Args:
+            doc: documento acompanhado;
+            ui_application: UIApplication para o evento Idling, ou None.
+        """
+        self.doc = doc
+        self.ui_application = ui_application
+        self._element_filter = ModelCollector.any_of([
+            ElementCategoryFilter(BuiltInCategory.OST_LightingFixtures),
+            ElementCategoryFilter(BuiltInCategory.OST_ElectricalFixtures),
+        ])
+        self._on_change = None
+        self._on_idle = None
+        # Referências fixas dos handlers, necessárias para removê-los dos eventos.
+        self._document_changed_handler = self._document_changed
+        self._idling_handler = self._idling
+
+    def subscribe(self, on_change, on_idle=None):
+        self._on_change = on_change
+        self._on_idle = on_idle
+        self.doc.Application.DocumentChanged += self._document_changed_handler
+        if self.ui_application is not None and on_idle is not None:
+            self.ui_application.Idling += self._idling_handler
+
+    def unsubscribe(self):
+        if self._on_change is None:
+            return
+        self.doc.Application.DocumentChanged -= self._document_changed_handler
+        if self.ui_application is not None and self._on_idle is not None:
+            self.ui_application.Idling -= self._idling_handler
+        self._on_change = None
+        self._on_idle = None
+
+    def _document_changed(self, sender, args):
+        if not args.GetDocument().Equals(self.doc):
+            return
+        self._on_change(ModelChange(
+            {element_id.Value for element_id in args.GetAddedElementIds(self._element_filter)},
+            {element_id.Value for element_id in args.GetModifiedElementIds(self._element_filter)},
+            {element_id.Value for element_id in args.GetDeletedElementIds()},
+        ))
+
+    def _idling(self, sender, args):
+        self._on_idle()
+
+#===================================================================================================================
+#==========================         APPLICATION SERVICE        =====================================================
+#===================================================================================================================
+
+class SpatialGridIndex:
+    """
+    Índice espacial em grade uniforme (plano XY), separado por nível, sobre as
+    caixas envolventes de Espaços/Ambientes. Independente da API do Revit:
+    os itens e pontos são quaisquer objetos, as caixas são tuplas (x, y, z).
+    """
+    def __init__(self, cell_size=10.0):
+        """
+        Args:
+            cell_size: tamanho da célula da grade em unidade interna (pés).
+        """
+        self.cell_size = float(cell_size)
+        self._cells_by_level = {}
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def insert(self, level_key, item, bbox_min, bbox_max):
+        """
+        Insere um item em todas as células cobertas pela sua caixa envolvente.
+        Args:
+            level_key: identificador do nível do item;
+            item: objeto armazenado (Espaço, Ambiente ou substituto);
+            bbox_min, bbox_max: (x, y, z) da caixa envolvente.
+        """
+        cells = self._cells_by_level.setdefault(level_key, {})
+        min_cell_x, min_cell_y = self._cell(bbox_min[0], bbox_min[1])
+        max_cell_x, max_cell_y = self._cell(bbox_max[0], bbox_max[1])
+        entry = (item, tuple(bbox_min), tuple(bbox_max))
+
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                cells.setdefault((cell_x, cell_y), []).append(entry)
+
+    def _query_level(self, cells, point, contains):
+        for item, bbox_min, bbox_max in cells.get(self._cell(point[0], point[1]), ()):
+            if not all(bbox_min[axis] <= point[axis] <= bbox_max[axis] for axis in range(3)): continue
+            if contains(item):
+                return item
+        return None
+
+    def query(self, level_key, point, contains=lambda item: True):
+        """
+        Busca o item que contém o ponto. Somente os candidatos da célula cuja
+        caixa envolvente contém o ponto passam pelo teste exato 'contains'.
+        Caso não haja resultado no nível informado, os demais níveis são consultados.
+        Args:
+            level_key: identificador do nível do ponto;
+            point: (x, y, z);
+            contains: teste exato de pertinência, recebe o item candidato.
+        Returns:
+            O primeiro item que contém o ponto ou None.
+        """
+        level_cells = self._cells_by_level.get(level_key)
+        if level_cells is not None:
+            item = self._query_level(level_cells, point, contains)
+            if item is not None:
+                return item
+
+        for other_level_key, cells in self._cells_by_level.items():
+            if other_level_key == level_key: continue
+            item = self._query_level(cells, point, contains)
+            if item is not None:
+                return item
+
+        return None
+
+
+class LightingFixture(namedtuple("LightingFixture", ("element_id", "panel", "circuit_number", "switch_id", "apparent_load", "has_connector"))):
+    """
+    Registro imutável de uma luminária do modelo: apenas os valores dos quais
+    a soma das cargas depende e o Id (inteiro) do elemento, sem referência à
+    FamilyInstance. Pode ser descartado após a agregação em LightingLoadIndex.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_electrical_data(cls, element_id, electrical_data: ElectricalDataAcessor):
+        """
+        Args:
+            element_id: Id inteiro da luminária;
+            electrical_data : Injeção do objeto que implementa ElectricalDataAcessor.
+        Returns:
+            LightingFixture
+        """
+        return cls(
+            element_id,
+            electrical_data.get_family_parameter_value("panel"),
+            electrical_data.get_family_parameter_value("circuit_number"),
+            electrical_data.get_family_parameter_value("switch_id"),
+            electrical_data.get_connector_parameter_value("apparent_load"),
+            electrical_data.has_electrical_connector(),
+        )
+
+    @classmethod
+    def from_circuit(cls, element_id, panel, circuit_number, electrical_data: ElectricalDataAcessor):
+        """
+        Registro de uma luminária lida pelo circuito, com o painel e o número
+        do ElectricalSystem em vez dos parâmetros da luminária.
+        Returns:
+            LightingFixture
+        """
+        return cls(
+            element_id,
+            panel,
+            circuit_number,
+            electrical_data.get_family_parameter_value("switch_id"),
+            electrical_data.get_connector_parameter_value("apparent_load"),
+            electrical_data.has_electrical_connector(),
+        )
+
+
+class LightingLoadEntry:
+    """
+    Carga aparente agregada de um mesmo comando (painel, circuito, switch_id).
+    """
+    def __init__(self):
+        self.apparent_load = 0
+        self.fixture_count = 0
+        self.element_ids = []
+
+    def add(self, apparent_load, element_id):
+        """
+        Soma a carga de uma luminária ao comando.
+        Args:
+            apparent_load: carga aparente da luminária em unidade interna do Revit;
+            element_id: Id inteiro da luminária.
+        """
+        self.apparent_load += apparent_load or 0
+        self.fixture_count += 1
+        self.element_ids.append(element_id)
+
+
+class TrackedLightingLoadEntry(LightingLoadEntry):
+    """
+    LightingLoadEntry do LoadDependencyIndex, com os Ids das luminárias em um
+    dicionário na ordem de inclusão, de modo que a remoção e a alteração de uma
+    luminária sejam aplicadas como delta em O(1).
+    """
+    def __init__(self):
+        super().__init__()
+        self.element_ids = {}
+
+    def add(self, apparent_load, element_id):
+        self.apparent_load += apparent_load or 0
+        self.fixture_count += 1
+        self.element_ids[element_id] = None
+
+    def remove(self, apparent_load, element_id):
+        """
+        Subtrai a carga de uma luminária do comando.
+        Args:
+            apparent_load: carga aparente somada pela luminária;
+            element_id: Id inteiro da luminária.
+        """
+        self.apparent_load -= apparent_load or 0
+        self.fixture_count -= 1
+        del self.element_ids[element_id]
+
+
+class LightingLoadIndex:
+    """
+    Índice das cargas de iluminação indexado por (painel, circuito, switch_id).
+    Construído em uma única passagem sobre as luminárias e consultado em O(1)
+    para cada canal de saída Beyond.
+    """
+    def __init__(self, entry_type=LightingLoadEntry):
+        """
+        Args:
+            entry_type: classe das entradas, TrackedLightingLoadEntry no LoadDependencyIndex.
+        """
+        self._entries = {}
+        self._entry_type = entry_type
+        self.fixtures_without_connector = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return tuple(key) in self._entries
+
+    def __iter__(self):
+        return iter(self._entries.items())
+
+    def add(self, key, apparent_load, element_id):
+        """
+        Acumula a carga de uma luminária na entrada correspondente a key.
+        Args:
+            key: (panel, circuit_number, switch_id);
+            apparent_load: carga aparente da luminária;
+            element_id: Id inteiro da luminária.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = self._entry_type()
+        entry.add(apparent_load, element_id)
+
+    def merge(self, other):
+        """
+        Acrescenta as entradas de outro índice com chaves disjuntas, como os
+        índices parciais de painéis diferentes.
+        """
+        self._entries.update(other._entries)
+
+    def discard(self, key):
+        """
+        Remove a entrada de key, caso exista.
+        """
+        self._entries.pop(tuple(key), None)
+
+    def subset(self, panels):
+        """
+        Returns:
+            LightingLoadIndex apenas com as entradas dos painéis informados.
+        """
+        load_mapping = LightingLoadIndex(self._entry_type)
+        load_mapping._entries = {key: entry for key, entry in self._entries.items() if key[0] in panels}
+        return load_mapping
+
+    def get(self, key):
+        """
+        Returns:
+            LightingLoadEntry associada a key ou None caso não houver.
+        """
+        return self._entries.get(tuple(key))
+
+    def get_apparent_load(self, key):
+        """
+        Returns:
+            Carga aparente total associada a key ou 0 caso não houver.
+        """
+        entry = self.get(key)
+        return entry.apparent_load if entry else 0
+
+
+class LoadDependencyIndex:
+    """
+    Índice bidirecional entre as luminárias e as Saídas Beyond que elas
+    alimentam, pelo comando (panel, circuit_number, switch_id). Mantém o
+    LightingLoadIndex das cargas e aplica a inclusão, remoção ou alteração de
+    uma luminária como delta nos comandos afetados, retornando apenas os
+    dispositivos que precisam ser verificados novamente.
+    """
+    def __init__(self):
+        self.load_mapping = LightingLoadIndex(TrackedLightingLoadEntry)
+        self._fixtures = {}
+        self._channels = {}
+        self._device_keys = {}
+
+    @classmethod
+    def build(cls, lighting_fixtures, beyond_devices=()):
+        """
+        Args:
+            lighting_fixtures: iterável de LightingFixture;
+            beyond_devices: iterável de BeyondDevice com os componentes carregados.
+        Returns:
+            LoadDependencyIndex, com load_mapping igual ao de LightingService.sum_apparent_load_by_switch_id.
+        """
+        dependency_index = cls()
+        for lighting_fixture in lighting_fixtures:
+            dependency_index.add_fixture(lighting_fixture)
+        for device in beyond_devices:
+            dependency_index.add_device(device)
+        return dependency_index
+
+    @staticmethod
+    def channel_key(lighting_fixture):
+        """
+        Returns:
+            (panel, circuit_number, switch_id) da luminária ou None caso ela não seja somada às cargas.
+        """
+        if not lighting_fixture.has_connector:
+            return None
+        key = (lighting_fixture.panel, lighting_fixture.circuit_number, lighting_fixture.switch_id)
+        return None if "Nulo" in key else key
+
+    def add_device(self, device):
+        """
+        Registra as Saídas do dispositivo nos seus comandos, substituindo o registro anterior.
+        """
+        self.remove_device(device.revit_element_id)
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        keys = []
+        for channel_number, channel in enumerate(channels, start=1):
+            key = (channel.panel, channel.circuit_number, channel.switch_id)
+            self._channels.setdefault(key, []).append((device.revit_element_id, channel_number))
+            keys.append(key)
+        self._device_keys[device.revit_element_id] = keys
+
+    def remove_device(self, device_element_id):
+        for key in self._device_keys.pop(device_element_id, ()):
+            channels = [channel for channel in self._channels[key] if channel[0] != device_element_id]
+            if channels:
+                self._channels[key] = channels
+            else:
+                del self._channels[key]
+
+    def add_fixture(self, lighting_fixture):
+        """
+        Inclui a luminária ou, caso já esteja no índice, aplica a sua alteração.
+        Returns:
+            Set[Id inteiro] dos dispositivos cujas Saídas são alimentadas pelos comandos afetados.
+        """
+        key = self.channel_key(lighting_fixture)
+        previous = self._fixtures.get(lighting_fixture.element_id)
+        if key is not None and previous is not None and previous[0] == key:
+            # Alteração apenas da carga: a luminária mantém a sua posição no comando.
+            self._fixtures[lighting_fixture.element_id] = (key, lighting_fixture.apparent_load)
+            self.load_mapping.get(key).apparent_load += (lighting_fixture.apparent_load or 0) - (previous[1] or 0)
+            return self.devices_for_keys({key})
+
+        affected_keys = self._remove_fixture(lighting_fixture.element_id)
+        self._fixtures[lighting_fixture.element_id] = (key, lighting_fixture.apparent_load)
+
+        if key is not None:
+            self.load_mapping.add(key, lighting_fixture.apparent_load, lighting_fixture.element_id)
+            affected_keys.add(key)
+        elif not lighting_fixture.has_connector:
+            self.load_mapping.fixtures_without_connector.append(lighting_fixture.element_id)
+        return self.devices_for_keys(affected_keys)
+
+    def remove_fixture(self, element_id):
+        """
+        Returns:
+            Set[Id inteiro] dos dispositivos afetados pela remoção da luminária.
+        """
+        return self.devices_for_keys(self._remove_fixture(element_id))
+
+    def _remove_fixture(self, element_id):
+        """
+        Retira a luminária do índice e subtrai a sua carga do comando, que é
+        descartado junto com a última luminária.
+        Returns:
+            Set[key] com o comando da luminária, vazio caso ela não fosse somada.
+        """
+        previous = self._fixtures.pop(element_id, None)
+        if previous is None:
+            return set()
+
+        key = previous[0]
+        if key is None:
+            if element_id in self.load_mapping.fixtures_without_connector:
+                self.load_mapping.fixtures_without_connector.remove(element_id)
+            return set()
+
+        entry = self.load_mapping.get(key)
+        entry.remove(previous[1], element_id)
+        if not entry.element_ids:
+            self.load_mapping.discard(key)
+        return {key}
+
+    def apply_fixture_changes(self, changed_fixtures=(), removed_element_ids=()):
+        """
+        Aplica um conjunto de alterações em O(luminárias alteradas): a carga de
+        cada comando afetado recebe apenas a diferença da luminária. A remoção de
+        uma luminária sem conector percorre fixtures_without_connector.
+        Args:
+            changed_fixtures: LightingFixture incluídas ou alteradas;
+            removed_element_ids: Ids inteiros das luminárias removidas.
+        Returns:
+            Set[Id inteiro] dos dispositivos afetados.
+        """
+        affected_devices = set()
+        for lighting_fixture in changed_fixtures:
+            affected_devices |= self.add_fixture(lighting_fixture)
+        for element_id in removed_element_ids:
+            affected_devices |= self.remove_fixture(element_id)
+        return affected_devices
+
+    def has_fixture(self, element_id):
+        return element_id in self._fixtures
+
+    def devices_for_keys(self, keys):
+        """
+        Returns:
+            Set[Id inteiro] dos dispositivos com Saídas nos comandos informados.
+        """
+        return {device_element_id for key in keys for device_element_id, _ in self._channels.get(key, ())}
+
+    def fixtures_for_channel(self, key):
+        """
+        Luminárias que carregam a Saída do comando informado.
+        Returns:
+            List[Id inteiro] na ordem em que foram somadas.
+        """
+        entry = self.load_mapping.get(key)
+        return list(entry.element_ids) if entry else []
+
+    def channels_for_fixture(self, element_id):
+        """
+        Saídas alimentadas pela luminária.
+        Returns:
+            List[(Id inteiro do dispositivo, número da Saída)]
+        """
+        key = self._fixtures.get(element_id, (None,))[0]
+        return list(self._channels.get(key, ())) if key is not None else []
+
+    def channel_fixture_ids(self, device):
+        """
+        Returns:
+            List[List[Id inteiro]] das luminárias de cada Saída do dispositivo, para os relatórios.
+        """
+        return [self.fixtures_for_channel(key) for key in self._device_keys.get(device.revit_element_id, ())]
+
+
+class LightingService:
+
+    @staticmethod
+    def sum_apparent_load_by_switch_id(lighting_objects_list):
+        """
+        Calcula a carga aparente total para cada switch_id.
+        Args:
+            lighting_objects_list: Iterável de LightingFixture, percorrido uma única vez
+        Returns:
+            LightingLoadIndex com a carga, quantidade de luminárias e ids de cada
+            comando indexados por (panel, circuit_number, switch_id). Luminárias
+            sem conector elétrico não são somadas e ficam em fixtures_without_connector.
+        """
+        load_mapping = LightingLoadIndex()
+        for lighting_fixture in lighting_objects_list:
+
+            if not lighting_fixture.has_connector:
+                load_mapping.fixtures_without_connector.append(lighting_fixture.element_id)
+                continue
+
+            channel_key = (lighting_fixture.panel, lighting_fixture.circuit_number, lighting_fixture.switch_id)
+            if "Nulo" in channel_key: continue
+
+            load_mapping.add(channel_key, lighting_fixture.apparent_load, lighting_fixture.element_id)
+
+        return load_mapping
+
+    @staticmethod
+    def compare_load_indexes(reference_mapping, candidate_mapping, circuits):
+        """
+        Compara as cargas de duas origens nos comandos dos circuitos informados.
+        Args:
+            reference_mapping: LightingLoadIndex da varredura completa;
+            candidate_mapping: LightingLoadIndex dos circuitos das Saídas;
+            circuits: Set[(painel, circuito)] percorridos pela origem por circuitos.
+        Returns:
+            List[(key, LightingLoadEntry ou None, LightingLoadEntry ou None)] divergentes, ordenada por key.
+        """
+        keys = {key for key, _ in reference_mapping if key[:2] in circuits}
+        keys.update(key for key, _ in candidate_mapping)
+
+        mismatches = []
+        for key in sorted(keys):
+            reference_entry = reference_mapping.get(key)
+            candidate_entry = candidate_mapping.get(key)
+            if reference_entry is not None and candidate_entry is not None:
+                if (abs(reference_entry.apparent_load - candidate_entry.apparent_load) < 1e-9
+                        and sorted(reference_entry.element_ids) == sorted(candidate_entry.element_ids)):
+                    continue
+            mismatches.append((key, reference_entry, candidate_entry))
+        return mismatches
+
+class BatchLoadValidator:
+    """
+    Versão vetorizada (NumPy) de BeyondService.check_dock_station_load e
+    check_output_channel_load. As cargas da Base e das Saídas de todos os
+    dispositivos são convertidas com um único fator e as regras avaliadas como
+    máscaras; as mensagens são montadas apenas para os dispositivos reprovados,
+    com o mesmo texto e a mesma ordem da verificação objeto a objeto. Os
+    limites e as severidades são os das regras do RulePlan.
+    """
+    NULL_SWITCH_ID = 0
+    RULE_NAMES = ("dock_station_load", "channel_load")
+
+    def __init__(self, beyond_devices, watts_factor, rule_plan=None):
+        """
+        Args:
+            beyond_devices: List[BeyondDevice] já validados com check_loads=False;
+            watts_factor: fator de conversão da unidade interna para Watts;
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        """
+        self.devices = beyond_devices
+        self.watts_factor = watts_factor
+        self.rule_plan = rule_plan or BeyondRules.default_plan()
+        self.switch_ids = ["Nulo"]
+        switch_id_codes = {"Nulo": self.NULL_SWITCH_ID}
+
+        loads = []
+        codes = []
+        connected = []
+        for device in beyond_devices:
+            connected.append(device.dock_station.has_connector)
+            channels = (device.output_channel_1, device.output_channel_2, device.output_channel_3)
+            loads.append([device.dock_station.apparent_load or 0] + [channel.apparent_load or 0 for channel in channels])
+
+            device_codes = []
+            for channel in channels:
+                code = switch_id_codes.get(channel.switch_id)
+                if code is None:
+                    code = switch_id_codes[channel.switch_id] = len(self.switch_ids)
+                    self.switch_ids.append(channel.switch_id)
+                device_codes.append(code)
+            codes.append(device_codes)
+
+        self.loads = np.array(loads, dtype=np.float64).reshape(len(beyond_devices), 4)
+        self.switch_id_codes = np.array(codes, dtype=np.int32).reshape(len(beyond_devices), 3)
+        self.dock_station_connected = np.array(connected, dtype=bool)
+
+    @staticmethod
+    def is_available():
+        return np is not None
+
+    @staticmethod
+    def validate_in_batches(verified_devices, watts_factor, batch_size, rule_plan=None):
+        """
+        Verifica as cargas em lotes de até batch_size dispositivos, mantendo
+        limitado o buffer da execução em fluxo.
+        Args:
+            verified_devices: iterável de (BeyondDevice, fingerprint, verificado), em que
+            'verificado' é False para os dispositivos restaurados do IncrementalState;
+            watts_factor: fator de conversão da unidade interna para Watts;
+            batch_size: quantidade de dispositivos por lote;
+            rule_plan: RulePlan da execução.
+        Yields:
+            (BeyondDevice, fingerprint, verificado), na ordem de entrada.
+        """
+        buffer = []
+        for verified_device in verified_devices:
+            buffer.append(verified_device)
+            if len(buffer) < batch_size: continue
+
+            yield from BatchLoadValidator._validate_buffer(buffer, watts_factor, rule_plan)
+            buffer = []
+
+        yield from BatchLoadValidator._validate_buffer(buffer, watts_factor, rule_plan)
+
+    @staticmethod
+    def _validate_buffer(buffer, watts_factor, rule_plan):
+        devices = [device for device, _, validated in buffer if validated]
+        if devices:
+            with PROFILER.phase("BeyondFactory"):
+                BatchLoadValidator(devices, watts_factor, rule_plan).validate()
+        return buffer
+
+    def validate(self):
+        """
+        Acrescenta as mensagens de carga às issues de cada dispositivo e atualiza
+        issue_flag. As regras de carga desabilitadas no plano não são avaliadas.
+        """
+        dock_station_rule, channel_rule = (self.rule_plan.rule(rule_name) for rule_name in self.RULE_NAMES)
+        watts = np.round(self.loads * self.watts_factor, 0)
+        dock_station_watts = watts[:, 0]
+        channel_watts = watts[:, 1:]
+
+        dock_station_checked = np.full(len(self.devices), dock_station_rule is not None)
+        dock_station_missing = dock_station_checked & ~self.dock_station_connected
+        dock_station_null = dock_station_checked & self.dock_station_connected & (dock_station_watts == 0)
+        dock_station_exceeded = dock_station_checked & self.dock_station_connected & (
+            dock_station_watts > (dock_station_rule.thresholds["max_load"] if dock_station_rule else 0)
+        )
+
+        channel_checked = np.full(self.switch_id_codes.shape, channel_rule is not None)
+        switch_id_missing = channel_checked & (self.switch_id_codes == self.NULL_SWITCH_ID)
+        channel_null = channel_checked & ~switch_id_missing & (channel_watts == 0)
+        channel_exceeded = channel_checked & (channel_watts > (channel_rule.thresholds["max_load"] if channel_rule else 0))
+        channel_failed = switch_id_missing | channel_null | channel_exceeded
+
+        failed_rows = np.flatnonzero(dock_station_missing | dock_station_null | dock_station_exceeded | channel_failed.any(axis=1))
+
+        for row in failed_rows.tolist():
+            device = self.devices[row]
+            if dock_station_missing[row]:
+                device.service.add_issue("Tomada sem conector elétrico", IssueCode.DOCK_STATION_NO_CONNECTOR, severity=dock_station_rule.severity)
+            if dock_station_null[row]:
+                device.service.add_issue("Tomada com carga nula", IssueCode.DOCK_STATION_NULL_LOAD, severity=dock_station_rule.severity)
+            if dock_station_exceeded[row]:
+                device.service.add_issue("Tomada com carga excedida", IssueCode.DOCK_STATION_OVERLOAD, severity=dock_station_rule.severity)
+
+            channels = (device.output_channel_1, device.output_channel_2, device.output_channel_3)
+            for column, channel in enumerate(channels):
+                if not channel_failed[row, column]: continue
+
+                switch_id = self.switch_ids[self.switch_id_codes[row, column]]
+                apparent_load = float(channel_watts[row, column])
+                message = [f"{channel}:"]
+                codes = []
+                if switch_id_missing[row, column]:
+                    message.append("ID não atribuído")
+                    codes.append(IssueCode.SWITCH_ID_MISSING)
+                if channel_null[row, column]:
+                    message.append(f"ID({switch_id}) carga nula")
+                    codes.append(IssueCode.CHANNEL_NULL_LOAD)
+                if channel_exceeded[row, column]:
+                    message.append(f"ID({switch_id}) {apparent_load}VA")
+                    codes.append(IssueCode.CHANNEL_OVERLOAD)
+                device.service.add_issue(" ".join(message), *codes, channel_number=column + 1, severity=channel_rule.severity)
+
+        for device in self.devices:
+            device.service.set_issue_flag()
+
+
+class AuditSummary:
+    """
+    Resumo de uma auditoria em lote: contagens por modelo, reduzidas nos
+    processos de validação a dicionários serializáveis, e a agregação de todos
+    os modelos com as issues por código e os painéis com mais problemas.
+    """
+    FILE_NAME = "beyond_batch_summary"
+    WORST_PANELS = 10
+
+    @staticmethod
+    def model_result(beyond_devices):
+        """
+        Args:
+            beyond_devices: List[BeyondDevice] verificados de um modelo.
+        Returns:
+            {'devices', 'faulty_devices', 'issue_codes': {código: n}, 'panels': {painel: {'devices', 'faulty_devices', 'issues'}}}
+        """
+        issue_codes = defaultdict(int)
+        panels = {}
+        faulty_devices = 0
+        for device in beyond_devices or []:
+            panel = panels.setdefault(str(device.panel), {"devices": 0, "faulty_devices": 0, "issues": 0})
+            panel["devices"] += 1
+            panel["issues"] += len(device.issue_codes)
+            if device.issue_flag:
+                panel["faulty_devices"] += 1
+                faulty_devices += 1
+            for issue_code in device.issue_codes:
+                issue_codes[issue_code["code"]] += 1
+
+        return {
+            "devices"        : sum(panel["devices"] for panel in panels.values()),
+            "faulty_devices" : faulty_devices,
+            "issue_codes"    : dict(sorted(issue_codes.items())),
+            "panels"         : panels,
+        }
+
+    @staticmethod
+    def aggregate(model_results, worst_panels=WORST_PANELS):
+        """
+        Args:
+            model_results: {nome do modelo: model_result}, na ordem do manifesto.
+        Returns:
+            Totais, issues por código e os worst_panels painéis com mais issues.
+        """
+        issue_codes = defaultdict(int)
+        panels = []
+        for model_name, result in model_results.items():
+            for issue_code, count in result["issue_codes"].items():
+                issue_codes[issue_code] += count
+            for panel_name, panel in result["panels"].items():
+                if panel["issues"]:
+                    panels.append(dict(model=model_name, panel=panel_name, **panel))
+
+        panels.sort(key=lambda panel: (-panel["issues"], -panel["faulty_devices"], panel["model"], panel["panel"]))
+        return {
+            "models"         : len(model_results),
+            "faulty_models"  : sum(1 for result in model_results.values() if result["faulty_devices"]),
+            "devices"        : sum(result["devices"] for result in model_results.values()),
+            "faulty_devices" : sum(result["faulty_devices"] for result in model_results.values()),
+            "issue_codes"    : dict(sorted(issue_codes.items(), key=lambda item: (-item[1], item[0]))),
+            "worst_panels"   : panels[:worst_panels],
+        }
+
+    @staticmethod
+    def format_text(summary, model_results, failed_models):
+        """
+        Returns:
+            Resumo da auditoria em texto, com uma linha por modelo.
+        """
+        lines = [
+            f"Auditoria Beyond em lote - {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}",
+            f"Modelos: {summary['models']} ({summary['faulty_models']} com problemas, {len(failed_models)} com falha)",
+            f"Dispositivos: {summary['devices']} ({summary['faulty_devices']} com problemas)",
+            "",
+            "Modelos:",
+        ]
+        for model_name, result in model_results.items():
+            lines.append(f"  {model_name}: {result['devices']} dispositivo(s), {result['faulty_devices']} com problemas")
+        for model_name, error in failed_models.items():
+            lines.append(f"  {model_name}: falha - {error}")
+
+        lines += ["", "Issues por tipo:"]
+        lines += [f"  {issue_code}: {count}" for issue_code, count in summary["issue_codes"].items()] or ["  Nenhuma"]
+
+        lines += ["", "Painéis com mais problemas:"]
+        lines += [
+            f"  {panel['model']} / {panel['panel']}: {panel['issues']} issue(s) em {panel['faulty_devices']} de {panel['devices']} dispositivo(s)"
+            for panel in summary["worst_panels"]
+        ] or ["  Nenhum"]
+        return "\n".join(lines) + "\n"
+
+
+class ChangeDebouncer:
+    """
+    Acumula as alterações de uma sequência de edições e as libera em conjunto
+    quando o modelo permanece sem alterações por quiet_seconds, ou após
+    max_delay_seconds desde a primeira alteração pendente, mesmo com edições contínuas.
+    """
+    def __init__(self, quiet_seconds=0.5, max_delay_seconds=2.0, clock=time.monotonic):
+        """
+        Args:
+            clock: relógio em segundos, substituível nos testes e benchmarks.
+        """
+        self.quiet_seconds = quiet_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.clock = clock
+        self._reset()
+
+    def _reset(self):
+        self.added_ids = set()
+        self.modified_ids = set()
+        self.deleted_ids = set()
+        self._first_change = None
+        self._last_change = None
+
+    @property
+    def pending(self):
+        return self._first_change is not None
+
+    def add(self, model_change):
+        """
+        Acumula um ModelChange. Um elemento removido deixa de constar como incluído ou alterado.
+        """
+        now = self.clock()
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+
+        self.added_ids |= model_change.added_ids
+        self.modified_ids |= model_change.modified_ids
+        self.deleted_ids |= model_change.deleted_ids
+        self.added_ids -= model_change.deleted_ids
+        self.modified_ids -= model_change.deleted_ids
+
+    def is_due(self):
+        """
+        Returns:
+            True caso as alterações pendentes devam ser liberadas.
+        """
+        if not self.pending:
+            return False
+        now = self.clock()
+        return now - self._last_change >= self.quiet_seconds or now - self._first_change >= self.max_delay_seconds
+
+    def take(self):
+        """
+        Returns:
+            ModelChange com as alterações acumuladas, esvaziando o acumulador.
+        """
+        model_change = ModelChange(self.added_ids, self.modified_ids, self.deleted_ids)
+        self._reset()
+        return model_change
+
+
+
+class ValidationResultIndex:
+    """
+    Índice em memória dos resultados da verificação, retornado pela execução
+    para os nós seguintes do grafo do Dynamo. Cada campo de consulta é um
+    dicionário {valor: set dos Ids dos dispositivos}, construído à medida que
+    os dispositivos são verificados; as consultas combinam os conjuntos por
+    interseção, a partir do menor, sem percorrer os dispositivos. Os campos
+    de PARTITIONED_FIELDS também são particionados por issue_flag, e consultas
+    como find(panel="QD-3", issue_flag=True) leem um único conjunto.
+    Apenas os valores indexados são mantidos por dispositivo; o registro
+    completo (DeviceReportRecord) é gravado nos relatórios jsonl e csv.
+    """
+    FIELDS = ("device_id", "panel", "circuit_number", "switch_id", "space_or_room", "issue_code", "issue_flag")
+    # Campos com muitos dispositivos por valor; device_id e switch_id selecionam poucos Ids sem a partição.
+    PARTITIONED_FIELDS = ("panel", "circuit_number", "space_or_room", "issue_code")
+    _EMPTY = frozenset()
+
+    def __init__(self):
+        self._indexes = {field: {} for field in self.FIELDS}
+        self._flag_indexes = {flag: {field: {} for field in self.PARTITIONED_FIELDS} for flag in (True, False)}
+        self._device_values = {}
+        self._issue_flags = {}
+        self._project_issue_codes = {}
+        self._revit_element_ids = {}
+
+    def __len__(self):
+        return len(self._issue_flags)
+
+    def __contains__(self, element_id):
+        return element_id in self._issue_flags
+
+    @classmethod
+    def build(cls, beyond_devices, project_issues=()):
+        result_index = cls()
+        for device in beyond_devices:
+            result_index.add_device(device)
+        result_index.add_project_issues(project_issues)
+        return result_index
+
+    def _field_values(self, device):
+        """
+        Returns:
+            {campo: valores do dispositivo}, sem repetições e na ordem das Saídas e das issues.
+        """
+        channels = (device.output_channel_1, device.output_channel_2, device.output_channel_3)
+        issue_codes = dict.fromkeys(issue_code["code"] for issue_code in device.issue_codes)
+        issue_codes.update(dict.fromkeys(sorted(self._project_issue_codes.get(device.revit_element_id, self._EMPTY))))
+        return {
+            "device_id"      : (device.device_id,),
+            "panel"          : (device.panel,),
+            "circuit_number" : (device.circuit_number,),
+            "switch_id"      : tuple(dict.fromkeys(channel.switch_id for channel in channels)),
+            "space_or_room"  : (device.space_or_room,),
+            "issue_code"     : tuple(issue_codes),
+            "issue_flag"     : (device.issue_flag,),
+        }
+
+    def add_device(self, device):
+        """
+        Indexa o resultado do dispositivo, substituindo o anterior, como após
+        uma descarga da verificação contínua.
+        """
+        element_id = device.revit_element_id
+        self._unindex(element_id)
+        self._issue_flags[element_id] = device.issue_flag
+        self._index(element_id, self._field_values(device))
+
+    def remove_device(self, element_id):
+        self._unindex(element_id)
+        self._issue_flags.pop(element_id, None)
+        self._project_issue_codes.pop(element_id, None)
+
+    def update(self, verified_devices, removed_device_ids=()):
+        """
+        Aplica uma descarga do LiveVerifier (on_update). As issues entre
+        dispositivos são as da última verificação completa.
+        """
+        for element_id in removed_device_ids:
+            self.remove_device(element_id)
+        for device in verified_devices:
+            self.add_device(device)
+
+    def add_project_issues(self, project_issues):
+        """
+        Acrescenta o código de cada ProjectIssue aos dispositivos das suas Saídas,
+        consultáveis por issue_code.
+        """
+        for project_issue in project_issues or ():
+            for element_id, _, _ in project_issue.channels:
+                if element_id not in self._issue_flags: continue
+                project_issue_codes = self._project_issue_codes.setdefault(element_id, set())
+                if project_issue.code in project_issue_codes: continue
+                project_issue_codes.add(project_issue.code)
+                self._index(element_id, {"issue_code": (project_issue.code,)})
+
+    def _index(self, element_id, field_values):
+        device_values = self._device_values.setdefault(element_id, [])
+        flag_indexes = self._flag_indexes[self._issue_flags[element_id]]
+        for field, values in field_values.items():
+            for value in values:
+                if (field, value) in device_values: continue
+                self._indexes[field].setdefault(value, set()).add(element_id)
+                if field in flag_indexes:
+                    flag_indexes[field].setdefault(value, set()).add(element_id)
+                device_values.append((field, value))
+
+    def _unindex(self, element_id):
+        device_values = self._device_values.pop(element_id, ())
+        if not device_values:
+            return
+        flag_indexes = self._flag_indexes[self._issue_flags[element_id]]
+        for field, value in device_values:
+            for indexes in (self._indexes, flag_indexes):
+                if field not in indexes: continue
+                element_ids = indexes[field].get(value)
+                if element_ids is None: continue
+                element_ids.discard(element_id)
+                if not element_ids:
+                    del indexes[field][value]
+
+    def get(self, element_id):
+        """
+        Returns:
+            {campo: valor} dos campos indexados do dispositivo, com as listas
+            switch_id e issue_code, ou None caso ele não esteja no índice.
+        """
+        device_values = self._device_values.get(element_id)
+        if device_values is None:
+            return None
+        values = {"element_id": element_id, "switch_id": [], "issue_code": []}
+        for field, value in device_values:
+            if field in ("switch_id", "issue_code"):
+                values[field].append(value)
+            else:
+                values[field] = value
+        return values
+
+    def get_by_device_id(self, device_id):
+        element_ids = self._indexes["device_id"].get(device_id)
+        return self.get(min(element_ids)) if element_ids else None
+
+    def values(self, field):
+        """
+        Returns:
+            valores indexados do campo, como os painéis ou espaços do modelo.
+        """
+        return list(self._indexes[field])
+
+    def find(self, **filters):
+        """
+        Args:
+            filters: campo=valor, com os campos de FIELDS. Uma list, tuple ou set
+            seleciona qualquer um dos valores; campos diferentes são combinados
+            por interseção, ex.: find(panel="QD-3", issue_flag=True).
+        Returns:
+            set dos Ids inteiros dos dispositivos; sem filtros, todos.
+        Raises:
+            ValueError: caso algum campo não seja consultável.
+        """
+        flag_indexes = {}
+        issue_flag = filters.get("issue_flag")
+        if isinstance(issue_flag, bool) and any(field in self.PARTITIONED_FIELDS for field in filters):
+            flag_indexes = self._flag_indexes[issue_flag]
+            filters = {field: value for field, value in filters.items() if field != "issue_flag"}
+
+        matches = []
+        for field, value in filters.items():
+            index = flag_indexes[field] if field in flag_indexes else self._indexes.get(field)
+            if index is None:
+                raise ValueError(f"Campo de consulta desconhecido: {field}. Campos: {', '.join(self.FIELDS)}")
+            if isinstance(value, (list, tuple, set, frozenset)):
+                matches.append(set().union(*(index.get(item, self._EMPTY) for item in value)))
+            else:
+                matches.append(index.get(value, self._EMPTY))
+
+        if not matches:
+            return set(self._issue_flags)
+        matches.sort(key=len)
+        return matches[0].intersection(*matches[1:]) if matches[0] else set()
+
+    def element_ids(self, **filters):
+        """
+        Returns:
+            List[ElementId] dos dispositivos de find(**filters), em ordem de Id,
+            para seleção ou isolamento na vista.
+        """
+        revit_element_ids = self._revit_element_ids
+        element_ids = []
+        for element_id in sorted(self.find(**filters)):
+            revit_element_id = revit_element_ids.get(element_id)
+            if revit_element_id is None:
+                revit_element_id = revit_element_ids[element_id] = ElementId(element_id)
+            element_ids.append(revit_element_id)
+        return element_ids
+
+
+#===================================================================================================================
+#==========================         DOMAIN SERVICE           =======================================================
+#===================================================================================================================
+
+class IssueCode:
+    """
+    Códigos estruturados das issues, gravados nos relatórios JSONL/CSV ao lado
+    das mensagens em português do relatório de texto.
+    """
+    PANEL_DIVERGENCE = "PANEL_DIVERGENCE"
+    PANEL_DISCONNECTED = "PANEL_DISCONNECTED"
+    CIRCUIT_DIVERGENCE = "CIRCUIT_DIVERGENCE"
+    CIRCUIT_DISCONNECTED = "CIRCUIT_DISCONNECTED"
+    DOCK_STATION_NULL_LOAD = "DOCK_STATION_NULL_LOAD"
+    DOCK_STATION_OVERLOAD = "DOCK_STATION_OVERLOAD"
+    DOCK_STATION_NO_CONNECTOR = "DOCK_STATION_NO_CONNECTOR"
+    DOCK_STATION_MISSING = "DOCK_STATION_MISSING"
+    CHANNEL_MISSING = "CHANNEL_MISSING"
+    SWITCH_ID_MISSING = "SWITCH_ID_MISSING"
+    CHANNEL_NULL_LOAD = "CHANNEL_NULL_LOAD"
+    CHANNEL_OVERLOAD = "CHANNEL_OVERLOAD"
+    SWITCH_ID_CONFLICT = "SWITCH_ID_CONFLICT"
+    ORPHAN_FIXTURES = "ORPHAN_FIXTURES"
+    ORPHAN_CHANNEL = "ORPHAN_CHANNEL"
+
+    @staticmethod
+    def entry(code, channel_number=None, severity=None):
+        """
+        Returns:
+            {"code": código}, acrescido de "channel" (número da Saída) e de
+            "severity" para as issues com severidade diferente de Severity.ERROR.
+        """
+        issue_code = {"code": code}
+        if channel_number is not None:
+            issue_code["channel"] = channel_number
+        if severity is not None and severity != Severity.ERROR:
+            issue_code["severity"] = severity
+        return issue_code
+
+    @staticmethod
+    def severity(issue_code):
+        return issue_code.get("severity", Severity.ERROR)
+
+
+class Severity:
+    """
+    Severidade das regras. Apenas as issues com Severity.ERROR atualizam
+    issue_flag; as demais são registradas nos relatórios.
+    """
+    ERROR = "error"
+    WARNING = "warning"
+    INFO = "info"
+
+
+class ProjectIssue(namedtuple("ProjectIssue", ("code", "severity", "key", "channels", "fixture_ids"))):
+    """
+    Issue entre dispositivos, associada a um comando (panel, circuit_number, switch_id)
+    e não a um único dispositivo.
+    channels: tuple de (Id inteiro do dispositivo, device_id, número da Saída);
+    fixture_ids: tuple dos Ids inteiros das luminárias do comando.
+    """
+    __slots__ = ()
+
+    def to_record(self):
+        """
+        Returns:
+            dict gravado na linha {"project_issue": ...} do relatório JSONL.
+        """
+        panel, circuit_number, switch_id = self.key
+        return {
+            "code"           : self.code,
+            "severity"       : self.severity,
+            "panel"          : panel,
+            "circuit_number" : circuit_number,
+            "switch_id"      : switch_id,
+            "channels"       : [{"element_id": element_id, "device_id": device_id, "channel": channel_number}
+                                for element_id, device_id, channel_number in self.channels],
+            "fixture_ids"    : list(self.fixture_ids),
+        }
+
+
+class SwitchIdConsistencyCheck:
+    """
+    Verificação dos comandos entre todos os dispositivos do modelo, com um
+    índice hash das Saídas por (panel, circuit_number, switch_id) confrontado
+    com o LightingLoadIndex das luminárias. Cada Saída e cada comando são
+    visitados uma vez, em tempo linear:
+        SWITCH_ID_CONFLICT: comando atribuído a mais de uma Saída, cuja carga é contada em cada uma;
+        ORPHAN_CHANNEL: Saída cujo comando não possui luminárias;
+        ORPHAN_FIXTURES: comando com luminárias sem Saída Beyond.
+    Os comandos incompletos ou não resolvidos já são reportados em cada
+    dispositivo e não são considerados.
+    """
+    UNRESOLVED_VALUES = (None, "", "Nulo", "Divergência no painel", "Divergência no circuito", "Desconectado")
+    SEVERITIES = {
+        IssueCode.SWITCH_ID_CONFLICT : Severity.ERROR,
+        IssueCode.ORPHAN_CHANNEL     : Severity.WARNING,
+        IssueCode.ORPHAN_FIXTURES    : Severity.INFO,
+    }
+
+    def __init__(self):
+        self._channels = {}
+
+    @classmethod
+    def build(cls, beyond_devices):
+        consistency_check = cls()
+        for device in beyond_devices:
+            consistency_check.add_device(device)
+        return consistency_check
+
+    def add_device(self, device):
+        """
+        Indexa as Saídas do dispositivo, chamado à medida que os dispositivos são verificados.
+        """
+        channels = [device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        for channel_number, channel in enumerate(channels, start=1):
+            key = (channel.panel, channel.circuit_number, channel.switch_id)
+            if any(value in self.UNRESOLVED_VALUES for value in key): continue
+            self._channels.setdefault(key, []).append((device.revit_element_id, device.device_id, channel_number))
+
+    def _issue(self, code, key, channels=(), fixture_ids=()):
+        return ProjectIssue(code, self.SEVERITIES[code], key, tuple(channels), tuple(fixture_ids))
+
+    def check(self, lighting_load_mapping):
+        """
+        Args:
+            lighting_load_mapping: LightingLoadIndex de todas as luminárias do modelo.
+        Returns:
+            List[ProjectIssue]: conflitos e Saídas órfãs na ordem de verificação dos
+            dispositivos, seguidos dos comandos órfãos na ordem do menor Id das suas
+            luminárias, independente da ordem de lighting_load_mapping, que difere
+            entre a verificação serial e a paralela.
+        """
+        project_issues = []
+        for key, channels in self._channels.items():
+            entry = lighting_load_mapping.get(key)
+            if entry is None:
+                project_issues.extend(self._issue(IssueCode.ORPHAN_CHANNEL, key, [channel]) for channel in channels)
+            if len(channels) > 1:
+                project_issues.append(self._issue(IssueCode.SWITCH_ID_CONFLICT, key, channels, entry.element_ids if entry else ()))
+
+        orphan_entries = sorted(
+            ((key, entry) for key, entry in lighting_load_mapping if key not in self._channels),
+            key=lambda item: min(item[1].element_ids, default=-1)
+        )
+        project_issues.extend(self._issue(IssueCode.ORPHAN_FIXTURES, key, fixture_ids=entry.element_ids) for key, entry in orphan_entries)
+        return project_issues
+
+
+class BeyondService:
+
+    """
+    Contém a lógica de dados, comportamentos e validações para BeyondDevice.
+    """
+    __slots__ = ("instance",)
+
+    def __init__(self, beyond_object):
+        """
+        Define um objeto Service para a instância de BeyondDevice
+        """
+        self.instance = beyond_object
+
+    def add_issue(self, message, *codes, channel_number=None, severity=None):
+        """
+        Registra a mensagem em issues e os respectivos códigos em issue_codes.
+        Args:
+            message: mensagem do relatório de texto;
+            codes: IssueCode da mensagem;
+            channel_number: 1 || 2 || 3 para as issues de uma Saída;
+            severity: Severity da regra, por padrão Severity.ERROR.
+        """
+        self.instance.issues.append(message)
+        self.instance.issue_codes.extend(IssueCode.entry(code, channel_number, severity) for code in codes)
+
+    def set_issue_flag(self):
+        """
+        Atualiza a propriedade issue_flag com as issues de severidade Severity.ERROR.
+        """
+        if any(IssueCode.severity(issue_code) == Severity.ERROR for issue_code in self.instance.issue_codes):
+            self.instance.issue_flag = True
+        return
+
+    def resolve_device_panel(self):
+        """
+        Compara todos os valores de painel atribuídos pelo projetista para um mesmo dispositivo
+        (4 conectoers elétricos na família) e atribui o painel do dispositivo, ou o valor
+        indicativo da divergência ou da desconexão.
+        """
+        channels_panel = [self.instance.output_channel_1.panel, self.instance.output_channel_2.panel, self.instance.output_channel_3.panel]
+        dock_station_panel = self.instance.dock_station.panel
+
+        if any(panel != dock_station_panel for panel in channels_panel):
+            self.instance.panel = "Divergência no painel"
+        elif dock_station_panel == "Nulo":
+            self.instance.panel = "Desconectado"
+        else:
+            self.instance.panel = dock_station_panel
+
+    def check_device_panel(self, severity=None):
+        """
+        Reporta a divergência ou a desconexão do painel atribuído por resolve_device_panel.
+        """
+        if self.instance.panel == "Divergência no painel":
+            self.add_issue("Divergência no painel", IssueCode.PANEL_DIVERGENCE, severity=severity)
+        elif self.instance.panel == "Desconectado":
+            self.add_issue("Painel desconectado", IssueCode.PANEL_DISCONNECTED, severity=severity)
+
+    def resolve_device_circuit(self):
+        """
+        Compara todos os circuitos atribuídos pelo projetista para um mesmo dispositivo
+        (4 conectoers elétricos na família) e atribui o circuito do dispositivo, ou o valor
+        indicativo da divergência ou da desconexão.
+        """
+        channels_circuit = [self.instance.output_channel_1.circuit_number, self.instance.output_channel_2.circuit_number, self.instance.output_channel_3.circuit_number]
+        dock_station_circuit = self.instance.dock_station.circuit_number
+
+        if any(circuit != dock_station_circuit for circuit in channels_circuit):
+            self.instance.circuit_number = "Divergência no circuito"
+        elif dock_station_circuit == "Nulo":
+            self.instance.circuit_number = "Desconectado"
+        else:
+            self.instance.circuit_number = dock_station_circuit
+
+    def check_device_circuit(self, severity=None):
+        """
+        Reporta a divergência ou a desconexão do circuito atribuído por resolve_device_circuit.
+        """
+        if self.instance.circuit_number == "Divergência no circuito":
+            self.add_issue("Divergência no circuito", IssueCode.CIRCUIT_DIVERGENCE, severity=severity)
+        elif self.instance.circuit_number == "Desconectado":
+            self.add_issue("Circuito desconectado", IssueCode.CIRCUIT_DISCONNECTED, severity=severity)
+
+    def check_components(self):
+        """
+        Reporta a Base e as Saídas ausentes na família, substituídas por
+        registros com valores 'Nulo' em BeyondDevice.set_components.
+        """
+        if self.instance.dock_station.element_id == BeyondDevice.MISSING_COMPONENT_ID:
+            self.add_issue(f"{NestedFamilyIndex.DOCK_STATION} ausente", IssueCode.DOCK_STATION_MISSING)
+
+        channels = [self.instance.output_channel_1, self.instance.output_channel_2, self.instance.output_channel_3]
+        for channel_number, channel in enumerate(channels, start=1):
+            if channel.element_id == BeyondDevice.MISSING_COMPONENT_ID:
+                self.add_issue(f"{channel} ausente", IssueCode.CHANNEL_MISSING, channel_number=channel_number)
+
+    def check_output_channel_load(self, channel_number, max_load=100, severity=None):
+        """
+        Verifica a carga aparente associada a cada canal de saída da beyond.
+        Args:
+            channel_number : 1 || 2 || 3;
+            max_load: carga máxima da Saída, em VA;
+            severity: Severity da regra.
+        """
+        channels = {
+            1: self.instance.output_channel_1,
+            2: self.instance.output_channel_2,
+            3: self.instance.output_channel_3
+        }
+        channel = channels.get(channel_number)
+        apparent_load = self.instance.units.convert_to_watts(channel.apparent_load)
+        switch_id = channel.switch_id
+        message = []
+        codes = []
+
+        if switch_id == "Nulo":
+            message.append("ID não atribuído")
+            codes.append(IssueCode.SWITCH_ID_MISSING)
+
+        if switch_id != "Nulo" and apparent_load == 0:
+            message.append(f"ID({switch_id}) carga nula")
+            codes.append(IssueCode.CHANNEL_NULL_LOAD)
+
+        if apparent_load > max_load:
+            message.append(f"ID({switch_id}) {apparent_load}VA")
+            codes.append(IssueCode.CHANNEL_OVERLOAD)
+
+        if message:
+            channel_name = str(channel)
+            message.insert(0, f"{channel_name}:")
+            self.add_issue(" ".join(message), *codes, channel_number=channel_number, severity=severity)
+
+    def check_dock_station_load(self, max_load=100, severity=None):
+        """
+        Verifica a carga aparente da tomada Beyond. Sem conector elétrico, a
+        carga não pode ser lida e a ausência do conector é reportada.
+        Args:
+            max_load: carga máxima da Base, em VA;
+            severity: Severity da regra.
+        """
+        if not self.instance.dock_station.has_connector:
+            self.add_issue("Tomada sem conector elétrico", IssueCode.DOCK_STATION_NO_CONNECTOR, severity=severity)
+            return
+
+        dock_station_load = self.instance.units.convert_to_watts(self.instance.dock_station.apparent_load or 0)
+        if dock_station_load == 0:
+            self.add_issue("Tomada com carga nula", IssueCode.DOCK_STATION_NULL_LOAD, severity=severity)
+        
+        if dock_station_load > max_load:
+            self.add_issue("Tomada com carga excedida", IssueCode.DOCK_STATION_OVERLOAD, severity=severity)
+        
+        return
+          
+    def assign_apparent_load_to_channel(self, channel_number, lighting_load_mapping):
+        """
+        Atribui a carga aparente calculada correspondente ao canal de saída.
+        Args:
+            channel_number : 1 || 2 || 3;
+            lighting_load_mapping : LightingLoadIndex retornado por get_apparent_load_by_switch_id(light_objects).
+        """
+        channels = {
+            1: self.instance.output_channel_1,
+            2: self.instance.output_channel_2,
+            3: self.instance.output_channel_3
+        }
+        channel = channels.get(channel_number)
+        key = (channel.panel, channel.circuit_number, channel.switch_id)
+        error_values = ["Nulo", "Divergência no painel", "Divergência no circuito", "Desconectado"]
+
+        if not lighting_load_mapping:
+            self.instance.set_channel_apparent_load(channel_number, 0)
+            return
+        
+        for error in error_values:
+            if any(e == error for e in key): 
+                self.instance.set_channel_apparent_load(channel_number, 0)
+                return
+
+        entry = lighting_load_mapping.get(key)
+        if entry is not None:
+            self.instance.set_channel_apparent_load(channel_number, entry.apparent_load)
+
+    def group_switch_ids(self):
+        """
+        Retorna uma string dos ids de interruptores para cada dispositivo Beyond.
+        Returns:
+            switch_ids(string): [a, Nulo, c]
+        """
+        ids_list = [self.instance.output_channel_1.switch_id, self.instance.output_channel_2.switch_id, self.instance.output_channel_3.switch_id]
+        formatted_ids = "[" + ", ".join(ids_list) + "]"
+        
+        return formatted_ids
+       
+    def get_space_or_room(self, space_room_resolver):
+        """
+        Verifica se há Espaço ou Ambiente associado a família
+        Args:
+            space_room_resolver: SpaceRoomResolver da execução ou SnapshotSpaceRoomResolver.
+        Returns:
+            valid_value(string): O nome do Espaço, Ambiente ou Mensagem indicaiva de valor Nulo.
+        """
+        return space_room_resolver.get_space_or_room(self.instance.family_instance)
+
+
+class RuleInput:
+    """
+    Entradas declaradas pelas regras. As entradas de parâmetro são lidas da
+    Base e das Saídas por ElectricalData, as de contexto são fornecidas pela
+    execução e as demais são produzidas por outras regras (Rule.outputs).
+    """
+    DOCK_STATION_PANEL = "dock_station.panel"
+    DOCK_STATION_CIRCUIT = "dock_station.circuit_number"
+    DOCK_STATION_VOLTAGE = "dock_station.voltage"
+    DOCK_STATION_POLES = "dock_station.number_of_poles"
+    DOCK_STATION_LOAD = "dock_station.apparent_load"
+    DOCK_STATION_CONNECTOR = "dock_station.has_connector"
+    CHANNEL_PANEL = "output_channel.panel"
+    CHANNEL_CIRCUIT = "output_channel.circuit_number"
+    CHANNEL_SWITCH_ID = "output_channel.switch_id"
+    CHANNEL_LOAD = "output_channel.apparent_load"
+    LIGHTING_LOADS = "lighting_loads"
+    PANEL = "panel"
+    CIRCUIT = "circuit_number"
+    GROUPED_SWITCH_ID = "grouped_switch_id"
+    SPACE_OR_ROOM = "space_or_room"
+
+    DOCK_STATION = "dock_station"
+    OUTPUT_CHANNEL = "output_channel"
+
+    # Entrada de parâmetro -> (componente, chave de ElectricalData)
+    PARAMETERS = {
+        DOCK_STATION_PANEL     : (DOCK_STATION, "panel"),
+        DOCK_STATION_CIRCUIT   : (DOCK_STATION, "circuit_number"),
+        DOCK_STATION_VOLTAGE   : (DOCK_STATION, "voltage"),
+        DOCK_STATION_POLES     : (DOCK_STATION, "number_of_poles"),
+        DOCK_STATION_LOAD      : (DOCK_STATION, "apparent_load"),
+        DOCK_STATION_CONNECTOR : (DOCK_STATION, "has_connector"),
+        CHANNEL_PANEL          : (OUTPUT_CHANNEL, "panel"),
+        CHANNEL_CIRCUIT        : (OUTPUT_CHANNEL, "circuit_number"),
+        CHANNEL_SWITCH_ID      : (OUTPUT_CHANNEL, "switch_id"),
+    }
+    CONTEXT = (LIGHTING_LOADS,)
+
+    # Parâmetro de BeyondParameterWriter.PARAMETER_NAMES -> entradas do valor escrito e gravado nos relatórios
+    WRITE_BACK_VALUES = {
+        "Beyond.LocalDeInstalação"                  : (SPACE_OR_ROOM,),
+        "Beyond.IDObjeto"                           : (),
+        "Beyond.IDComandos"                         : (GROUPED_SWITCH_ID,),
+        "Beyond.NúmeroDoCircuito"                   : (CIRCUIT,),
+        "Beyond.PainelDistribuição"                 : (PANEL,),
+        "Beyond.Voltagem"                           : (DOCK_STATION_VOLTAGE,),
+        "Beyond.NúmeroDePolos"                      : (DOCK_STATION_POLES,),
+        "Beyond.Iluminação.PotênciaAparente.Saída1" : (CHANNEL_LOAD,),
+        "Beyond.Iluminação.PotênciaAparente.Saída2" : (CHANNEL_LOAD,),
+        "Beyond.Iluminação.PotênciaAparente.Saída3" : (CHANNEL_LOAD,),
+    }
+
+    @staticmethod
+    def is_available(rule_input):
+        """
+        Returns:
+            True para as entradas de parâmetro e de contexto, que não dependem de outra regra.
+        """
+        return rule_input in RuleInput.PARAMETERS or rule_input in RuleInput.CONTEXT
+
+    @staticmethod
+    def write_back_values(parameter_names):
+        """
+        Args:
+            parameter_names: parâmetros escritos, entre BeyondParameterWriter.PARAMETER_NAMES.
+        Returns:
+            Tuple das entradas exigidas para calcular os valores desses parâmetros.
+        Raises:
+            ValueError: caso um parâmetro não seja escrito pelo BeyondParameterWriter.
+        """
+        required_inputs = []
+        for parameter_name in parameter_names:
+            if parameter_name not in RuleInput.WRITE_BACK_VALUES:
+                raise ValueError(f"Parâmetro desconhecido: {parameter_name}")
+            required_inputs.extend(
+                rule_input for rule_input in RuleInput.WRITE_BACK_VALUES[parameter_name] if rule_input not in required_inputs
+            )
+        return tuple(required_inputs)
+
+
+RuleContext = namedtuple("RuleContext", ("lighting_load_mapping", "space_room_resolver"))
+
+
+class Rule:
+    """
+    Regra declarativa de verificação do BeyondDevice.
+    A função check(service, rule, context) recebe o BeyondService do
+    dispositivo, a própria regra (severity e thresholds) e o RuleContext.
+    Para a verificação paralela, check deve ser uma função de módulo ou de
+    classe, e não uma lambda.
+    """
+    __slots__ = ("name", "check", "inputs", "outputs", "severity", "thresholds", "enabled")
+
+    def __init__(self, name, check, inputs=(), outputs=(), severity=Severity.ERROR, thresholds=None, enabled=True):
+        """
+        Args:
+            name: nome único da regra no RuleRegistry;
+            check: função check(service, rule, context);
+            inputs: RuleInput lidos pela regra;
+            outputs: RuleInput produzidos pela regra para as regras seguintes;
+            severity: Severity das issues registradas;
+            thresholds: {nome: valor} dos limites usados pela regra;
+            enabled: False para registrar a regra desabilitada.
+        """
+        self.name = name
+        self.check = check
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.severity = severity
+        self.thresholds = dict(thresholds or {})
+        self.enabled = enabled
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+
+class RulePlan:
+    """
+    Regras habilitadas em ordem de execução, com as entradas que exigem.
+    """
+    __slots__ = ("rules", "inputs")
+
+    def __init__(self, rules, required_inputs=()):
+        """
+        Args:
+            rules: List[Rule] em ordem topológica;
+            required_inputs: entradas exigidas além das regras, como RuleInput.write_back_values(WRITE_BACK_PARAMETERS).
+        """
+        self.rules = rules
+        self.inputs = set(required_inputs).union(*(rule.inputs for rule in rules))
+
+    def requires(self, rule_input):
+        return rule_input in self.inputs
+
+    def rule(self, name):
+        """
+        Returns:
+            Rule do plano ou None caso não esteja habilitada.
+        """
+        return next((rule for rule in self.rules if rule.name == name), None)
+
+    def parameter_keys(self, component):
+        """
+        Args:
+            component: RuleInput.DOCK_STATION || RuleInput.OUTPUT_CHANNEL.
+        Returns:
+            Chaves de ElectricalData lidas do componente, apenas as exigidas pelo plano.
+        """
+        return tuple(
+            parameter_key for rule_input, (parameter_component, parameter_key) in RuleInput.PARAMETERS.items()
+            if parameter_component == component and rule_input in self.inputs
+        )
+
+    @staticmethod
+    def _code_signature(code):
+        """
+        Returns:
+            Bytecode, nomes e constantes da função, sem os endereços das funções aninhadas.
+        """
+        return (code.co_code, code.co_names, tuple(
+            RulePlan._code_signature(const) if isinstance(const, CodeType)
+            else sorted(map(repr, const)) if isinstance(const, frozenset) else const
+            for const in code.co_consts
+        ))
+
+    @staticmethod
+    def check_signature(check):
+        """
+        Returns:
+            Nome qualificado e hash do código da função check, de modo que uma
+            regra substituída com o mesmo nome produza outra assinatura.
+        """
+        code = getattr(check, "__code__", None)
+        return (
+            getattr(check, "__module__", None),
+            getattr(check, "__qualname__", type(check).__qualname__),
+            IncrementalState.fingerprint(RulePlan._code_signature(code)) if code is not None else None,
+        )
+
+    def signature(self):
+        """
+        Returns:
+            Hash das regras, das suas funções, severidades e limites e das entradas
+            exigidas, que invalida o IncrementalState e o BatchProgress quando alterados.
+        """
+        return IncrementalState.fingerprint((
+            [(rule.name, self.check_signature(rule.check), rule.severity, sorted(rule.thresholds.items())) for rule in self.rules],
+            sorted(self.inputs),
+        ))
+
+    def run(self, service, context, skip=()):
+        """
+        Executa as regras do plano sobre o dispositivo.
+        Args:
+            service: BeyondService do dispositivo;
+            context: RuleContext da execução;
+            skip: nomes das regras executadas fora do plano (BatchLoadValidator).
+        """
+        for rule in self.rules:
+            if rule.name in skip: continue
+            rule.check(service, rule, context)
+
+
+class RuleRegistry:
+    """
+    Registro das regras de verificação. As regras do projeto são
+    acrescentadas com register e as padrão ajustadas com enable, disable e
+    set_threshold, sem alterar as classes de domínio.
+    """
+    def __init__(self, rules=()):
+        self.rules = {}
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule, replace=False):
+        """
+        Args:
+            rule: Rule;
+            replace: substitui a regra de mesmo nome.
+        Returns:
+            Rule registrada.
+        Raises:
+            ValueError: caso já exista uma regra com o mesmo nome.
+        """
+        if rule.name in self.rules and not replace:
+            raise ValueError(f"Regra já registrada: {rule.name}")
+        self.rules[rule.name] = rule
+        return rule
+
+    def get(self, name):
+        """
+        Raises:
+            ValueError: caso a regra não esteja registrada.
+        """
+        rule = self.rules.get(name)
+        if rule is None:
+            raise ValueError(f"Regra desconhecida: {name}")
+        return rule
+
+    def enable(self, name, enabled=True):
+        self.get(name).enabled = enabled
+
+    def disable(self, name):
+        self.enable(name, False)
+
+    def set_threshold(self, name, threshold, value):
+        """
+        Raises:
+            ValueError: caso a regra não declare o limite.
+        """
+        rule = self.get(name)
+        if threshold not in rule.thresholds:
+            raise ValueError(f"A regra {name} não possui o limite {threshold}")
+        rule.thresholds[threshold] = value
+
+    def plan(self, required_inputs=()):
+        """
+        Seleciona as regras habilitadas sem outputs (verificações) e, entre as
+        demais, apenas as que produzem entradas exigidas, e as ordena de modo
+        que cada regra execute após as que produzem as suas entradas; regras
+        independentes mantêm a ordem de registro.
+        Args:
+            required_inputs: entradas exigidas pela execução além das regras.
+        Returns:
+            RulePlan
+        Raises:
+            ValueError: caso uma entrada não seja produzida por nenhuma regra
+            habilitada ou haja dependência circular.
+        """
+        enabled_rules = [rule for rule in self.rules.values() if rule.enabled]
+        producers = {}
+        for rule in enabled_rules:
+            for output in rule.outputs:
+                producers.setdefault(output, rule)
+
+        selected = set()
+
+        def require(rule_input, consumer):
+            if RuleInput.is_available(rule_input): return
+            producer = producers.get(rule_input)
+            if producer is None:
+                raise ValueError(f"Nenhuma regra habilitada produz '{rule_input}', exigida por {consumer}")
+            select(producer)
+
+        def select(rule):
+            if rule.name in selected: return
+            selected.add(rule.name)
+            for rule_input in rule.inputs:
+                require(rule_input, rule.name)
+
+        for rule in enabled_rules:
+            if not rule.outputs:
+                select(rule)
+        for rule_input in required_inputs:
+            require(rule_input, "a execução")
+
+        remaining = [rule for rule in enabled_rules if rule.name in selected]
+        ordered_rules = []
+        produced = set()
+        while remaining:
+            ready_rule = next((
+                rule for rule in remaining
+                if all(RuleInput.is_available(rule_input) or rule_input in produced for rule_input in rule.inputs)
+            ), None)
+            if ready_rule is None:
+                raise ValueError(f"Dependência circular entre as regras: {', '.join(rule.name for rule in remaining)}")
+            ordered_rules.append(ready_rule)
+            produced.update(ready_rule.outputs)
+            remaining.remove(ready_rule)
+
+        return RulePlan(ordered_rules, required_inputs)
+
+
+class BeyondRules:
+    """
+    Regras padrão da verificação Beyond, registradas por default_registry na
+    ordem em que as issues aparecem nos relatórios.
+    """
+    DEVICE_PANEL = "device_panel"
+    DEVICE_CIRCUIT = "device_circuit"
+    PANEL_CHECK = "panel_check"
+    CIRCUIT_CHECK = "circuit_check"
+    GROUPED_SWITCH_ID = "grouped_switch_id"
+    SPACE_OR_ROOM = "space_or_room"
+    CHANNEL_LOADS = "channel_loads"
+    DOCK_STATION_LOAD = "dock_station_load"
+    CHANNEL_LOAD = "channel_load"
+    CHANNEL_NUMBERS = (1, 2, 3)
+
+    _default_plan = None
+
+    @staticmethod
+    def resolve_device_panel(service, rule, context):
+        service.resolve_device_panel()
+
+    @staticmethod
+    def resolve_device_circuit(service, rule, context):
+        service.resolve_device_circuit()
+
+    @staticmethod
+    def check_device_panel(service, rule, context):
+        service.check_device_panel(rule.severity)
+
+    @staticmethod
+    def check_device_circuit(service, rule, context):
+        service.check_device_circuit(rule.severity)
+
+    @staticmethod
+    def group_switch_ids(service, rule, context):
+        service.instance.grouped_switch_id = service.group_switch_ids()
+
+    @staticmethod
+    def get_space_or_room(service, rule, context):
+        service.instance.space_or_room = service.get_space_or_room(context.space_room_resolver)
+
+    @staticmethod
+    def assign_channel_loads(service, rule, context):
+        for channel_number in BeyondRules.CHANNEL_NUMBERS:
+            service.assign_apparent_load_to_channel(channel_number, context.lighting_load_mapping)
+
+    @staticmethod
+    def check_dock_station_load(service, rule, context):
+        service.check_dock_station_load(rule.thresholds["max_load"], rule.severity)
+
+    @staticmethod
+    def check_channel_load(service, rule, context):
+        for channel_number in BeyondRules.CHANNEL_NUMBERS:
+            service.check_output_channel_load(channel_number, rule.thresholds["max_load"], rule.severity)
+
+    @staticmethod
+    def default_registry():
+        """
+        Returns:
+            RuleRegistry com as regras padrão.
+        """
+        return RuleRegistry([
+            Rule(BeyondRules.DEVICE_PANEL, BeyondRules.resolve_device_panel,
+                 inputs=(RuleInput.DOCK_STATION_PANEL, RuleInput.CHANNEL_PANEL), outputs=(RuleInput.PANEL,)),
+            Rule(BeyondRules.DEVICE_CIRCUIT, BeyondRules.resolve_device_circuit,
+                 inputs=(RuleInput.DOCK_STATION_CIRCUIT, RuleInput.CHANNEL_CIRCUIT), outputs=(RuleInput.CIRCUIT,)),
+            Rule(BeyondRules.PANEL_CHECK, BeyondRules.check_device_panel, inputs=(RuleInput.PANEL,)),
+            Rule(BeyondRules.CIRCUIT_CHECK, BeyondRules.check_device_circuit, inputs=(RuleInput.CIRCUIT,)),
+            Rule(BeyondRules.GROUPED_SWITCH_ID, BeyondRules.group_switch_ids,
+                 inputs=(RuleInput.CHANNEL_SWITCH_ID,), outputs=(RuleInput.GROUPED_SWITCH_ID,)),
+            Rule(BeyondRules.SPACE_OR_ROOM, BeyondRules.get_space_or_room, outputs=(RuleInput.SPACE_OR_ROOM,)),
+            Rule(BeyondRules.CHANNEL_LOADS, BeyondRules.assign_channel_loads,
+                 inputs=(RuleInput.CHANNEL_PANEL, RuleInput.CHANNEL_CIRCUIT, RuleInput.CHANNEL_SWITCH_ID, RuleInput.LIGHTING_LOADS),
+                 outputs=(RuleInput.CHANNEL_LOAD,)),
+            Rule(BeyondRules.DOCK_STATION_LOAD, BeyondRules.check_dock_station_load,
+                 inputs=(RuleInput.DOCK_STATION_CONNECTOR, RuleInput.DOCK_STATION_LOAD), thresholds={"max_load": 100}),
+            Rule(BeyondRules.CHANNEL_LOAD, BeyondRules.check_channel_load,
+                 inputs=(RuleInput.CHANNEL_SWITCH_ID, RuleInput.CHANNEL_LOAD), thresholds={"max_load": 100}),
+        ])
+
+    @classmethod
+    def default_plan(cls):
+        """
+        Returns:
+            RulePlan das regras padrão com os valores de todos os parâmetros escritos, usado quando nenhum plano é informado.
+        """
+        if cls._default_plan is None:
+            cls._default_plan = cls.default_registry().plan(RuleInput.write_back_values(BeyondParameterWriter.PARAMETER_NAMES))
+        return cls._default_plan
+
+#===================================================================================================================
+#==========================         ENTITY          ================================================================
+#===================================================================================================================
+
+class BeyondDevice():
+    """
+    Relativa aos dispositivos da Beyond Domotics
+    """
+    __slots__ = (
+        "family_instance", "units", "name", "revit_element_id", "device_id",
+        "dock_station", "output_channel_1", "output_channel_2", "output_channel_3",
+        "panel", "circuit_number", "voltage", "number_of_poles", "space_or_room", "grouped_switch_id",
+        "issues", "issue_codes", "issue_flag",
+    )
+    count_devices = 0
+    # Id das Bases e Saídas ausentes na família, como ElementId.InvalidElementId.
+    MISSING_COMPONENT_ID = -1
+
+    def __init__(self, beyond_family_instance, units):
+        """
+        Uma instância da classe utiliza as famílias de Revit Beyond.ONE ou Beyond.POWER e 
+        suas subfamílias, recuperando informações do projeto .rvt para a instanciação.
+        Args:
+            beyond_family_instance: FamilyInstance, mantida apenas até release_element();
+            units: UnitConverter compartilhado por todos os dispositivos da execução.
+        """
+        BeyondDevice.count_devices += 1
+        self.family_instance = beyond_family_instance
+        self.units = units
+        self.name = self.family_instance.Name
+        self.revit_element_id = ModelSnapshot._element_id(self.family_instance.Id)
+        self.device_id = self.generate_device_id()
+        self.dock_station = None
+        self.output_channel_1 = None
+        self.output_channel_2 = None
+        self.output_channel_3 = None
+        self.panel = None
+        self.circuit_number = None
+        self.voltage = None
+        self.number_of_poles = None
+        self.space_or_room = None
+        self.grouped_switch_id = None
+        self.issues = []
+        self.issue_codes = []
+        self.issue_flag = False
+    
+    def __str__(self):
+        return f"{self.name}"        
+
+    @property
+    def service(self):
+        """
+        BeyondService do dispositivo, criado sob demanda para não manter referência circular.
+        """
+        return BeyondService(self)
+            
+    def generate_device_id(self):
+        """
+        Gera o identificador único interno
+        Returns:
+            device_id(string): Identificador para cada dispositivo
+        """       
+        if BeyondDevice.count_devices <= 9:
+            return "BDO" + str(BeyondDevice.count_devices)
+        else:
+            return "BD" + str(BeyondDevice.count_devices)
+
+    def release_element(self):
+        """
+        Descarta a referência à FamilyInstance após a verificação; o elemento
+        passa a ser identificado apenas por revit_element_id.
+        """
+        self.family_instance = None
+
+    def get_nested_families(self, nested_family_name, nested_family_index):
+        """
+        Recupera as famílias aninhadas na família principal.
+        Args:
+            nested_family_name(string): 'Saída' || 'Beyond.Base'
+            nested_family_index: NestedFamilyIndex construído pela BeyondFactory.
+        Returns:
+            dock_station -> FamilyInstance ou None caso a família não possua Base
+            output_channels -> List[FamilyInstance] ordenada pelo número do canal, com até 3 Saídas
+        """
+        nested_families = nested_family_index.get_nested_families(self.revit_element_id, nested_family_name)
+
+        if   nested_family_name == NestedFamilyIndex.DOCK_STATION:
+            return nested_families[0] if nested_families else None
+        elif nested_family_name == NestedFamilyIndex.OUTPUT_CHANNEL:
+            return nested_families
+
+    def initialize_components(self, lighting_load_mapping, nested_family_index, space_room_resolver, rule_plan=None):
+        """
+        Recupera as famílias aninhadas e executa a verificação completa do dispositivo.
+        """
+        self.load_components(nested_family_index, rule_plan)
+        self.validate(lighting_load_mapping, space_room_resolver, rule_plan=rule_plan)
+
+    def load_components(self, nested_family_index, rule_plan=None):
+        """
+        Recupera a Base e as Saídas do dispositivo e apenas os parâmetros elétricos exigidos pelo plano.
+        Args:
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        """
+        rule_plan = rule_plan or BeyondRules.default_plan()
+        dock_station_keys = rule_plan.parameter_keys(RuleInput.DOCK_STATION)
+        output_channel_keys = rule_plan.parameter_keys(RuleInput.OUTPUT_CHANNEL)
+        dock_station_family = self.get_nested_families(NestedFamilyIndex.DOCK_STATION, nested_family_index)
+        output_channel_families = self.get_nested_families(NestedFamilyIndex.OUTPUT_CHANNEL, nested_family_index)
+
+        self.set_components(
+            DockStation.from_family_instance(dock_station_family, dock_station_keys) if dock_station_family is not None else None,
+            [OutputChannel.from_family_instance(output_channel_family, output_channel_keys) for output_channel_family in output_channel_families[:3]]
+        )
+
+    def set_components(self, dock_station, output_channels):
+        """
+        Atribui a Base e as três Saídas ao dispositivo. A Base ou as Saídas
+        ausentes na família são substituídas por registros com valores 'Nulo'
+        e reportadas por BeyondService.check_components, sem interromper a execução.
+        Args:
+            dock_station: DockStation ou None;
+            output_channels: List[OutputChannel] ordenada pelo número do canal, com até 3 Saídas.
+        """
+        output_channels = list(output_channels)
+        output_channels += [OutputChannel.missing(channel_number) for channel_number in range(len(output_channels) + 1, 4)]
+
+        self.dock_station = dock_station or DockStation.missing()
+        self.output_channel_1 = output_channels[0]
+        self.output_channel_2 = output_channels[1]
+        self.output_channel_3 = output_channels[2]
+
+        self.voltage = self.dock_station.voltage
+        self.number_of_poles = self.dock_station.number_of_poles
+
+    def set_channel_apparent_load(self, channel_number, apparent_load):
+        """
+        Substitui a Saída pelo registro com a carga aparente informada.
+        Args:
+            channel_number : 1 || 2 || 3;
+            apparent_load : carga em unidade interna do Revit.
+        """
+        attribute = f"output_channel_{channel_number}"
+        setattr(self, attribute, getattr(self, attribute)._replace(apparent_load=apparent_load))
+
+    def reset_issues(self):
+        """
+        Descarta o resultado da última verificação antes de verificar o dispositivo novamente.
+        """
+        self.issues = []
+        self.issue_codes = []
+        self.issue_flag = False
+
+    def revalidate(self, lighting_load_mapping, rule_plan=None):
+        """
+        Verifica novamente um dispositivo já verificado, sem acesso ao modelo,
+        após a alteração das cargas dos seus comandos. Os componentes e o
+        Espaço ou Ambiente já resolvidos são mantidos, como na validação offline.
+        Args:
+            lighting_load_mapping: LightingLoadIndex atualizado, como LoadDependencyIndex.load_mapping.
+        """
+        self.reset_issues()
+        self.family_instance = SnapshotElement(self.revit_element_id, self.name)
+        self.validate(lighting_load_mapping, SnapshotSpaceRoomResolver({self.revit_element_id: self.space_or_room}), rule_plan=rule_plan)
+        self.release_element()
+
+    def validate(self, lighting_load_mapping, space_room_resolver, check_loads=True, rule_plan=None):
+        """
+        Executa as regras do plano sobre os componentes carregados.
+        Args:
+            check_loads: False quando as cargas são verificadas em lote pelo BatchLoadValidator;
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        """
+        rule_plan = rule_plan or BeyondRules.default_plan()
+        service = self.service
+        context = RuleContext(lighting_load_mapping, space_room_resolver)
+        service.check_components()
+
+        if not check_loads:
+            rule_plan.run(service, context, BatchLoadValidator.RULE_NAMES)
+            return
+
+        rule_plan.run(service, context)
+        service.set_issue_flag()
+
+    
+class DockStation(namedtuple("DockStation", (
+        "element_id", "name", "panel", "circuit_number", "voltage", "number_of_poles", "apparent_load", "has_connector"))):
+    """
+    Registro imutável do dispositivo Base Beyond, com o Id (inteiro) do elemento.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_electrical_data(cls, element_id, name, electrical_data: ElectricalDataAcessor):
+        """
+        Args:
+            element_id: Id inteiro da Base;
+            name: nome da família;
+            electrical_data : Injeção do objeto que implementa ElectricalDataAcessor.
+        Returns:
+            DockStation
+        """
+        return cls(
+            element_id,
+            name,
+            electrical_data.get_family_parameter_value("panel"),
+            electrical_data.get_family_parameter_value("circuit_number"),
+            electrical_data.get_connector_parameter_value("voltage"),
+            electrical_data.get_connector_parameter_value("number_of_poles"),
+            electrical_data.get_connector_parameter_value("apparent_load"),
+            electrical_data.has_electrical_connector(),
+        )
+
+    @classmethod
+    def from_family_instance(cls, dock_station_family, parameter_keys):
+        """
+        Lê os parâmetros da FamilyInstance com ElectricalData, sem manter referência ao elemento.
+        """
+        return cls.from_electrical_data(dock_station_family.Id.Value, dock_station_family.Name, ElectricalData(dock_station_family, parameter_keys))
+
+    @classmethod
+    def missing(cls):
+        """
+        Returns:
+            DockStation de uma família sem Base, com Id BeyondDevice.MISSING_COMPONENT_ID.
+        """
+        return cls(BeyondDevice.MISSING_COMPONENT_ID, NestedFamilyIndex.DOCK_STATION, "Nulo", "Nulo", None, None, None, False)
+
+    def __str__(self):
+
+        return f"{self.name}"
+
+
+class OutputChannel(namedtuple("OutputChannel", ("element_id", "name", "panel", "circuit_number", "switch_id", "apparent_load"))):
+    """
+    Registro imutável das Saídas/Canais de iluminação Beyond, com o Id (inteiro)
+    do elemento. A carga é atribuída com BeyondDevice.set_channel_apparent_load.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_electrical_data(cls, element_id, name, electrical_data: ElectricalDataAcessor):
+        """
+        Args:
+            element_id: Id inteiro da Saída;
+            name: nome da família;
+            electrical_data : Injeção do objeto que implementa ElectricalDataAcessor.
+        Returns:
+            OutputChannel
+        """
+        return cls(
+            element_id,
+            name,
+            electrical_data.get_family_parameter_value("panel"),
+            electrical_data.get_family_parameter_value("circuit_number"),
+            electrical_data.get_family_parameter_value("switch_id"),
+            0,
+        )
+
+    @classmethod
+    def from_family_instance(cls, output_channel_family, parameter_keys):
+        """
+        Lê os parâmetros da FamilyInstance com ElectricalData, sem manter referência ao elemento.
+        """
+        return cls.from_electrical_data(output_channel_family.Id.Value, output_channel_family.Name, ElectricalData(output_channel_family, parameter_keys))
+
+    @classmethod
+    def missing(cls, channel_number):
+        """
+        Returns:
+            OutputChannel de uma Saída ausente na família, com Id BeyondDevice.MISSING_COMPONENT_ID.
+        """
+        return cls(BeyondDevice.MISSING_COMPONENT_ID, f"{NestedFamilyIndex.OUTPUT_CHANNEL} {channel_number}", "Nulo", "Nulo", "Nulo", 0)
+
+    def __str__(self):
+
+        return f"{self.name}"
+
+#===================================================================================================================
+#==========================         FACTORY          ===============================================================
+#===================================================================================================================
+
+class LightingFactory:
+    
+    @staticmethod
+    def create_lighting_fixtures(lighting_fixtures_collector):
+        """
+        Contém a logica para criar os Objetos de LightingFixture.
+        Args:
+            lighting_fixtures_collector: Lista contendo instâncias de famílias de luminária
+        Returns:
+            Retorna uma lista de registros LightingFixture
+        """
+        return list(LightingFactory.iter_lighting_fixtures(lighting_fixtures_collector))
+
+    @staticmethod
+    def iter_lighting_fixtures(lighting_fixtures_collector):
+        """
+        Estágio de extração da execução em fluxo: lê cada luminária à medida
+        que o coletor é percorrido.
+        Args:
+            lighting_fixtures_collector: iterável de instâncias de famílias de luminária
+        Returns:
+            Iterator[LightingFixture]
+        """
+        for family_instance in lighting_fixtures_collector:
+
+            electrical_data = ElectricalData(family_instance, ElectricalData.FIXTURE_KEYS)
+            yield LightingFixture.from_electrical_data(family_instance.Id.Value, electrical_data)
+
+    @staticmethod
+    def iter_circuit_lighting_fixtures(circuit_lighting_fixtures):
+        """
+        Lê apenas o ID de comando e a carga de cada luminária; o painel e o
+        circuito são os do ElectricalSystem.
+        Args:
+            circuit_lighting_fixtures: iterável de ModelCollector.iter_circuit_lighting_fixtures.
+        Returns:
+            Iterator[LightingFixture]
+        """
+        for panel, circuit_number, family_instances in circuit_lighting_fixtures:
+            for family_instance in family_instances:
+                electrical_data = ElectricalData(family_instance, ElectricalData.CIRCUIT_FIXTURE_KEYS)
+                yield LightingFixture.from_circuit(family_instance.Id.Value, panel, circuit_number, electrical_data)
+
+    @staticmethod
+    def iter_source_lighting_fixtures(doc, load_source, nested_family_index, switch_ids=None):
+        """
+        Luminárias da origem de cargas selecionada.
+        Args:
+            load_source: LightingLoadSource.FULL_SCAN || LightingLoadSource.CIRCUITS;
+            nested_family_index: NestedFamilyIndex das famílias verificadas, cujas Saídas definem os circuitos;
+            switch_ids: IDs de comando de uma verificação com escopo, na varredura completa.
+        Returns:
+            Iterator[LightingFixture]
+        Raises:
+            ValueError: caso a origem seja desconhecida.
+        """
+        if load_source == LightingLoadSource.CIRCUITS:
+            electrical_systems = ModelCollector.get_channel_circuits(nested_family_index)
+            return LightingFactory.iter_circuit_lighting_fixtures(ModelCollector.iter_circuit_lighting_fixtures(doc, electrical_systems))
+        if load_source == LightingLoadSource.FULL_SCAN:
+            return LightingFactory.iter_lighting_fixtures(ModelCollector.get_lighting_fixtures(doc, switch_ids))
+        raise ValueError(f"Origem de cargas desconhecida: {load_source}")
+        
+    @staticmethod
+    def get_apparent_load_by_switch_id(light_objects):
+        """
+        Returns:
+            LightingLoadIndex indexado por (panel, circuit_number, switch_id).
+        """
+        return LightingService.sum_apparent_load_by_switch_id(light_objects)
+
+
+class BeyondFactory():
+
+    def create_devices(doc, beyond_family_instances, lighting_load_mapping, incremental_state=None, batch_load_validation=False, report_sink=None,
+                       nested_family_index=None, device_numbers=None, rule_plan=None):
+        """
+        Contém a logica para a ciração de BeyondDevice
+        Args:
+            doc: instância atual do DocumentManager;
+            beyond_family_instances: List[FamilyInstance]
+            lighting_load_mapping: LightingLoadIndex retornado por get_apparent_load_by_switch_id(light_objects);
+            incremental_state: IncrementalState da execução ou None para verificar todos os dispositivos;
+            batch_load_validation: verifica as cargas com o BatchLoadValidator, caso o NumPy esteja disponível;
+            report_sink: ReportSink que recebe cada dispositivo assim que verificado;
+            nested_family_index: NestedFamilyIndex já construído para beyond_family_instances;
+            device_numbers: numeração de ModelCollector.get_device_numbers, nas verificações com escopo;
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        """
+        nested_family_index = nested_family_index or NestedFamilyIndex.build(doc, beyond_family_instances)
+        beyond_objects = []
+        for device in BeyondFactory.iter_devices(doc, beyond_family_instances, nested_family_index, lighting_load_mapping,
+                                                 incremental_state, batch_load_validation, device_numbers, rule_plan=rule_plan):
+            beyond_objects.append(device)
+            if report_sink:
+                report_sink.write_device(device)
+
+        return beyond_objects
+
+    def iter_devices(doc, beyond_family_instances, nested_family_index, lighting_load_mapping, incremental_state=None, batch_load_validation=False,
+                     device_numbers=None, batch_size=500, rule_plan=None):
+        """
+        Estágio de verificação da execução em fluxo: cria e verifica cada
+        BeyondDevice à medida que as famílias são lidas. Com batch_load_validation,
+        as cargas são verificadas em lotes de até batch_size dispositivos.
+        Args:
+            beyond_family_instances: iterável de FamilyInstance;
+            nested_family_index: NestedFamilyIndex das famílias percorridas;
+            os demais, os mesmos de create_devices.
+        Yields:
+            BeyondDevice verificado, na ordem de beyond_family_instances.
+        """
+        batch_load_validation = batch_load_validation and BatchLoadValidator.is_available()
+        rule_plan = rule_plan or BeyondRules.default_plan()
+        units = UnitConverter(ElectricalData.unit_factors())
+        verified_devices = BeyondFactory._verify_devices(
+            doc, beyond_family_instances, nested_family_index, lighting_load_mapping, incremental_state, not batch_load_validation,
+            device_numbers, units, rule_plan
+        )
+        if batch_load_validation:
+            verified_devices = BatchLoadValidator.validate_in_batches(verified_devices, units.unit_factors["watts"], batch_size, rule_plan)
+
+        for device, fingerprint, _ in verified_devices:
+            if incremental_state:
+                incremental_state.store_device(device, fingerprint)
+            yield device
+
+    def _verify_devices(doc, beyond_family_instances, nested_family_index, lighting_load_mapping, incremental_state, check_loads,
+                        device_numbers, units, rule_plan):
+        """
+        Yields:
+            (BeyondDevice, fingerprint, verificado), em que 'verificado' é False
+            para os dispositivos restaurados do IncrementalState.
+        """
+        BeyondDevice.count_devices = 0
+        space_room_resolver = None
+        for family_instance in beyond_family_instances:
+            with PROFILER.phase("BeyondFactory"):
+                device_start = time.perf_counter()
+                if device_numbers:
+                    BeyondDevice.count_devices = device_numbers[family_instance.Id.Value] - 1
+                device = BeyondDevice(family_instance, units)
+                device.load_components(nested_family_index, rule_plan)
+
+                if space_room_resolver is None and rule_plan.requires(RuleInput.SPACE_OR_ROOM):
+                    space_room_resolver = SpaceRoomResolver(doc)
+
+                fingerprint = None
+                if incremental_state:
+                    space_or_room = space_room_resolver.resolve(family_instance) if space_room_resolver else None
+                    fingerprint = incremental_state.device_fingerprint(device, space_or_room)
+                validated = incremental_state is None or not incremental_state.restore_device(device, fingerprint)
+                if validated:
+                    device.validate(lighting_load_mapping, space_room_resolver, check_loads, rule_plan)
+
+                device.release_element()
+                PROFILER.device_time(device.revit_element_id, time.perf_counter() - device_start)
+
+            yield device, fingerprint, validated
+
+class SnapshotFactory:
+    """
+    Cria os objetos de domínio a partir de um SnapshotReader (ModelSnapshot ou
+    ColumnarSnapshot), para a validação fora do Revit.
+    """
+    @staticmethod
+    def open_snapshot(snapshot_path):
+        """
+        Returns:
+            ColumnarSnapshot ou ModelSnapshot, conforme o formato do arquivo.
+        """
+        if ColumnarSnapshot.is_columnar(snapshot_path):
+            return ColumnarSnapshot(snapshot_path)
+        return ModelSnapshot.load(snapshot_path)
+
+    @staticmethod
+    def iter_lighting_fixtures(snapshot):
+        """
+        Gera os registros das luminárias sem materializar a lista, para a
+        agregação direta em LightingLoadIndex.
+        Returns:
+            Iterator[LightingFixture]
+        """
+        for element_id, electrical_data in snapshot.iter_fixtures():
+            yield LightingFixture.from_electrical_data(element_id, electrical_data)
+
+    @staticmethod
+    def create_lighting_fixtures(snapshot):
+        """
+        Returns:
+            List[LightingFixture]
+        """
+        return list(SnapshotFactory.iter_lighting_fixtures(snapshot))
+
+    @staticmethod
+    def _create_component(component_class, component):
+        return component_class.from_electrical_data(*component)
+
+    @staticmethod
+    def create_devices(snapshot, lighting_load_mapping, batch_load_validation=False, report_sink=None, rule_plan=None):
+        """
+        Cria e verifica os BeyondDevice do snapshot, na ordem de extração.
+        Args:
+            snapshot: SnapshotReader;
+            lighting_load_mapping: LightingLoadIndex retornado por get_apparent_load_by_switch_id(light_objects);
+            batch_load_validation: verifica as cargas com o BatchLoadValidator, caso o NumPy esteja disponível;
+            report_sink: ReportSink que recebe cada dispositivo assim que verificado;
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        Returns:
+            List[BeyondDevice]
+        """
+        beyond_objects = []
+        for device in SnapshotFactory.iter_devices(snapshot, lighting_load_mapping, batch_load_validation, rule_plan=rule_plan):
+            beyond_objects.append(device)
+            if report_sink:
+                report_sink.write_device(device)
+
+        return beyond_objects
+
+    @staticmethod
+    def iter_devices(snapshot, lighting_load_mapping, batch_load_validation=False, batch_size=500, rule_plan=None):
+        """
+        Versão em fluxo de create_devices, com as cargas verificadas em lotes
+        de até batch_size dispositivos no modo batch_load_validation.
+        Yields:
+            BeyondDevice verificado, na ordem de extração.
+        """
+        numbered_device_records = enumerate(SnapshotFactory.iter_device_records(snapshot), start=1)
+        return SnapshotFactory.verify_device_records(
+            numbered_device_records, lighting_load_mapping, snapshot.unit_factors, batch_load_validation, batch_size, rule_plan
+        )
+
+    @staticmethod
+    def iter_device_records(snapshot):
+        """
+        Extração dos valores dos dispositivos do snapshot em registros imutáveis.
+        Yields:
+            (element_id, name, space_or_room, DockStation, List[OutputChannel])
+        """
+        for element_id, name, space_or_room, dock_station, output_channels in snapshot.iter_devices():
+            yield (
+                element_id,
+                name,
+                space_or_room,
+                SnapshotFactory._create_component(DockStation, dock_station) if dock_station is not None else None,
+                [SnapshotFactory._create_component(OutputChannel, channel) for channel in output_channels],
+            )
+
+    @staticmethod
+    def verify_device_records(numbered_device_records, lighting_load_mapping, unit_factors, batch_load_validation=False, batch_size=500,
+                              rule_plan=None):
+        """
+        Cria e verifica os BeyondDevice a partir dos registros extraídos, sem
+        acesso ao snapshot; também executado nos processos do ParallelValidator.
+        Args:
+            numbered_device_records: iterável de (número do dispositivo, registro de iter_device_records);
+            lighting_load_mapping: LightingLoadIndex;
+            unit_factors: {'volts': float, 'watts': float};
+            rule_plan: RulePlan da execução, por padrão BeyondRules.default_plan().
+        Yields:
+            BeyondDevice verificado, na ordem de numbered_device_records.
+        """
+        batch_load_validation = batch_load_validation and BatchLoadValidator.is_available()
+        rule_plan = rule_plan or BeyondRules.default_plan()
+        units = UnitConverter(unit_factors)
+        verified_devices = SnapshotFactory._verify_devices(
+            numbered_device_records, lighting_load_mapping, not batch_load_validation, units, rule_plan
+        )
+        if batch_load_validation:
+            verified_devices = BatchLoadValidator.validate_in_batches(verified_devices, units.unit_factors["watts"], batch_size, rule_plan)
+
+        for device, _, _ in verified_devices:
+            yield device
+
+    @staticmethod
+    def _verify_devices(numbered_device_records, lighting_load_mapping, check_loads, units, rule_plan):
+        for device_number, (element_id, name, space_or_room, dock_station, output_channels) in numbered_device_records:
+            BeyondDevice.count_devices = device_number - 1
+            device = BeyondDevice(SnapshotElement(element_id, name), units)
+            device.set_components(dock_station, output_channels)
+            device.validate(lighting_load_mapping, SnapshotSpaceRoomResolver({element_id: space_or_room}), check_loads, rule_plan)
+            device.release_element()
+            yield device, None, True
+
+
+class ParallelValidator:
+    """
+    Execução paralela das verificações sobre os valores já extraídos, que são
+    computação pura: as luminárias e os dispositivos são particionados por
+    painel, as cargas agregadas em map-reduce e as partições de dispositivos
+    verificadas em um ProcessPoolExecutor. O acesso ao snapshot (ou à API do
+    Revit) permanece no processo principal e os resultados são reunidos na
+    ordem de extração, de modo que os relatórios sejam idênticos aos da
+    execução serial.
+    """
+    def __init__(self, workers, partition_size=500):
+        """
+        Args:
+            workers: quantidade de processos;
+            partition_size: quantidade máxima de dispositivos por tarefa, dentro de cada painel.
+        """
+        self.workers = workers
+        self.partition_size = max(1, partition_size)
+
+    @staticmethod
+    def partition_by_panel(numbered_items, panel_of):
+        """
+        Args:
+            numbered_items: iterável de (posição, item);
+            panel_of: função que retorna o painel do item.
+        Returns:
+            List[List[(posição, item)]], uma partição por painel, na ordem da primeira ocorrência.
+        """
+        partitions = {}
+        for position, item in numbered_items:
+            partitions.setdefault(panel_of(item), []).append((position, item))
+        return list(partitions.values())
+
+    @staticmethod
+    def _sum_partition(numbered_fixtures):
+        """
+        Map: agrega as cargas das luminárias de um painel.
+        Returns:
+            (LightingLoadIndex, posições das luminárias sem conector elétrico)
+        """
+        load_mapping = LightingService.sum_apparent_load_by_switch_id(fixture for _, fixture in numbered_fixtures)
+        return load_mapping, [position for position, fixture in numbered_fixtures if not fixture.has_connector]
+
+    def aggregate_loads(self, executor, lighting_fixtures):
+        """
+        Map-reduce de LightingService.sum_apparent_load_by_switch_id. As chaves
+        (panel, circuit_number, switch_id) de painéis diferentes são disjuntas e
+        as luminárias sem conector voltam à ordem de extração.
+        Args:
+            lighting_fixtures: List[LightingFixture]
+        Returns:
+            LightingLoadIndex
+        """
+        partitions = self.partition_by_panel(enumerate(lighting_fixtures), lambda fixture: fixture.panel)
+        load_mapping = LightingLoadIndex()
+        fixtures_without_connector = []
+
+        for partial_mapping, positions in executor.map(ParallelValidator._sum_partition, partitions):
+            load_mapping.merge(partial_mapping)
+            fixtures_without_connector.extend(zip(positions, partial_mapping.fixtures_without_connector))
+
+        load_mapping.fixtures_without_connector = [element_id for _, element_id in sorted(fixtures_without_connector)]
+        return load_mapping
+
+    @staticmethod
+    def _validate_partition(numbered_device_records, load_mapping, unit_factors, batch_load_validation, rule_plan):
+        """
+        Verifica uma partição de dispositivos no processo de trabalho. O
+        RulePlan é enviado a cada tarefa, com as regras do projeto.
+        Returns:
+            List[(número do dispositivo, BeyondDevice)]
+        """
+        device_numbers = [device_number for device_number, _ in numbered_device_records]
+        devices = SnapshotFactory.verify_device_records(
+            numbered_device_records, load_mapping, unit_factors, batch_load_validation, len(numbered_device_records), rule_plan
+        )
+        return list(zip(device_numbers, devices))
+
+    def _device_partitions(self, device_records):
+        """
+        Particiona os dispositivos pelo painel da Base e divide cada painel em
+        tarefas de até partition_size dispositivos.
+        """
+        partitions = self.partition_by_panel(enumerate(device_records, start=1), lambda record: record[3].panel)
+        for partition in partitions:
+            for start in range(0, len(partition), self.partition_size):
+                yield partition[start:start + self.partition_size]
+
+    def validate_devices(self, executor, device_records, load_mapping, unit_factors, batch_load_validation=False, rule_plan=None):
+        """
+        Verifica as partições de dispositivos em paralelo. Cada tarefa recebe
+        apenas as cargas dos painéis referenciados pelas suas Saídas.
+        Args:
+            device_records: List de registros de SnapshotFactory.iter_device_records.
+        Returns:
+            List[BeyondDevice] na ordem de extração.
+        """
+        futures = []
+        for partition in self._device_partitions(device_records):
+            panels = {channel.panel for _, record in partition for channel in record[4]}
+            futures.append(executor.submit(
+                ParallelValidator._validate_partition, partition, load_mapping.subset(panels), unit_factors, batch_load_validation,
+                rule_plan or BeyondRules.default_plan()
+            ))
+
+        numbered_devices = [numbered_device for future in futures for numbered_device in future.result()]
+        numbered_devices.sort(key=lambda numbered_device: numbered_device[0])
+        return [device for _, device in numbered_devices]
+
+    def run(self, snapshot, batch_load_validation=False, rule_plan=None):
+        """
+        Extrai os valores do snapshot no processo principal e executa a
+        agregação e a verificação em paralelo.
+        Returns:
+            (LightingLoadIndex, List[BeyondDevice])
+        """
+        lighting_fixtures = SnapshotFactory.create_lighting_fixtures(snapshot)
+        device_records = list(SnapshotFactory.iter_device_records(snapshot))
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            load_mapping = self.aggregate_loads(executor, lighting_fixtures)
+            beyond_objects = self.validate_devices(executor, device_records, load_mapping, snapshot.unit_factors, batch_load_validation, rule_plan)
+
+        return load_mapping, beyond_objects
+
+class LiveVerifier:
+    """
+    Verificação contínua: a partir de uma verificação completa, acompanha as
+    alterações das famílias Beyond, das suas Bases e Saídas e das luminárias
+    (ModelChangeSource) e verifica novamente apenas os dispositivos afetados.
+    As alterações são agrupadas pelo ChangeDebouncer e cada descarga respeita
+    latency_budget; os dispositivos que não couberem ficam para a próxima.
+    Os parâmetros Beyond não são escritos no modelo: o documento não pode ser
+    alterado nos eventos e a escrita geraria novas notificações.
+    """
+    def __init__(self, doc, beyond_objects, dependency_index, type_names, rule_plan=None, debouncer=None, latency_budget=0.2,
+                 on_update=None, clock=time.perf_counter):
+        """
+        Args:
+            doc: documento acompanhado;
+            beyond_objects: List[BeyondDevice] verificados, na ordem de numeração;
+            dependency_index: LoadDependencyIndex das luminárias com que foram verificados;
+            type_names: nomes dos tipos de família Beyond (BEYOND_TYPE_NAMES);
+            rule_plan: RulePlan da verificação, por padrão BeyondRules.default_plan();
+            debouncer: ChangeDebouncer, por padrão com os tempos de ChangeDebouncer();
+            latency_budget: tempo máximo (s) de cada descarga, após o primeiro dispositivo;
+            on_update: chamada com (List[BeyondDevice] verificados, List[Id inteiro] removidos) a cada descarga;
+            clock: relógio do latency_budget.
+        """
+        self.doc = doc
+        self.type_names = type_names
+        self.rule_plan = rule_plan or BeyondRules.default_plan()
+        self.debouncer = debouncer or ChangeDebouncer()
+        self.latency_budget = latency_budget
+        self.on_update = on_update
+        self.clock = clock
+        self.units = UnitConverter(ElectricalData.unit_factors())
+        self.dependency_index = dependency_index
+        self.devices = {}
+        self._device_numbers = {}
+        self._component_hosts = {}
+        self._dirty_devices = set()
+        self._affected_devices = set()
+        self._removed_devices = []
+        self._space_room_resolver = None
+        self._change_source = None
+
+        for device_number, device in enumerate(beyond_objects, start=1):
+            self._device_numbers[device.revit_element_id] = device_number
+            self._register_device(device)
+
+    @classmethod
+    def from_document(cls, doc, type_names, rule_plan=None, **options):
+        """
+        Executa a verificação completa, sem escrita dos parâmetros, e retorna o
+        LiveVerifier com o seu resultado. As luminárias são lidas pela
+        varredura completa, a mesma utilizada nas alterações.
+        Args:
+            options: os demais argumentos de LiveVerifier.
+        Returns:
+            LiveVerifier
+        """
+        rule_plan = rule_plan or BeyondRules.default_plan()
+        dependency_index = LoadDependencyIndex.build(LightingFactory.iter_lighting_fixtures(ModelCollector.get_lighting_fixtures(doc)))
+        beyond_families = ModelCollector.get_beyond_families(doc, type_names)
+        beyond_objects = BeyondFactory.create_devices(doc, beyond_families, dependency_index.load_mapping, rule_plan=rule_plan)
+        return cls(doc, beyond_objects, dependency_index, type_names, rule_plan, **options)
+
+    def start(self, change_source):
+        """
+        Args:
+            change_source: ModelChangeSource do documento.
+        """
+        self.stop()
+        self._change_source = change_source
+        change_source.subscribe(self.debouncer.add, self.flush_if_due)
+
+    def stop(self):
+        if self._change_source is not None:
+            self._change_source.unsubscribe()
+            self._change_source = None
+
+    @property
+    def pending(self):
+        return self.debouncer.pending or bool(self._dirty_devices or self._affected_devices)
+
+    def flush_if_due(self):
+        """
+        Handler dos momentos ociosos: descarrega as alterações já estabilizadas
+        e os dispositivos que não couberam na descarga anterior.
+        Returns:
+            List[BeyondDevice] verificados.
+        """
+        if self.debouncer.is_due() or (not self.debouncer.pending and (self._dirty_devices or self._affected_devices)):
+            return self.flush()
+        return []
+
+    def flush(self):
+        """
+        Aplica as alterações acumuladas e verifica os dispositivos afetados
+        dentro de latency_budget.
+        Returns:
+            List[BeyondDevice] verificados.
+        """
+        start = self.clock()
+        if self.debouncer.pending:
+            self._apply_change(self.debouncer.take())
+
+        verified_devices = []
+        queue = sorted(self._dirty_devices) + sorted(self._affected_devices - self._dirty_devices)
+        for element_id in queue:
+            if verified_devices and self.clock() - start > self.latency_budget:
+                break
+            if element_id in self._dirty_devices:
+                self._dirty_devices.discard(element_id)
+                self._affected_devices.discard(element_id)
+                device = self._extract_device(element_id)
+            else:
+                self._affected_devices.discard(element_id)
+                device = self.devices.get(element_id)
+                if device is not None:
+                    device.revalidate(self.dependency_index.load_mapping, self.rule_plan)
+            if device is not None:
+                verified_devices.append(device)
+
+        removed_devices, self._removed_devices = self._removed_devices, []
+        if self.on_update and (verified_devices or removed_devices):
+            self.on_update(verified_devices, removed_devices)
+        return verified_devices
+
+    def _apply_change(self, model_change):
+        """
+        Classifica os elementos alterados: dispositivos e componentes marcam o
+        dispositivo para nova extração e luminárias são aplicadas como deltas
+        no LoadDependencyIndex, marcando os dispositivos dos comandos afetados.
+        """
+        removed_fixture_ids = []
+        for element_id in model_change.deleted_ids:
+            if element_id in self.devices:
+                self._remove_device(element_id)
+            elif element_id in self._component_hosts:
+                self._dirty_devices.add(self._component_hosts.pop(element_id))
+            elif self.dependency_index.has_fixture(element_id):
+                removed_fixture_ids.append(element_id)
+
+        unknown_ids = []
+        for element_id in model_change.added_ids | model_change.modified_ids:
+            if element_id in self.devices:
+                self._dirty_devices.add(element_id)
+            elif element_id in self._component_hosts:
+                self._dirty_devices.add(self._component_hosts[element_id])
+            else:
+                unknown_ids.append(element_id)
+
+        element_ids = [ElementId(element_id) for element_id in unknown_ids]
+        changed_fixtures = list(LightingFactory.iter_lighting_fixtures(ModelCollector.get_lighting_fixtures_in(self.doc, element_ids)))
+        beyond_ids = {element_id.Value for element_id in ModelCollector.get_beyond_family_ids(self.doc, self.type_names, element_ids=element_ids)}
+        fixture_ids = {lighting_fixture.element_id for lighting_fixture in changed_fixtures}
+
+        for element_id in unknown_ids:
+            if element_id in fixture_ids:
+                continue
+            if element_id in beyond_ids:
+                self._dirty_devices.add(element_id)
+            elif self.dependency_index.has_fixture(element_id):
+                # Luminária que deixou de ter ID de comando ou número de circuito.
+                removed_fixture_ids.append(element_id)
+            else:
+                super_component = getattr(self.doc.GetElement(ElementId(element_id)), "SuperComponent", None)
+                if super_component is not None and super_component.Id.Value in self.devices:
+                    self._dirty_devices.add(super_component.Id.Value)
+
+        self._affected_devices |= self.dependency_index.apply_fixture_changes(changed_fixtures, removed_fixture_ids)
+
+    def _register_device(self, device):
+        self.devices[device.revit_element_id] = device
+        self.dependency_index.add_device(device)
+        components = [device.dock_station, device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        for component in components:
+            if component.element_id != BeyondDevice.MISSING_COMPONENT_ID:
+                self._component_hosts[component.element_id] = device.revit_element_id
+
+    def _unregister_device(self, element_id):
+        device = self.devices.pop(element_id)
+        self.dependency_index.remove_device(element_id)
+        components = [device.dock_station, device.output_channel_1, device.output_channel_2, device.output_channel_3]
+        for component in components:
+            self._component_hosts.pop(component.element_id, None)
+
+    def _remove_device(self, element_id):
+        self._unregister_device(element_id)
+        self._dirty_devices.discard(element_id)
+        self._affected_devices.discard(element_id)
+        self._removed_devices.append(element_id)
+
+    def _extract_device(self, element_id):
+        """
+        Lê novamente o dispositivo e os seus componentes e executa a verificação
+        completa, mantendo o device_id de um dispositivo já numerado.
+        Returns:
+            BeyondDevice ou None caso o elemento não exista mais.
+        """
+        family_instance = self.doc.GetElement(ElementId(element_id))
+        if family_instance is None:
+            if element_id in self.devices:
+                self._remove_device(element_id)
+            return None
+
+        if element_id not in self._device_numbers:
+            self._device_numbers[element_id] = max(self._device_numbers.values(), default=0) + 1
+        BeyondDevice.count_devices = self._device_numbers[element_id] - 1
+
+        if self._space_room_resolver is None and self.rule_plan.requires(RuleInput.SPACE_OR_ROOM):
+            self._space_room_resolver = SpaceRoomResolver(self.doc)
+
+        device = BeyondDevice(family_instance, self.units)
+        device.load_components(NestedFamilyIndex.build_from_sub_components(self.doc, [family_instance]), self.rule_plan)
+        device.validate(self.dependency_index.load_mapping, self._space_room_resolver, rule_plan=self.rule_plan)
+        device.release_element()
+
+        if element_id in self.devices:
+            self._unregister_device(element_id)
+        self._register_device(device)
+        return device
+
+
+class ReportFactory:
+    """
+    Cria os relatórios configurados para a execução.
+    """
+    STRUCTURED_SINKS = {
+        JsonlReportSink.EXTENSION : JsonlReportSink,
+        CsvReportSink.EXTENSION   : CsvReportSink,
+    }
+
+    @staticmethod
+    def create_report_sink(log, report_formats, retention, log_max_bytes=None):
+        """
+        Args:
+            log: Logger da execução;
+            report_formats: formatos entre 'text', 'jsonl' e 'csv';
+            retention: execuções mantidas no ReportArchive;
+            log_max_bytes: tamanho a partir do qual o log de texto é arquivado.
+        Returns:
+            CompositeReportSink
+        Raises:
+            ValueError: caso um formato seja desconhecido ou retention seja menor que 1.
+        """
+        report_archive = ReportArchive(os.path.dirname(log.log_file_path), retention)
+        report_sinks = []
+        for report_format in report_formats:
+            if report_format == "text":
+                if log_max_bytes:
+                    report_archive.archive_log(log.log_file_path, log_max_bytes)
+                report_sinks.append(TextReportSink(log))
+            elif report_format in ReportFactory.STRUCTURED_SINKS:
+                report_sinks.append(ReportFactory.STRUCTURED_SINKS[report_format](report_archive.path_for(report_format)))
+            else:
+                raise ValueError(f"Formato de relatório desconhecido: {report_format}")
+
+        return CompositeReportSink(report_sinks, report_archive)
+
+#===================================================================================================================
+#==========================         M A I N          ===============================================================
+#===================================================================================================================
+
+#CONFIGURATION
+BEYOND_TYPE_NAMES = ("ONE.Black", "ONE.White", "POWER.Black", "POWER.White")
+SCOPE = VerificationScope.DOCUMENT
+SCOPE_LEVEL_NAMES = ()
+SCOPE_WORKSET_NAMES = ()
+WRITE_BACK_CHUNK_SIZE = 500
+WRITE_BACK_PARAMETERS = BeyondParameterWriter.PARAMETER_NAMES
+INCREMENTAL_MODE = False
+FORCE_FULL_REBUILD = False
+EXPORT_SNAPSHOT = False
+EXPORT_SNAPSHOT_COLUMNAR = False
+KEEP_LIGHTING_FIXTURES = False
+KEEP_BEYOND_OBJECTS = False
+BATCH_LOAD_VALIDATION = False
+PROFILE_RUN = False
+LOG_FILE_NAME = "beyond_log.txt"
+REPORT_FORMATS = ("text", "jsonl")
+REPORT_RETENTION = 10
+LOG_MAX_BYTES = 5 * 2 ** 20
+BATCH_MANIFEST = None
+RULES = BeyondRules.default_registry()
+LOAD_SOURCE = LightingLoadSource.FULL_SCAN
+CHECK_LOAD_SOURCE = False
+CHECK_SWITCH_ID_CONSISTENCY = True
+LIVE_MODE = False
+LIVE_QUIET_SECONDS = 0.5
+LIVE_MAX_DELAY_SECONDS = 2.0
+LIVE_LATENCY_BUDGET_SECONDS = 0.2
+
+#===================================================================================================================
+
+def run_verification(doc, uidoc=None):
+    """
+    Executa a verificação completa dentro do Revit, em fluxo: coleta, extração,
+    verificação, escrita dos parâmetros e relatórios. Cada dispositivo atravessa
+    os estágios assim que é lido; a escrita confirma uma transação a cada
+    WRITE_BACK_CHUNK_SIZE dispositivos alterados e os relatórios estruturados
+    recebem cada dispositivo durante a execução.
+    Args:
+        doc: instância atual do DocumentManager;
+        uidoc: UIDocument ativo, necessário para SCOPE = VerificationScope.SELECTION.
+    Returns:
+        [beyond_objects, lighting_fixtures, result_index]; as listas só são mantidas com
+        KEEP_BEYOND_OBJECTS / KEEP_LIGHTING_FIXTURES ou EXPORT_SNAPSHOT, caso
+        contrário beyond_objects é None e lighting_fixtures é vazia. result_index é
+        o ValidationResultIndex de todos os dispositivos verificados.
+    """
+    PROFILER.reset(PROFILE_RUN)
+    PROFILER.start()
+    scope = VerificationScope(SCOPE, uidoc, SCOPE_LEVEL_NAMES, SCOPE_WORKSET_NAMES)
+    rule_plan = RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+
+    #COLLECTORS
+    with PROFILER.phase("collect"):
+        if scope.is_partial:
+            # Luminárias fora do escopo que compartilham os comandos das Saídas no escopo também são coletadas.
+            beyond_families = ModelCollector.get_beyond_families(doc, BEYOND_TYPE_NAMES, scope)
+            nested_family_index = NestedFamilyIndex.build_from_sub_components(doc, beyond_families)
+            device_numbers = ModelCollector.get_device_numbers(doc, BEYOND_TYPE_NAMES)
+            switch_ids = None
+            if LOAD_SOURCE == LightingLoadSource.FULL_SCAN:
+                switch_ids = ModelCollector.get_channel_switch_ids(nested_family_index, beyond_families)
+        else:
+            beyond_family_ids = ModelCollector.get_beyond_family_ids(doc, BEYOND_TYPE_NAMES)
+            nested_family_index = NestedFamilyIndex.build_for_host_ids(doc, beyond_family_ids) if beyond_family_ids else NestedFamilyIndex()
+            beyond_families = ModelCollector.iter_elements(doc, beyond_family_ids)
+            device_numbers = None
+            switch_ids = None
+
+        load_source_mismatches = compare_load_sources(doc, nested_family_index) if CHECK_LOAD_SOURCE else None
+
+    log = Logger(doc, LOG_FILE_NAME)
+    log_directory = os.path.dirname(log.log_file_path)
+    report_sink = ReportFactory.create_report_sink(log, REPORT_FORMATS, REPORT_RETENTION, LOG_MAX_BYTES)
+
+    if INCREMENTAL_MODE:
+        incremental_state = IncrementalState(
+            os.path.join(log_directory, IncrementalState.FILE_NAME), FORCE_FULL_REBUILD, scope.is_partial, rule_plan.signature()
+        )
+    else: incremental_state = None
+
+    #===============================================================================================================
+
+    with PROFILER.phase("LightingFactory"):
+        if rule_plan.requires(RuleInput.LIGHTING_LOADS):
+            lighting_fixtures = LightingFactory.iter_source_lighting_fixtures(doc, LOAD_SOURCE, nested_family_index, switch_ids)
+        else:
+            lighting_fixtures = iter(())
+        if incremental_state:
+            lighting_fixtures = incremental_state.track_fixtures(lighting_fixtures)
+
+        keep_lighting_fixtures = KEEP_LIGHTING_FIXTURES or EXPORT_SNAPSHOT
+        if keep_lighting_fixtures:
+            lighting_fixtures = list(lighting_fixtures)
+
+        # Sem keep_lighting_fixtures, as luminárias são agregadas à medida que são lidas e descartadas em seguida.
+        apparent_load_mapping = LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+        if not keep_lighting_fixtures:
+            lighting_fixtures = []
+
+    #===============================================================================================================
+
+    parameter_cache = BeyondParameterCache(WRITE_BACK_PARAMETERS)
+    write_back = BeyondParameterWriteBack(doc, parameter_cache, WRITE_BACK_CHUNK_SIZE)
+    keep_beyond_objects = KEEP_BEYOND_OBJECTS or EXPORT_SNAPSHOT
+    beyond_objects = []
+    # Com escopo parcial, os comandos de dispositivos fora do escopo seriam reportados como órfãos.
+    check_consistency = CHECK_SWITCH_ID_CONSISTENCY and not scope.is_partial and rule_plan.requires(RuleInput.LIGHTING_LOADS)
+    consistency_check = SwitchIdConsistencyCheck() if check_consistency else None
+    result_index = ValidationResultIndex()
+
+    beyond_devices = BeyondFactory.iter_devices(
+        doc, beyond_families, nested_family_index, apparent_load_mapping, incremental_state, BATCH_LOAD_VALIDATION,
+        device_numbers, WRITE_BACK_CHUNK_SIZE, rule_plan
+    )
+    # O fechamento explícito desfaz as escritas da execução caso um estágio seguinte falhe.
+    with closing(write_back.write_stream(beyond_devices)) as written_devices:
+        for device in written_devices:
+            with PROFILER.phase("report"):
+                report_sink.write_device(device)
+            if consistency_check:
+                consistency_check.add_device(device)
+            result_index.add_device(device)
+            if keep_beyond_objects:
+                beyond_objects.append(device)
+
+    beyond_objects = beyond_objects or None
+
+    project_issues = None
+    if consistency_check:
+        with PROFILER.phase("consistency"):
+            project_issues = consistency_check.check(apparent_load_mapping)
+            report_sink.write_project_issues(project_issues)
+        result_index.add_project_issues(project_issues)
+
+    #===============================================================================================================
+
+    PROFILER.stop()
+    report_sink.close(Logger.summary_message(parameter_cache.missing_parameters, write_back, incremental_state, PROFILER, scope, apparent_load_mapping,
+                                             load_source_mismatches, project_issues))
+
+    if PROFILER.enabled:
+        PROFILER.save(os.path.join(log_directory, RunProfiler.FILE_NAME))
+
+    if incremental_state:
+        incremental_state.save()
+
+    if EXPORT_SNAPSHOT:
+        snapshot = ModelSnapshot.from_model(doc.Title, beyond_objects, lighting_fixtures, ElectricalData.unit_factors())
+        if EXPORT_SNAPSHOT_COLUMNAR:
+            ColumnarSnapshot.write(os.path.join(log_directory, ColumnarSnapshot.FILE_NAME), snapshot)
+        else:
+            snapshot.save(os.path.join(log_directory, ModelSnapshot.FILE_NAME))
+
+    return [beyond_objects, lighting_fixtures, result_index]
+
+
+def compare_load_sources(doc, nested_family_index):
+    """
+    Verificação de consistência entre as origens de cargas: soma as luminárias
+    pela varredura completa e pelos circuitos das Saídas e compara os comandos
+    dos circuitos percorridos.
+    Args:
+        nested_family_index: NestedFamilyIndex das famílias verificadas.
+    Returns:
+        List[((painel, circuito, ID de comando), (VA, luminárias) ou None, (VA, luminárias) ou None)],
+        com a varredura completa à esquerda.
+    """
+    units = UnitConverter(ElectricalData.unit_factors())
+    electrical_systems = ModelCollector.get_channel_circuits(nested_family_index)
+    circuits = {(electrical_system.PanelName or "Nulo", electrical_system.CircuitNumber or "Nulo") for electrical_system in electrical_systems}
+
+    reference_mapping = LightingFactory.get_apparent_load_by_switch_id(
+        LightingFactory.iter_lighting_fixtures(ModelCollector.get_lighting_fixtures(doc))
+    )
+    candidate_mapping = LightingFactory.get_apparent_load_by_switch_id(
+        LightingFactory.iter_circuit_lighting_fixtures(ModelCollector.iter_circuit_lighting_fixtures(doc, electrical_systems))
+    )
+
+    def load_entry(entry):
+        return None if entry is None else (units.convert_to_watts(entry.apparent_load), entry.fixture_count)
+
+    return [
+        (key, load_entry(reference_entry), load_entry(candidate_entry))
+        for key, reference_entry, candidate_entry in LightingService.compare_load_indexes(reference_mapping, candidate_mapping, circuits)
+    ]
+
+
+def start_live_verification(doc, ui_application=None, change_source=None, result_index=None):
+    """
+    Inicia a verificação contínua do documento: cada descarga do LiveVerifier
+    acrescenta ao log os dispositivos verificados novamente. Uma verificação
+    contínua anterior, de outra execução do script, é encerrada antes.
+    Args:
+        doc: documento acompanhado;
+        ui_application: UIApplication, cujo evento Idling descarrega as alterações;
+        change_source: ModelChangeSource, por padrão DocumentChangedSource(doc, ui_application);
+        result_index: ValidationResultIndex da execução, mantido atualizado a cada descarga.
+    Returns:
+        LiveVerifier
+    """
+    # O interpretador do Dynamo é mantido entre as execuções do script; o módulo sys guarda o verificador ativo.
+    previous_verifier = getattr(sys, "beyond_live_verifier", None)
+    if previous_verifier is not None:
+        previous_verifier.stop()
+
+    log = Logger(doc, LOG_FILE_NAME)
+
+    def on_update(verified_devices, removed_device_ids):
+        log.write_to_log(Logger.live_message(verified_devices, removed_device_ids))
+        if result_index is not None:
+            result_index.update(verified_devices, removed_device_ids)
+
+    live_verifier = LiveVerifier.from_document(
+        doc, BEYOND_TYPE_NAMES, RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS)),
+        debouncer=ChangeDebouncer(LIVE_QUIET_SECONDS, LIVE_MAX_DELAY_SECONDS),
+        latency_budget=LIVE_LATENCY_BUDGET_SECONDS,
+        on_update=on_update,
+    )
+    live_verifier.start(change_source or DocumentChangedSource(doc, ui_application))
+    sys.beyond_live_verifier = live_verifier
+    return live_verifier
+
+
+def apply_fixture_changes(beyond_objects_by_id, dependency_index, changed_fixtures=(), removed_element_ids=(), rule_plan=None):
+    """
+    Aplica alterações de luminárias ao LoadDependencyIndex e verifica novamente
+    apenas os dispositivos dos comandos afetados, em O(alterações).
+    Args:
+        beyond_objects_by_id: {Id inteiro: BeyondDevice} de uma execução anterior;
+        dependency_index: LoadDependencyIndex construído com as luminárias e dispositivos dessa execução;
+        changed_fixtures: LightingFixture incluídas ou alteradas;
+        removed_element_ids: Ids inteiros das luminárias removidas;
+        rule_plan: RulePlan da verificação, por padrão o das regras de RULES.
+    Returns:
+        List[BeyondDevice] verificados novamente.
+    """
+    rule_plan = rule_plan or RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+    affected_devices = dependency_index.apply_fixture_changes(changed_fixtures, removed_element_ids)
+
+    revalidated_devices = []
+    for device_element_id in sorted(affected_devices):
+        device = beyond_objects_by_id.get(device_element_id)
+        if device is None: continue
+        device.revalidate(dependency_index.load_mapping, rule_plan)
+        revalidated_devices.append(device)
+    return revalidated_devices
+
+
+def run_offline_validation(snapshot_path, log_directory=None, batch_load_validation=False, report_formats=REPORT_FORMATS, workers=1,
+                           rule_plan=None):
+    """
+    Executa a verificação de um snapshot (JSON ou colunar) em CPython, sem
+    Revit, e grava os mesmos relatórios da execução no Revit.
+    Args:
+        snapshot_path: caminho do snapshot;
+        log_directory: diretório do log, por padrão o diretório do snapshot;
+        batch_load_validation: verifica as cargas com o BatchLoadValidator;
+        report_formats: formatos dos relatórios, entre 'text', 'jsonl' e 'csv';
+        workers: com mais de um, verifica em paralelo com o ParallelValidator;
+        rule_plan: RulePlan da verificação, por padrão o das regras de RULES.
+    Returns:
+        List[BeyondDevice] ou None caso o snapshot não possua dispositivos.
+    """
+    rule_plan = rule_plan or RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+    log = Logger(None, LOG_FILE_NAME, log_directory or os.path.dirname(os.path.abspath(snapshot_path)))
+    report_sink = ReportFactory.create_report_sink(log, report_formats, REPORT_RETENTION, LOG_MAX_BYTES)
+    snapshot = SnapshotFactory.open_snapshot(snapshot_path)
+
+    if workers > 1:
+        apparent_load_mapping, beyond_objects = ParallelValidator(workers).run(snapshot, batch_load_validation, rule_plan)
+        for device in beyond_objects:
+            report_sink.write_device(device)
+        beyond_objects = beyond_objects or None
+    else:
+        apparent_load_mapping = LightingFactory.get_apparent_load_by_switch_id(SnapshotFactory.iter_lighting_fixtures(snapshot))
+        beyond_objects = SnapshotFactory.create_devices(snapshot, apparent_load_mapping, batch_load_validation, report_sink, rule_plan) or None
+
+    if isinstance(snapshot, ColumnarSnapshot):
+        snapshot.close()
+
+    project_issues = None
+    if CHECK_SWITCH_ID_CONSISTENCY and rule_plan.requires(RuleInput.LIGHTING_LOADS):
+        project_issues = SwitchIdConsistencyCheck.build(beyond_objects or ()).check(apparent_load_mapping)
+        report_sink.write_project_issues(project_issues)
+
+    report_sink.close(Logger.summary_message(lighting_load_mapping=apparent_load_mapping, project_issues=project_issues))
+
+    return beyond_objects
+
+
+def compare_load_validation(snapshot_path):
+    """
+    Verifica o snapshot objeto a objeto e com o BatchLoadValidator e compara
+    as issues de cada dispositivo.
+    Returns:
+        List[(device_id, issues objeto a objeto, issues em lote)] divergentes.
+    Raises:
+        RuntimeError: caso o NumPy não esteja disponível.
+    """
+    if not BatchLoadValidator.is_available():
+        raise RuntimeError("NumPy não está disponível para o BatchLoadValidator.")
+
+    snapshot = SnapshotFactory.open_snapshot(snapshot_path)
+    apparent_load_mapping = LightingFactory.get_apparent_load_by_switch_id(SnapshotFactory.iter_lighting_fixtures(snapshot))
+
+    rule_plan = RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+    serial_devices = SnapshotFactory.create_devices(snapshot, apparent_load_mapping, rule_plan=rule_plan)
+    batch_devices = SnapshotFactory.create_devices(snapshot, apparent_load_mapping, batch_load_validation=True, rule_plan=rule_plan)
+
+    if isinstance(snapshot, ColumnarSnapshot):
+        snapshot.close()
+
+    return [
+        (serial_device.device_id, serial_device.issues, batch_device.issues)
+        for serial_device, batch_device in zip(serial_devices, batch_devices)
+        if serial_device.issues != batch_device.issues or serial_device.issue_codes != batch_device.issue_codes
+        or serial_device.issue_flag != batch_device.issue_flag
+    ]
+
+
+def extract_snapshot(doc, snapshot_path):
+    """
+    Extrai o snapshot de um documento aberto no Revit, sem escrever os
+    parâmetros nem gravar relatórios no diretório do modelo.
+    Args:
+        doc: Document aberto;
+        snapshot_path: caminho do snapshot, colunar caso termine em '.bcol'.
+    Returns:
+        ModelSnapshot
+    """
+    beyond_family_ids = ModelCollector.get_beyond_family_ids(doc, BEYOND_TYPE_NAMES)
+    nested_family_index = NestedFamilyIndex.build_for_host_ids(doc, beyond_family_ids) if beyond_family_ids else NestedFamilyIndex()
+    lighting_fixtures = LightingFactory.create_lighting_fixtures(ModelCollector.get_lighting_fixtures(doc))
+    apparent_load_mapping = LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+    beyond_objects = list(BeyondFactory.iter_devices(
+        doc, ModelCollector.iter_elements(doc, beyond_family_ids), nested_family_index, apparent_load_mapping,
+        rule_plan=BeyondRules.default_plan()
+    ))
+
+    snapshot = ModelSnapshot.from_model(doc.Title, beyond_objects, lighting_fixtures, ElectricalData.unit_factors())
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    if snapshot_path.endswith(".bcol"):
+        ColumnarSnapshot.write(snapshot_path, snapshot)
+    else:
+        snapshot.save(snapshot_path)
+    return snapshot
+
+
+def extract_models(application, manifest_path):
+    """
+    Abre no Revit os modelos do manifesto que ainda não possuem snapshot,
+    extrai o snapshot de cada um e fecha o documento sem salvar.
+    Args:
+        application: Autodesk.Revit.ApplicationServices.Application;
+        manifest_path: manifesto lido por BatchManifest.load.
+    Returns:
+        {nome do modelo: caminho do snapshot ou mensagem de erro}
+    """
+    extracted = {}
+    for entry in BatchManifest.load(manifest_path).pending_extraction():
+        try:
+            doc = application.OpenDocumentFile(entry["model"])
+        except Exception as error:
+            extracted[entry["name"]] = f"Erro ao abrir o modelo: {error}"
+            continue
+        try:
+            extract_snapshot(doc, entry["snapshot"])
+            extracted[entry["name"]] = entry["snapshot"]
+        except Exception as error:
+            extracted[entry["name"]] = f"Erro na extração: {error}"
+        finally:
+            doc.Close(False)
+    return extracted
+
+
+def validate_model(entry, output_directory, batch_load_validation=False, report_formats=REPORT_FORMATS, rule_plan=None):
+    """
+    Valida um modelo da auditoria em lote, executado em um processo de
+    validação. Os relatórios são gravados em output_directory/nome do modelo.
+    Returns:
+        AuditSummary.model_result do modelo.
+    """
+    log_directory = os.path.join(output_directory, entry["name"])
+    os.makedirs(log_directory, exist_ok=True)
+    beyond_objects = run_offline_validation(entry["snapshot"], log_directory, batch_load_validation, report_formats, rule_plan=rule_plan)
+    return AuditSummary.model_result(beyond_objects)
+
+
+def run_batch_validation(manifest, output_directory, workers=1, batch_load_validation=False, report_formats=REPORT_FORMATS, restart=False):
+    """
+    Auditoria em lote: valida os snapshots do manifesto em paralelo, um modelo
+    por tarefa, e grava o resumo agregado em output_directory. O progresso é
+    salvo a cada modelo concluído, de modo que uma execução interrompida
+    retoma apenas os modelos pendentes.
+    Args:
+        manifest: BatchManifest;
+        output_directory: diretório dos relatórios e do resumo;
+        workers: quantidade de processos de validação;
+        restart: valida novamente todos os modelos.
+    Returns:
+        (resumo agregado, {nome: model_result}, {nome: erro})
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    rule_plan = RULES.plan(RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+    progress = BatchProgress(output_directory, restart, rule_plan.signature())
+    results = {}
+    failed_models = {}
+    pending = []
+    for entry in manifest.entries:
+        if not os.path.exists(entry["snapshot"]):
+            failed_models[entry["name"]] = f"Snapshot não encontrado: {entry['snapshot']}"
+            continue
+        result = progress.completed_result(entry)
+        if result is None:
+            pending.append(entry)
+        else:
+            results[entry["name"]] = result
+
+    def complete(entry, result):
+        results[entry["name"]] = result
+        progress.complete(entry, result)
+
+    if workers > 1 and len(pending) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(validate_model, entry, output_directory, batch_load_validation, report_formats, rule_plan): entry
+                for entry in pending
+            }
+            for future in concurrent.futures.as_completed(futures):
+                entry = futures[future]
+                try:
+                    complete(entry, future.result())
+                except Exception as error:
+                    failed_models[entry["name"]] = str(error)
+    else:
+        for entry in pending:
+            try:
+                complete(entry, validate_model(entry, output_directory, batch_load_validation, report_formats, rule_plan))
+            except Exception as error:
+                failed_models[entry["name"]] = str(error)
+
+    results = {entry["name"]: results[entry["name"]] for entry in manifest.entries if entry["name"] in results}
+    summary = AuditSummary.aggregate(results)
+    summary_path = os.path.join(output_directory, AuditSummary.FILE_NAME)
+    with open(summary_path + ".json", 'w', encoding='utf-8') as summary_file:
+        json.dump({"summary": summary, "models": results, "failed_models": failed_models}, summary_file, ensure_ascii=False, indent=2)
+    with open(summary_path + ".txt", 'w', encoding='utf-8') as summary_file:
+        summary_file.write(AuditSummary.format_text(summary, results, failed_models))
+
+    return summary, results, failed_models
+
+
+def main(argv=None):
+    """
+    Linha de comando da validação offline:
+        python beyond_revit_automation.py beyond_snapshot.json [--log-dir DIR] [--fail-on-issues] [--format text jsonl csv] [--workers N]
+        python beyond_revit_automation.py beyond_snapshot.json --to-columnar beyond_snapshot.bcol
+        python beyond_revit_automation.py (--models-dir DIR | --manifest FILE) --output-dir DIR [--workers N] [--restart]
+    """
+    parser = argparse.ArgumentParser(description="Validação offline de snapshots de modelos com famílias Beyond.")
+    parser.add_argument("snapshots", nargs="*", help="arquivo(s) gerado(s) com EXPORT_SNAPSHOT = True")
+    parser.add_argument("--log-dir", help="diretório do beyond_log.txt (padrão: diretório de cada snapshot)")
+    parser.add_argument("--fail-on-issues", action="store_true", help="retorna código 1 caso algum dispositivo apresente problemas")
+    parser.add_argument("--to-columnar", metavar="BCOL", help="converte o snapshot JSON informado para o formato colunar e encerra")
+    parser.add_argument("--batch", action="store_true", help="verifica as cargas com o BatchLoadValidator (NumPy)")
+    parser.add_argument("--format", nargs="+", choices=["text", "jsonl", "csv"], default=list(REPORT_FORMATS), help="formatos dos relatórios gravados")
+    parser.add_argument("--workers", type=int, default=1, help="processos da verificação paralela, particionada por painel")
+    parser.add_argument("--compare-engines", action="store_true", help="compara a verificação de cargas objeto a objeto e em lote e encerra")
+    parser.add_argument("--models-dir", help="auditoria em lote de todos os snapshots do diretório")
+    parser.add_argument("--manifest", help="auditoria em lote dos modelos do manifesto JSON")
+    parser.add_argument("--output-dir", help="diretório dos relatórios e do resumo da auditoria em lote")
+    parser.add_argument("--restart", action="store_true", help="ignora o progresso salvo da auditoria em lote")
+    args = parser.parse_args(argv)
+
+    if args.models_dir or args.manifest:
+        manifest = BatchManifest.load(args.manifest) if args.manifest else BatchManifest.from_directory(args.models_dir)
+        output_directory = args.output_dir or os.path.join(args.models_dir or os.path.dirname(os.path.abspath(args.manifest)), "beyond_audit")
+        summary, _, failed_models = run_batch_validation(manifest, output_directory, args.workers, args.batch, args.format, args.restart)
+        print(f"{summary['models']} modelo(s), {summary['devices']} dispositivo(s), {summary['faulty_devices']} com problemas, "
+              f"{len(failed_models)} modelo(s) com falha")
+        print(f"Resumo: {os.path.join(output_directory, AuditSummary.FILE_NAME)}.txt")
+        return 1 if failed_models or (args.fail_on_issues and summary["faulty_models"]) else 0
+
+    if not args.snapshots:
+        parser.error("informe os snapshots, --models-dir ou --manifest")
+
+    if args.compare_engines:
+        divergent_models = 0
+        for snapshot_path in args.snapshots:
+            mismatches = compare_load_validation(snapshot_path)
+            divergent_models += 1 if mismatches else 0
+            print(f"{snapshot_path}: {len(mismatches)} dispositivo(s) com resultado divergente")
+            for device_id, serial_issues, batch_issues in mismatches:
+                print(f"  {device_id}: {serial_issues} != {batch_issues}")
+        return 1 if divergent_models else 0
+
+    if args.to_columnar:
+        ColumnarSnapshot.write(args.to_columnar, ModelSnapshot.load(args.snapshots[0]))
+        return 0
+
+    faulty_models = 0
+    for snapshot_path in args.snapshots:
+        beyond_objects = run_offline_validation(snapshot_path, args.log_dir, args.batch, args.format, args.workers) or []
+        faulty_devices = sum(1 for device in beyond_objects if device.issue_flag)
+        faulty_models += 1 if faulty_devices else 0
+        print(f"{snapshot_path}: {len(beyond_objects)} dispositivo(s), {faulty_devices} com problemas")
+
+    return 1 if args.fail_on_issues and faulty_models else 0
+
+#===================================================================================================================
+
+if REVIT_AVAILABLE and "IN" in globals() and BATCH_MANIFEST:
+    OUT = extract_models(DocumentManager.Instance.CurrentUIApplication.Application, BATCH_MANIFEST)
+
+elif REVIT_AVAILABLE and "IN" in globals():
+    OUT = run_verification(DocumentManager.Instance.CurrentDBDocument, DocumentManager.Instance.CurrentUIApplication.ActiveUIDocument)
+    if LIVE_MODE:
+        start_live_verification(DocumentManager.Instance.CurrentDBDocument, DocumentManager.Instance.CurrentUIApplication, result_index=OUT[2])
+
+elif __name__ == "__main__":
+    sys.exit(main())
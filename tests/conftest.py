@@ -0,0 +1,43 @@
+"""
+Fixtures compartilhadas pelos testes: a API fictícia do Revit é registrada
+antes da importação de beyond_revit_automation, e cada teste recebe o
+módulo com a configuração padrão e os modelos sintéticos em tmp_path.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import beyond_fake_revit
+
+beyond_fake_revit.install()
+
+import beyond_revit_automation
+
+
+@pytest.fixture
+def beyond(monkeypatch):
+    """
+    beyond_revit_automation sem verificação incremental e mantendo os
+    dispositivos e luminárias retornados por run_verification.
+    """
+    monkeypatch.setattr(beyond_revit_automation, "INCREMENTAL_MODE", False)
+    monkeypatch.setattr(beyond_revit_automation, "KEEP_BEYOND_OBJECTS", True)
+    monkeypatch.setattr(beyond_revit_automation, "KEEP_LIGHTING_FIXTURES", True)
+    return beyond_revit_automation
+
+
+@pytest.fixture
+def synthetic_model(tmp_path):
+    """
+    Returns:
+        função (devices, **opções de generate_model) -> Document, gravado em tmp_path.
+    """
+    def make(devices=200, **options):
+        options.setdefault("path_name", str(tmp_path / "model.rvt"))
+        return beyond_fake_revit.generate_model(devices=devices, **options)
+    return make
+
@@ -0,0 +1,35 @@
+"""
+Funções auxiliares dos testes.
+"""
+
+import beyond_fake_revit
+
+
+def device_results(beyond_devices):
+    """
+    Returns:
+        List dos valores verificados de cada dispositivo, comparáveis entre execuções.
+    """
+    return [
+        (
+            device.device_id, device.revit_element_id, device.panel, device.circuit_number, device.space_or_room,
+            device.grouped_switch_id, device.issues, device.issue_codes, device.issue_flag,
+            [channel.apparent_load for channel in (device.output_channel_1, device.output_channel_2, device.output_channel_3)],
+        )
+        for device in beyond_devices or []
+    ]
+
+
+def remove_components(beyond, doc):
+    """
+    Remove a Base do primeiro dispositivo e a Saída 3 do segundo.
+    Returns:
+        (Id do dispositivo sem Base, Id do dispositivo sem a Saída 3)
+    """
+    beyond_families = beyond.ModelCollector.get_beyond_families(doc, beyond.BEYOND_TYPE_NAMES)
+    nested_family_index = beyond.NestedFamilyIndex.build(doc, beyond_families)
+    without_dock_station, without_channel = (family_instance.Id.Value for family_instance in beyond_families[:2])
+    with beyond_fake_revit.edit_model(doc):
+        doc.Delete(nested_family_index.get_nested_families(without_dock_station, beyond.NestedFamilyIndex.DOCK_STATION)[0].Id)
+        doc.Delete(nested_family_index.get_nested_families(without_channel, beyond.NestedFamilyIndex.OUTPUT_CHANNEL)[2].Id)
+    return without_dock_station, without_channel
@@ -0,0 +1,39 @@
+"""
+O BatchLoadValidator (NumPy) produz os mesmos resultados que a verificação
+objeto a objeto, no Revit e no snapshot.
+"""
+
+import os
+
+import pytest
+
+import beyond_fake_revit
+from helpers import device_results
+
+pytest.importorskip("numpy")
+
+
+def verify(beyond, path_name, batch_load_validation, monkeypatch):
+    monkeypatch.setattr(beyond, "BATCH_LOAD_VALIDATION", batch_load_validation)
+    doc = beyond_fake_revit.generate_model(devices=300, faulty_fraction=0.2, seed=7, path_name=path_name)
+    return device_results(beyond.run_verification(doc)[0])
+
+
+def test_batch_matches_serial_in_revit(beyond, tmp_path, monkeypatch):
+    serial = verify(beyond, str(tmp_path / "serial" / "model.rvt"), False, monkeypatch)
+    batch = verify(beyond, str(tmp_path / "batch" / "model.rvt"), True, monkeypatch)
+
+    assert batch == serial
+
+
+def test_batch_matches_serial_offline(beyond, synthetic_model, monkeypatch):
+    doc = synthetic_model(300, faulty_fraction=0.2, seed=7)
+    monkeypatch.setattr(beyond, "EXPORT_SNAPSHOT", True)
+    beyond.run_verification(doc)
+    snapshot_path = os.path.join(os.path.dirname(doc.PathName), beyond.ModelSnapshot.FILE_NAME)
+
+    serial = beyond.run_offline_validation(snapshot_path, report_formats=())
+    batch = beyond.run_offline_validation(snapshot_path, batch_load_validation=True, report_formats=())
+
+    assert device_results(batch) == device_results(serial)
+    assert beyond.compare_load_validation(snapshot_path) == []
@@ -0,0 +1,83 @@
+"""
+Retomada da auditoria em lote: apenas os modelos novos, alterados ou
+validados com outras regras são validados novamente.
+"""
+
+import os
+import shutil
+
+import pytest
+
+
+@pytest.fixture
+def models_directory(beyond, synthetic_model, tmp_path, monkeypatch):
+    """
+    Diretório com três snapshots de modelos sintéticos diferentes.
+    """
+    monkeypatch.setattr(beyond, "EXPORT_SNAPSHOT", True)
+    models_directory = tmp_path / "models"
+    models_directory.mkdir()
+    for seed, name in enumerate(("alfa", "beta", "gama")):
+        doc = synthetic_model(30, seed=seed, path_name=str(tmp_path / name / "model.rvt"))
+        beyond.run_verification(doc)
+        shutil.copy(os.path.join(os.path.dirname(doc.PathName), beyond.ModelSnapshot.FILE_NAME), models_directory / f"{name}.json")
+    return str(models_directory)
+
+
+@pytest.fixture
+def validated_models(beyond, monkeypatch):
+    """
+    Nomes dos modelos validados por run_batch_validation, na ordem de validação.
+    """
+    validated_models = []
+    validate_model = beyond.validate_model
+
+    def recording_validate_model(entry, *args, **kwargs):
+        validated_models.append(entry["name"])
+        return validate_model(entry, *args, **kwargs)
+
+    monkeypatch.setattr(beyond, "validate_model", recording_validate_model)
+    return validated_models
+
+
+def run_batch(beyond, models_directory, output_directory, restart=False):
+    return beyond.run_batch_validation(beyond.BatchManifest.from_directory(models_directory), output_directory,
+                                       report_formats=("jsonl",), restart=restart)
+
+
+def test_resume_skips_completed_models(beyond, models_directory, validated_models, tmp_path):
+    output_directory = str(tmp_path / "audit")
+    _, first_results, failed_models = run_batch(beyond, models_directory, output_directory)
+    assert validated_models == ["alfa", "beta", "gama"] and not failed_models
+
+    validated_models.clear()
+    _, resumed_results, _ = run_batch(beyond, models_directory, output_directory)
+    assert validated_models == []
+    assert resumed_results == first_results
+
+    snapshot_path = os.path.join(models_directory, "beta.json")
+    stat = os.stat(snapshot_path)
+    os.utime(snapshot_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    _, touched_results, _ = run_batch(beyond, models_directory, output_directory)
+    assert validated_models == ["beta"]
+    assert touched_results == first_results
+
+    validated_models.clear()
+    run_batch(beyond, models_directory, output_directory, restart=True)
+    assert validated_models == ["alfa", "beta", "gama"]
+
+
+def test_rules_change_discards_progress(beyond, models_directory, validated_models, tmp_path, monkeypatch):
+    output_directory = str(tmp_path / "audit")
+    run_batch(beyond, models_directory, output_directory)
+
+    rules = beyond.BeyondRules.default_registry()
+    rules.set_threshold(beyond.BeyondRules.CHANNEL_LOAD, "max_load", 150)
+    monkeypatch.setattr(beyond, "RULES", rules)
+    validated_models.clear()
+    run_batch(beyond, models_directory, output_directory)
+    assert validated_models == ["alfa", "beta", "gama"]
+
+    validated_models.clear()
+    run_batch(beyond, models_directory, output_directory)
+    assert validated_models == []
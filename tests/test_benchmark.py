@@ -0,0 +1,46 @@
+"""
+Testes de regressão do benchmark em modelos de generate_model: as fases
+medidas por beyond_benchmark produzem o mesmo resultado da execução em fluxo
+e o tempo por dispositivo não cresce com o tamanho do modelo.
+"""
+
+import pytest
+
+import beyond_benchmark
+from helpers import device_results
+
+
+@pytest.mark.parametrize("size", (10, 200))
+def test_run_phases_times_every_phase(beyond, synthetic_model, size):
+    timings = beyond_benchmark.run_phases(synthetic_model(size))
+
+    assert list(timings) == list(beyond_benchmark.PHASES)
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_run_phases_matches_run_verification(beyond, synthetic_model):
+    doc = synthetic_model(300, faulty_fraction=0.3, seed=1)
+    beyond_families = beyond.ModelCollector.get_beyond_families(doc, beyond.BEYOND_TYPE_NAMES)
+    lighting_fixtures = beyond.LightingFactory.create_lighting_fixtures(beyond.ModelCollector.get_lighting_fixtures(doc))
+    apparent_load_mapping = beyond.LightingFactory.get_apparent_load_by_switch_id(lighting_fixtures)
+    phase_devices = beyond.BeyondFactory.create_devices(doc, beyond_families, apparent_load_mapping)
+
+    beyond_objects, _, _ = beyond.run_verification(doc)
+
+    assert device_results(beyond_objects) == device_results(phase_devices)
+
+
+def test_time_per_device_scales_linearly(beyond, synthetic_model):
+    def time_per_device(size):
+        doc = synthetic_model(size, seed=2)
+        return min(sum(beyond_benchmark.run_phases(doc).values()) for _ in range(3)) / size
+
+    # Margem ampla para a variação de tempo entre máquinas; um custo quadrático excede-a com folga.
+    assert time_per_device(2000) < 3 * time_per_device(200)
+
+
+def test_benchmark_report_lists_every_phase(beyond):
+    report = beyond_benchmark.format_report(beyond_benchmark.benchmark([20], rounds=1, fixtures_per_device=5, faulty_fraction=0.1))
+
+    for phase in beyond_benchmark.PHASES + ("total",):
+        assert f" {phase} " in report
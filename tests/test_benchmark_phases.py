@@ -0,0 +1,24 @@
+"""
+Tempo de cada fase com pytest-benchmark, por tamanho de modelo:
+    python -m pytest tests/test_benchmark_phases.py --benchmark-group-by=param:size
+Os tempos das fases da última rodada ficam em extra_info.
+"""
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+import beyond_benchmark
+import beyond_fake_revit
+
+
+@pytest.mark.parametrize("size", (100, 1000, 10000))
+def test_phases(benchmark, beyond, tmp_path, size):
+    def setup():
+        doc = beyond_fake_revit.generate_model(devices=size, path_name=str(tmp_path / f"model_{size}.rvt"))
+        return (doc,), {}
+
+    timings = benchmark.pedantic(beyond_benchmark.run_phases, setup=setup, rounds=3)
+
+    benchmark.extra_info.update({phase: seconds for phase, seconds in timings.items()})
+    benchmark.extra_info["devices"] = size
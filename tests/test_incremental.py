@@ -0,0 +1,72 @@
+"""
+Verificação incremental: os resultados reaproveitados acompanham as
+alterações dos Espaços e Ambientes, e o estado só é gravado quando
+INCREMENTAL_MODE está habilitado.
+"""
+
+import os
+
+import pytest
+
+import beyond_fake_revit
+import beyond_revit_automation
+from helpers import device_results
+
+
+@pytest.fixture
+def incremental(beyond, monkeypatch):
+    monkeypatch.setattr(beyond, "INCREMENTAL_MODE", True)
+    return beyond
+
+
+def spaces_by_name(doc):
+    return {
+        element.Name: element for element in doc._elements
+        if getattr(element, "Category", None) == beyond_fake_revit.BuiltInCategory.OST_MEPSpaces
+    }
+
+
+def full_run(beyond, doc, monkeypatch):
+    monkeypatch.setattr(beyond, "INCREMENTAL_MODE", False)
+    beyond_objects = beyond.run_verification(doc)[0]
+    monkeypatch.setattr(beyond, "INCREMENTAL_MODE", True)
+    return beyond_objects
+
+
+def test_state_file_is_opt_in(synthetic_model):
+    doc = synthetic_model(20)
+    beyond_revit_automation.run_verification(doc)
+
+    assert beyond_revit_automation.INCREMENTAL_MODE is False
+    assert not os.path.exists(os.path.join(os.path.dirname(doc.PathName), beyond_revit_automation.IncrementalState.FILE_NAME))
+
+
+def test_renamed_space_invalidates_reused_devices(incremental, synthetic_model, monkeypatch):
+    doc = synthetic_model(200, space_property_fraction=0.5)
+    beyond_objects = incremental.run_verification(doc)[0]
+    spaces = spaces_by_name(doc)
+    space_name = next(device.space_or_room for device in beyond_objects if device.space_or_room in spaces)
+
+    with beyond_fake_revit.edit_model(doc):
+        spaces[space_name].get_Parameter(beyond_fake_revit.BuiltInParameter.SPACE_NAME_PARAM).Set("Espaço renomeado")
+    beyond_objects = incremental.run_verification(doc)[0]
+
+    assert space_name not in {device.space_or_room for device in beyond_objects}
+    assert "Espaço renomeado" in {device.space_or_room for device in beyond_objects}
+    assert device_results(beyond_objects) == device_results(full_run(incremental, doc, monkeypatch))
+
+
+def test_reshaped_space_invalidates_reused_devices(incremental, synthetic_model, monkeypatch):
+    doc = synthetic_model(200, space_property_fraction=0)
+    beyond_objects = incremental.run_verification(doc)[0]
+    spaces = spaces_by_name(doc)
+    space_name = next(device.space_or_room for device in beyond_objects if device.space_or_room in spaces)
+
+    space = spaces[space_name]
+    far_corner = beyond_fake_revit.XYZ(-1000.0, -1000.0, space._bounding_box.Min.Z)
+    with beyond_fake_revit.edit_model(doc):
+        space._bounding_box = beyond_fake_revit.BoundingBoxXYZ(far_corner, far_corner)
+    beyond_objects = incremental.run_verification(doc)[0]
+
+    assert space_name not in {device.space_or_room for device in beyond_objects}
+    assert device_results(beyond_objects) == device_results(full_run(incremental, doc, monkeypatch))
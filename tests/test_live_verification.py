@@ -0,0 +1,108 @@
+"""
+Verificação contínua com relógios fictícios: agrupamento das alterações pelo
+ChangeDebouncer e continuação, nos momentos ociosos seguintes, dos
+dispositivos que não couberam no LIVE_LATENCY_BUDGET_SECONDS.
+"""
+
+import beyond_fake_revit
+
+
+class FakeClock:
+    """
+    Relógio controlado pelo teste; step avança o horário a cada leitura.
+    """
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        now = self.now
+        self.now += self.step
+        return now
+
+
+def change(beyond, added=(), modified=(), deleted=()):
+    return beyond.ModelChange(set(added), set(modified), set(deleted))
+
+
+def test_debouncer_quiet_period(beyond):
+    clock = FakeClock()
+    debouncer = beyond.ChangeDebouncer(quiet_seconds=0.5, max_delay_seconds=2.0, clock=clock)
+    assert not debouncer.is_due()
+
+    debouncer.add(change(beyond, added={1}, modified={2}))
+    clock.now = 0.4
+    assert not debouncer.is_due()
+    debouncer.add(change(beyond, modified={3}, deleted={1}))
+    clock.now = 0.8
+    assert not debouncer.is_due()
+    clock.now = 0.9
+    assert debouncer.is_due()
+
+    assert debouncer.take() == change(beyond, modified={2, 3}, deleted={1})
+    assert not debouncer.pending and not debouncer.is_due()
+
+
+def test_debouncer_max_delay(beyond):
+    clock = FakeClock()
+    debouncer = beyond.ChangeDebouncer(quiet_seconds=0.5, max_delay_seconds=2.0, clock=clock)
+
+    for tick in range(7):
+        clock.now = tick * 0.3
+        debouncer.add(change(beyond, modified={tick}))
+        assert not debouncer.is_due()
+    clock.now = 2.0
+    assert debouncer.is_due()
+    assert debouncer.take().modified_ids == set(range(7))
+
+
+def test_live_flush_waits_for_quiet_period(beyond, synthetic_model):
+    doc = synthetic_model(30, faulty_fraction=0)
+    debouncer_clock = FakeClock()
+    live_verifier = beyond.LiveVerifier.from_document(
+        doc, beyond.BEYOND_TYPE_NAMES, debouncer=beyond.ChangeDebouncer(0.5, 2.0, clock=debouncer_clock)
+    )
+    live_verifier.start(beyond.DocumentChangedSource(doc))
+    family_instance = doc.GetElement(beyond_fake_revit.ElementId(next(iter(live_verifier.devices))))
+    try:
+        with beyond_fake_revit.edit_model(doc):
+            beyond_fake_revit.move_element(family_instance, beyond_fake_revit.XYZ(1.0, 1.0, 0.0))
+        debouncer_clock.now = 0.3
+        assert live_verifier.flush_if_due() == []
+        assert live_verifier.pending
+
+        debouncer_clock.now = 0.6
+        verified_devices = live_verifier.flush_if_due()
+    finally:
+        live_verifier.stop()
+
+    assert [device.revit_element_id for device in verified_devices] == [family_instance.Id.Value]
+    assert not live_verifier.pending
+
+
+def test_latency_budget_carries_over_to_next_idle(beyond, synthetic_model):
+    doc = synthetic_model(30, faulty_fraction=0)
+    updates = []
+    live_verifier = beyond.LiveVerifier.from_document(
+        doc, beyond.BEYOND_TYPE_NAMES, debouncer=beyond.ChangeDebouncer(0, 0), latency_budget=0.2,
+        clock=FakeClock(step=0.05), on_update=lambda verified_devices, removed_ids: updates.append(verified_devices),
+    )
+    live_verifier.start(beyond.DocumentChangedSource(doc))
+    moved_ids = sorted(live_verifier.devices)[:12]
+    try:
+        with beyond_fake_revit.edit_model(doc):
+            for element_id in moved_ids:
+                beyond_fake_revit.move_element(doc.GetElement(beyond_fake_revit.ElementId(element_id)), beyond_fake_revit.XYZ(2.0, 2.0, 0.0))
+
+        flushes = []
+        while live_verifier.pending:
+            flushes.append([device.revit_element_id for device in live_verifier.flush_if_due()])
+            assert len(flushes) < 10
+        assert live_verifier.flush_if_due() == []
+    finally:
+        live_verifier.stop()
+
+    # Cada descarga verifica o primeiro dispositivo e os seguintes enquanto o relógio não ultrapassa 0.2 s.
+    assert [len(flush) for flush in flushes] == [5, 5, 2]
+    assert [element_id for flush in flushes for element_id in flush] == moved_ids
+    assert [[device.revit_element_id for device in update] for update in updates] == flushes
@@ -0,0 +1,64 @@
+"""
+LoadDependencyIndex: as alterações de luminárias aplicadas como delta
+resultam nas mesmas cargas que uma nova soma de todas as luminárias.
+"""
+
+import random
+
+import pytest
+
+
+def assert_matches_fresh_sum(beyond, dependency_index, fixtures):
+    fresh_mapping = beyond.LightingService.sum_apparent_load_by_switch_id(fixtures.values())
+    load_mapping = dependency_index.load_mapping
+
+    assert sorted(key for key, _ in load_mapping) == sorted(key for key, _ in fresh_mapping)
+    for key, fresh_entry in fresh_mapping:
+        entry = load_mapping.get(key)
+        assert list(entry.element_ids) == fresh_entry.element_ids
+        assert entry.fixture_count == fresh_entry.fixture_count
+        assert entry.apparent_load == pytest.approx(fresh_entry.apparent_load, rel=1e-9, abs=1e-9)
+    assert load_mapping.fixtures_without_connector == fresh_mapping.fixtures_without_connector
+
+
+def test_fixture_changes_match_fresh_sum(beyond, synthetic_model):
+    doc = synthetic_model(200)
+    beyond_objects, lighting_fixtures, _ = beyond.run_verification(doc)
+    dependency_index = beyond.LoadDependencyIndex.build(lighting_fixtures, beyond_objects)
+    # Ordem de soma de cada luminária: alterações de comando e luminárias sem comando vão para o final.
+    fixtures = {fixture.element_id: fixture for fixture in lighting_fixtures}
+    channel_keys = sorted({key for device in beyond_objects for key in dependency_index._device_keys[device.revit_element_id]})
+    generator = random.Random(3)
+    next_element_id = max(fixtures) + 1
+
+    for step in range(400):
+        change = ("add", "edit", "move", "remove", "disconnect")[step % 5]
+        if change == "add":
+            fixture = beyond.LightingFixture(next_element_id, *generator.choice(channel_keys), generator.uniform(1, 100), True)
+            next_element_id += 1
+        elif change == "remove":
+            element_id = generator.choice(sorted(fixtures))
+            previous_key = dependency_index.channel_key(fixtures.pop(element_id))
+            affected_devices = dependency_index.apply_fixture_changes(removed_element_ids=[element_id])
+            assert affected_devices == dependency_index.devices_for_keys({previous_key} - {None})
+            assert_matches_fresh_sum(beyond, dependency_index, fixtures)
+            continue
+        else:
+            previous = fixtures[generator.choice(sorted(fixtures))]
+            if change == "edit":
+                fixture = previous._replace(apparent_load=generator.uniform(1, 100))
+            elif change == "move":
+                fixture = previous._replace(**dict(zip(("panel", "circuit_number", "switch_id"), generator.choice(channel_keys))))
+            else:
+                fixture = previous._replace(has_connector=not previous.has_connector)
+
+        previous = fixtures.get(fixture.element_id)
+        previous_key = dependency_index.channel_key(previous) if previous else None
+        key = dependency_index.channel_key(fixture)
+        if previous is not None and (key is None or key != previous_key):
+            del fixtures[fixture.element_id]
+        fixtures[fixture.element_id] = fixture
+
+        affected_devices = dependency_index.apply_fixture_changes([fixture])
+        assert affected_devices == dependency_index.devices_for_keys({previous_key, key} - {None})
+        assert_matches_fresh_sum(beyond, dependency_index, fixtures)
@@ -0,0 +1,65 @@
+"""
+Dispositivos sem Base ou com menos de 3 Saídas são reportados como issues
+do próprio dispositivo, sem interromper a execução em fluxo.
+"""
+
+import os
+
+import beyond_fake_revit
+from helpers import device_results, remove_components
+
+
+def issue_codes(device):
+    return [(issue_code["code"], issue_code.get("channel")) for issue_code in device.issue_codes]
+
+
+def test_missing_components_are_device_issues(beyond, synthetic_model, monkeypatch):
+    doc = synthetic_model(50, faulty_fraction=0)
+    without_dock_station, without_channel = remove_components(beyond, doc)
+    monkeypatch.setattr(beyond, "EXPORT_SNAPSHOT", True)
+
+    beyond_objects, _, _ = beyond.run_verification(doc)
+    devices = {device.revit_element_id: device for device in beyond_objects}
+
+    assert len(beyond_objects) == 50
+    assert ("DOCK_STATION_MISSING", None) in issue_codes(devices[without_dock_station])
+    assert ("CHANNEL_MISSING", 3) in issue_codes(devices[without_channel])
+    assert devices[without_dock_station].issue_flag and devices[without_channel].issue_flag
+    missing_codes = {"DOCK_STATION_MISSING", "CHANNEL_MISSING"}
+    assert {device.revit_element_id for device in beyond_objects if missing_codes & {code for code, _ in issue_codes(device)}} == {
+        without_dock_station, without_channel}
+
+    snapshot_path = os.path.join(os.path.dirname(doc.PathName), beyond.ModelSnapshot.FILE_NAME)
+    assert device_results(beyond.run_offline_validation(snapshot_path)) == device_results(beyond_objects)
+
+
+def test_missing_components_in_live_verification(beyond, synthetic_model):
+    doc = synthetic_model(20, faulty_fraction=0)
+    live_verifier = beyond.LiveVerifier.from_document(doc, beyond.BEYOND_TYPE_NAMES, debouncer=beyond.ChangeDebouncer(0, 0))
+    live_verifier.start(beyond.DocumentChangedSource(doc))
+
+    without_dock_station, without_channel = remove_components(beyond, doc)
+    live_verifier.flush()
+    live_verifier.stop()
+
+    assert ("DOCK_STATION_MISSING", None) in issue_codes(live_verifier.devices[without_dock_station])
+    assert ("CHANNEL_MISSING", 3) in issue_codes(live_verifier.devices[without_channel])
+
+
+def test_channel_without_switch_id_parameter(beyond, synthetic_model, monkeypatch):
+    doc = synthetic_model(50, faulty_fraction=0)
+    monkeypatch.setattr(beyond, "SCOPE", beyond.VerificationScope.LEVELS)
+    monkeypatch.setattr(beyond, "SCOPE_LEVEL_NAMES", ("Nível 1",))
+    beyond_families = beyond.ModelCollector.get_beyond_families(doc, beyond.BEYOND_TYPE_NAMES, beyond.VerificationScope(
+        beyond.VerificationScope.LEVELS, level_names=("Nível 1",)))
+    nested_family_index = beyond.NestedFamilyIndex.build(doc, beyond_families)
+    device_id = beyond_families[0].Id.Value
+    output_channel = nested_family_index.get_nested_families(device_id, beyond.NestedFamilyIndex.OUTPUT_CHANNEL)[0]
+    del output_channel._parameters[beyond_fake_revit.BuiltInParameter.RBS_ELEC_SWITCH_ID_PARAM]
+
+    beyond_objects = beyond.run_verification(doc)[0]
+    devices = {device.revit_element_id: device for device in beyond_objects}
+
+    assert len(beyond_objects) == len(beyond_families)
+    assert devices[device_id].output_channel_1.switch_id == "Nulo"
+    assert devices[device_id].issue_flag
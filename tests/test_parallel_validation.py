@@ -0,0 +1,62 @@
+"""
+A verificação offline paralela (ParallelValidator) grava exatamente os
+mesmos resultados, log e relatórios que a verificação serial.
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+from helpers import device_results, remove_components
+
+
+class FixedClock:
+    """
+    Substituto de datetime com horário fixo, para que o cabeçalho do log e o
+    nome dos relatórios sejam iguais nas duas execuções.
+    """
+    @staticmethod
+    def now():
+        return datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest.fixture
+def snapshot_path(beyond, synthetic_model, monkeypatch):
+    doc = synthetic_model(400, panels=6, faulty_fraction=0.2)
+    remove_components(beyond, doc)
+    monkeypatch.setattr(beyond, "EXPORT_SNAPSHOT", True)
+    beyond.run_verification(doc)
+    return os.path.join(os.path.dirname(doc.PathName), beyond.ModelSnapshot.FILE_NAME)
+
+
+def offline_run(beyond, snapshot_path, output_directory, workers):
+    """
+    Returns:
+        (device_results, {nome do arquivo: bytes} do log e dos relatórios)
+    """
+    os.makedirs(output_directory)
+    beyond_objects = beyond.run_offline_validation(snapshot_path, output_directory, report_formats=("text", "jsonl", "csv"), workers=workers)
+    files = {}
+    for directory in (output_directory, os.path.join(output_directory, beyond.ReportArchive.DIRECTORY_NAME)):
+        for file_name in os.listdir(directory):
+            file_path = os.path.join(directory, file_name)
+            if os.path.isfile(file_path):
+                with open(file_path, 'rb') as output_file:
+                    files[file_name] = output_file.read()
+    return device_results(beyond_objects), files
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_parallel_output_matches_serial(beyond, snapshot_path, tmp_path, monkeypatch, workers):
+    monkeypatch.setattr(beyond, "datetime", FixedClock)
+
+    serial_results, serial_files = offline_run(beyond, snapshot_path, str(tmp_path / "serial"), 1)
+    parallel_results, parallel_files = offline_run(beyond, snapshot_path, str(tmp_path / "parallel"), workers)
+
+    assert {"DOCK_STATION_MISSING", "CHANNEL_MISSING"} <= {
+        issue_code["code"] for result in serial_results for issue_code in result[7]}
+    assert sorted(serial_files) == [beyond.LOG_FILE_NAME, "beyond_report_20240101-120000-000000.csv", "beyond_report_20240101-120000-000000.jsonl"]
+    assert parallel_results == serial_results
+    for file_name, content in serial_files.items():
+        assert parallel_files[file_name] == content, file_name
@@ -0,0 +1,77 @@
+"""
+Relatórios estruturados, arquivamento do log e retenção do ReportArchive.
+"""
+
+import csv
+import json
+import os
+
+import pytest
+
+
+def report_files(doc, beyond):
+    directory = os.path.join(os.path.dirname(doc.PathName), beyond.ReportArchive.DIRECTORY_NAME)
+    return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+
+def test_record_shape(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "REPORT_FORMATS", ("jsonl", "csv"))
+    doc = synthetic_model(40, faulty_fraction=0.3)
+    beyond_objects = beyond.run_verification(doc)[0]
+    directory = os.path.join(os.path.dirname(doc.PathName), beyond.ReportArchive.DIRECTORY_NAME)
+    jsonl_name, = (file_name for file_name in report_files(doc, beyond) if file_name.endswith(".jsonl"))
+    csv_name, = (file_name for file_name in report_files(doc, beyond) if file_name.endswith(".csv"))
+
+    with open(os.path.join(directory, jsonl_name), encoding="utf-8") as jsonl_file:
+        lines = [json.loads(line) for line in jsonl_file]
+    records = [line for line in lines if "element_id" in line]
+    assert [record["element_id"] for record in records] == [device.revit_element_id for device in beyond_objects]
+    assert records[0] == beyond.DeviceReportRecord.build(beyond_objects[0])
+    assert set(records[0]) == {
+        "element_id", "device_id", "name", "panel", "circuit_number", "space_or_room", "voltage", "number_of_poles",
+        "dock_station_load", "switch_ids", "channel_loads", "issue_flag", "issue_codes", "issues",
+    }
+    summary = lines[-1]["summary"]
+    assert summary["devices"] == len(beyond_objects)
+    assert summary["faulty_devices"] == sum(device.issue_flag for device in beyond_objects)
+
+    with open(os.path.join(directory, csv_name), encoding="utf-8", newline="") as csv_file:
+        reader = csv.DictReader(csv_file)
+        rows = list(reader)
+    assert tuple(reader.fieldnames) == beyond.DeviceReportRecord.CSV_FIELDS
+    assert [int(row["element_id"]) for row in rows] == [device.revit_element_id for device in beyond_objects]
+    faulty_device = next(device for device in beyond_objects if device.issue_codes)
+    faulty_row = next(row for row in rows if int(row["element_id"]) == faulty_device.revit_element_id)
+    assert faulty_row["issue_codes"] == beyond.DeviceReportRecord.csv_row(beyond.DeviceReportRecord.build(faulty_device))["issue_codes"]
+    assert faulty_row["issues"] == " / ".join(faulty_device.issues)
+
+
+def test_retention_and_log_archive(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "REPORT_FORMATS", ("text", "jsonl", "csv"))
+    monkeypatch.setattr(beyond, "REPORT_RETENTION", 2)
+    monkeypatch.setattr(beyond, "LOG_MAX_BYTES", 1)
+    doc = synthetic_model(20)
+
+    runs = []
+    for _ in range(4):
+        before = set(report_files(doc, beyond))
+        beyond.run_verification(doc)
+        runs.append(set(report_files(doc, beyond)) - before)
+
+    remaining = report_files(doc, beyond)
+    latest_reports = sorted(file_name for run in runs[-2:] for file_name in run if file_name.startswith(beyond.ReportArchive.FILE_PREFIX))
+    assert [file_name for file_name in remaining if file_name.startswith(beyond.ReportArchive.FILE_PREFIX)] == latest_reports
+    assert len(latest_reports) == 4
+    # Os logs das execuções 2 e 3 são arquivados nas execuções 3 e 4; o da execução 1 é descartado.
+    archived_logs = [file_name for file_name in remaining if file_name.startswith(beyond.ReportArchive.LOG_PREFIX)]
+    assert len(archived_logs) == 2
+    with open(os.path.join(os.path.dirname(doc.PathName), beyond.LOG_FILE_NAME), encoding="utf-8") as log_file:
+        assert log_file.read().count("Relatório das famílias Beyond") == 1
+
+
+def test_retention_below_one_is_rejected(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "REPORT_RETENTION", 0)
+    doc = synthetic_model(5)
+
+    with pytest.raises(ValueError):
+        beyond.run_verification(doc)
@@ -0,0 +1,132 @@
+"""
+ValidationResultIndex: consultas combinadas, partição por issue_flag, issues
+entre dispositivos e atualização pela verificação contínua.
+"""
+
+import sys
+
+import pytest
+
+import beyond_fake_revit
+
+
+def brute_force(beyond_devices, **filters):
+    """
+    Returns:
+        set dos Ids dos dispositivos que atendem aos filtros, percorrendo a lista.
+    """
+    def values(device, field):
+        if field == "switch_id":
+            return {channel.switch_id for channel in (device.output_channel_1, device.output_channel_2, device.output_channel_3)}
+        if field == "issue_code":
+            return {issue_code["code"] for issue_code in device.issue_codes}
+        return {getattr(device, field)}
+
+    return {
+        device.revit_element_id for device in beyond_devices
+        if all(values(device, field) & (set(value) if isinstance(value, list) else {value}) for field, value in filters.items())
+    }
+
+
+@pytest.fixture
+def verified_model(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "CHECK_SWITCH_ID_CONSISTENCY", False)
+    doc = synthetic_model(300, faulty_fraction=0.3)
+    beyond_objects, lighting_fixtures, result_index = beyond.run_verification(doc)
+    return doc, beyond_objects, result_index
+
+
+def test_find_combined_filters(beyond, verified_model):
+    _, beyond_objects, result_index = verified_model
+    faulty_device = next(device for device in beyond_objects if device.issue_flag)
+    panels = sorted({device.panel for device in beyond_objects})[:2]
+    issue_code = faulty_device.issue_codes[0]["code"]
+
+    queries = [
+        {"panel": faulty_device.panel, "circuit_number": faulty_device.circuit_number},
+        {"space_or_room": faulty_device.space_or_room, "issue_code": issue_code},
+        {"panel": panels, "switch_id": faulty_device.output_channel_1.switch_id},
+        {"panel": panels, "issue_code": [issue_code, beyond.IssueCode.CHANNEL_OVERLOAD]},
+        {"device_id": faulty_device.device_id},
+    ]
+    for filters in queries:
+        assert result_index.find(**filters) == brute_force(beyond_objects, **filters), filters
+    assert result_index.find() == {device.revit_element_id for device in beyond_objects}
+    assert result_index.find(panel="Painel inexistente", issue_flag=True) == set()
+    with pytest.raises(ValueError):
+        result_index.find(name="Beyond")
+
+
+def test_issue_flag_partition(verified_model):
+    _, beyond_objects, result_index = verified_model
+
+    for issue_flag in (True, False):
+        assert result_index.find(issue_flag=issue_flag) == brute_force(beyond_objects, issue_flag=issue_flag)
+        for panel in result_index.values("panel"):
+            assert result_index.find(panel=panel, issue_flag=issue_flag) == brute_force(beyond_objects, panel=panel, issue_flag=issue_flag)
+    assert result_index.find(issue_flag=True)
+
+
+def test_project_issue_codes(beyond, verified_model):
+    _, beyond_objects, _ = verified_model
+    lighting_load_mapping = beyond.LightingLoadIndex()
+    project_issues = beyond.SwitchIdConsistencyCheck.build(beyond_objects).check(lighting_load_mapping)
+    result_index = beyond.ValidationResultIndex.build(beyond_objects, project_issues)
+
+    orphan_channel_ids = {element_id for project_issue in project_issues for element_id, _, _ in project_issue.channels}
+    assert orphan_channel_ids
+    assert result_index.find(issue_code=beyond.IssueCode.ORPHAN_CHANNEL) == orphan_channel_ids
+    element_id = next(iter(orphan_channel_ids))
+    assert result_index.get(element_id)["issue_code"].count(beyond.IssueCode.ORPHAN_CHANNEL) == 1
+
+    result_index.remove_device(element_id)
+    assert element_id not in result_index.find(issue_code=beyond.IssueCode.ORPHAN_CHANNEL)
+    assert result_index.get(element_id) is None
+
+
+def test_live_flush_updates_index(beyond, verified_model, monkeypatch):
+    doc, beyond_objects, result_index = verified_model
+    monkeypatch.setattr(beyond, "LIVE_QUIET_SECONDS", 0)
+    monkeypatch.setattr(beyond, "LIVE_MAX_DELAY_SECONDS", 0)
+    overloaded_device = next(device for device in beyond_objects if not device.issue_flag)
+    removed_device = beyond_objects[-1]
+    channel = overloaded_device.output_channel_1
+
+    live_verifier = beyond.start_live_verification(doc, change_source=beyond.DocumentChangedSource(doc), result_index=result_index)
+    try:
+        with beyond_fake_revit.edit_model(doc):
+            beyond_fake_revit.add_lighting_fixture(doc, channel.panel, channel.circuit_number, channel.switch_id, 500)
+            doc.Delete(beyond_fake_revit.ElementId(removed_device.revit_element_id))
+        live_verifier.flush()
+    finally:
+        live_verifier.stop()
+        sys.beyond_live_verifier = None
+
+    fresh_index = beyond.ValidationResultIndex.build(beyond.run_verification(doc)[0])
+    assert overloaded_device.revit_element_id in result_index.find(issue_flag=True, issue_code=beyond.IssueCode.CHANNEL_OVERLOAD)
+    assert removed_device.revit_element_id not in result_index
+    assert len(result_index) == len(fresh_index)
+    for element_id in fresh_index.find():
+        assert result_index.get(element_id) == fresh_index.get(element_id)
+    for issue_flag in (True, False):
+        for panel in fresh_index.values("panel"):
+            assert result_index.find(panel=panel, issue_flag=issue_flag) == fresh_index.find(panel=panel, issue_flag=issue_flag)
+
+
+def test_element_ids_sorted(verified_model):
+    _, _, result_index = verified_model
+    element_ids = result_index.element_ids(issue_flag=True)
+
+    assert [element_id.Value for element_id in element_ids] == sorted(result_index.find(issue_flag=True))
+    assert all(isinstance(element_id, beyond_fake_revit.ElementId) for element_id in element_ids)
+    assert result_index.element_ids(issue_flag=True)[0] is element_ids[0]
+
+
+def test_partition_without_matches(beyond, verified_model):
+    _, beyond_objects, result_index = verified_model
+    working_device = next(device for device in beyond_objects if not device.issue_flag)
+    space_or_room = working_device.space_or_room
+
+    assert result_index.find(device_id=working_device.device_id, issue_flag=True) == set()
+    assert result_index.find(space_or_room=space_or_room, issue_flag=False) == brute_force(beyond_objects, space_or_room=space_or_room, issue_flag=False)
+    assert result_index.find(issue_code=beyond.IssueCode.CHANNEL_OVERLOAD, issue_flag=False) == set()
@@ -0,0 +1,71 @@
+"""
+As entradas lidas do modelo seguem as regras habilitadas e os parâmetros
+escritos, e a assinatura do plano acompanha as funções das regras.
+"""
+
+import pytest
+
+import beyond_fake_revit
+
+
+WRITE_BACK_PARAMETERS = ("Beyond.IDObjeto", "Beyond.PainelDistribuição", "Beyond.NúmeroDoCircuito")
+
+
+@pytest.fixture
+def rules(beyond, monkeypatch):
+    registry = beyond.BeyondRules.default_registry()
+    monkeypatch.setattr(beyond, "RULES", registry)
+    return registry
+
+
+def check_circuit_again(service, rule, context):
+    service.check_device_circuit(rule.severity)
+
+
+def test_disabled_rules_reduce_inputs(beyond, rules, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "WRITE_BACK_PARAMETERS", WRITE_BACK_PARAMETERS)
+    rules.disable(beyond.BeyondRules.CHANNEL_LOAD)
+    rules.disable(beyond.BeyondRules.DOCK_STATION_LOAD)
+    rule_plan = rules.plan(beyond.RuleInput.write_back_values(WRITE_BACK_PARAMETERS))
+
+    assert not rule_plan.requires(beyond.RuleInput.LIGHTING_LOADS)
+    assert not rule_plan.requires(beyond.RuleInput.SPACE_OR_ROOM)
+    assert rule_plan.parameter_keys(beyond.RuleInput.DOCK_STATION) == ("panel", "circuit_number")
+
+    doc = synthetic_model(30, faulty_fraction=0)
+    beyond_objects = beyond.run_verification(doc)[0]
+    family_instance = doc.GetElement(beyond_fake_revit.ElementId(beyond_objects[0].revit_element_id))
+
+    assert family_instance.LookupParameter("Beyond.PainelDistribuição").AsString() == beyond_objects[0].panel
+    assert not family_instance.LookupParameter("Beyond.LocalDeInstalação").AsString()
+
+
+def test_unknown_write_back_parameter(beyond):
+    with pytest.raises(ValueError):
+        beyond.RuleInput.write_back_values(("Beyond.Desconhecido",))
+
+
+def test_signature_follows_rule_check(beyond, rules):
+    required_inputs = beyond.RuleInput.write_back_values(beyond.BeyondParameterWriter.PARAMETER_NAMES)
+    signature = rules.plan(required_inputs).signature()
+    circuit_check = rules.get(beyond.BeyondRules.CIRCUIT_CHECK)
+
+    rules.register(beyond.Rule(circuit_check.name, circuit_check.check, circuit_check.inputs), replace=True)
+    assert rules.plan(required_inputs).signature() == signature
+
+    rules.register(beyond.Rule(circuit_check.name, check_circuit_again, circuit_check.inputs), replace=True)
+    assert rules.plan(required_inputs).signature() != signature
+
+
+def test_replaced_rule_discards_incremental_state(beyond, rules, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "INCREMENTAL_MODE", True)
+    doc = synthetic_model(30)
+    beyond.run_verification(doc)
+    circuit_check = rules.get(beyond.BeyondRules.CIRCUIT_CHECK)
+    rules.register(beyond.Rule(circuit_check.name, check_circuit_again, circuit_check.inputs), replace=True)
+
+    states = []
+    monkeypatch.setattr(beyond.IncrementalState, "save", lambda state: states.append(state))
+    beyond.run_verification(doc)
+
+    assert states[0].reused_devices == 0
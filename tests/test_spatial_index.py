@@ -0,0 +1,66 @@
+"""
+SpatialGridIndex com itens e pontos em Python puro, sem a API do Revit.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def grid(beyond):
+    """
+    Grade de células de 10 pés com uma sala grande cobrindo várias células no
+    nível 1 e duas salas sobrepostas no nível 2.
+    """
+    grid = beyond.SpatialGridIndex(cell_size=10.0)
+    grid.insert(1, "sala grande", (5.0, 5.0, 0.0), (35.0, 25.0, 10.0))
+    grid.insert(2, "sala superior", (0.0, 0.0, 12.0), (20.0, 20.0, 22.0))
+    grid.insert(2, "mezanino", (0.0, 0.0, 12.0), (10.0, 10.0, 22.0))
+    return grid
+
+
+def test_box_spanning_several_cells(grid):
+    for point in [(6.0, 6.0, 1.0), (15.0, 15.0, 1.0), (34.0, 24.0, 1.0), (25.0, 8.0, 9.0)]:
+        assert grid.query(1, point) == "sala grande", point
+    # Mesma célula da sala, fora da sua caixa envolvente.
+    assert grid.query(1, (38.0, 24.0, 1.0)) is None
+    assert grid.query(1, (-5.0, -5.0, 1.0)) is None
+
+
+def test_points_on_boundary(grid):
+    assert grid.query(1, (5.0, 5.0, 0.0)) == "sala grande"
+    assert grid.query(1, (35.0, 25.0, 10.0)) == "sala grande"
+    assert grid.query(1, (10.0, 20.0, 5.0)) == "sala grande"
+    assert grid.query(1, (35.000001, 25.0, 10.0)) is None
+
+
+def test_exact_test_rejection(grid):
+    candidates = []
+
+    def contains(item):
+        candidates.append(item)
+        return item != "sala superior"
+
+    assert grid.query(2, (5.0, 5.0, 15.0), contains) == "mezanino"
+    assert candidates == ["sala superior", "mezanino"]
+
+    candidates.clear()
+    assert grid.query(2, (15.0, 15.0, 15.0), contains) is None
+    # Apenas as caixas que contêm o ponto passam pelo teste exato, em todos os níveis.
+    assert candidates == ["sala superior"]
+
+
+def test_cross_level_fallback(grid):
+    assert grid.query(1, (15.0, 15.0, 15.0)) == "sala superior"
+    assert grid.query(3, (15.0, 15.0, 5.0)) == "sala grande"
+    assert grid.query(2, (15.0, 15.0, 15.0)) == "sala superior"
+    assert grid.query(2, (15.0, 15.0, 5.0), lambda item: True) == "sala grande"
+
+
+def test_profiler_counts_exact_checks(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "PROFILE_RUN", True)
+    doc = synthetic_model(100, space_property_fraction=0)
+    beyond.run_verification(doc)
+    api_calls = beyond.PROFILER.api_calls
+
+    assert "GetSpaceAtPoint" not in api_calls and "GetRoomAtPoint" not in api_calls
+    assert 0 < api_calls["IsPointInSpace"]
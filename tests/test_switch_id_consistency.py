@@ -0,0 +1,30 @@
+"""
+As issues de consistência dos comandos são gravadas na mesma ordem na
+verificação offline serial e na paralela.
+"""
+
+import glob
+import json
+import os
+
+
+def project_issues(beyond, snapshot_path, output_directory, workers):
+    os.makedirs(output_directory)
+    beyond.run_offline_validation(snapshot_path, output_directory, report_formats=("jsonl",), workers=workers)
+    report_path, = glob.glob(os.path.join(output_directory, "beyond_reports", "beyond_report_*.jsonl"))
+    with open(report_path, encoding="utf-8") as report_file:
+        records = [json.loads(line) for line in report_file]
+    return [record["project_issue"] for record in records if "project_issue" in record]
+
+
+def test_parallel_project_issues_match_serial(beyond, synthetic_model, tmp_path, monkeypatch):
+    doc = synthetic_model(400, panels=6, unrelated_fixture_fraction=0.3)
+    monkeypatch.setattr(beyond, "EXPORT_SNAPSHOT", True)
+    beyond.run_verification(doc)
+    snapshot_path = os.path.join(os.path.dirname(doc.PathName), beyond.ModelSnapshot.FILE_NAME)
+
+    serial = project_issues(beyond, snapshot_path, str(tmp_path / "serial"), 1)
+    parallel = project_issues(beyond, snapshot_path, str(tmp_path / "parallel"), 3)
+
+    assert any(issue["code"] == beyond.IssueCode.ORPHAN_FIXTURES for issue in serial)
+    assert parallel == serial
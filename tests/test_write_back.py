@@ -0,0 +1,66 @@
+"""
+Escrita dos parâmetros em transações por lotes: o TransactionGroup da
+execução é desfeito quando uma transação não é confirmada ou quando outro
+estágio da execução em fluxo falha.
+"""
+
+import pytest
+
+import beyond_fake_revit
+
+
+@pytest.fixture
+def write_back_model(beyond, synthetic_model, monkeypatch):
+    monkeypatch.setattr(beyond, "WRITE_BACK_CHUNK_SIZE", 10)
+    return synthetic_model(60, faulty_fraction=0.3)
+
+
+def group_statuses(doc):
+    return [transaction_group.status for transaction_group in doc.transaction_groups]
+
+
+def test_write_back_assimilates_group(beyond, write_back_model):
+    beyond.run_verification(write_back_model)
+
+    assert group_statuses(write_back_model) == [beyond_fake_revit.TransactionStatus.Committed]
+    assert write_back_model.active_transaction is None
+
+
+def test_failed_commit_rolls_back_group(beyond, write_back_model):
+    write_back_model.failing_commits = 1
+
+    with pytest.raises(RuntimeError, match="não foi confirmada"):
+        beyond.run_verification(write_back_model)
+
+    assert group_statuses(write_back_model) == [beyond_fake_revit.TransactionStatus.RolledBack]
+    assert write_back_model.active_transaction is None
+
+
+def test_downstream_failure_rolls_back_group(beyond, write_back_model, monkeypatch):
+    written_devices = []
+
+    def write_device(report_sink, device):
+        written_devices.append(device)
+        if len(written_devices) == 30:
+            raise OSError("disco cheio")
+
+    monkeypatch.setattr(beyond.JsonlReportSink, "write_device", write_device)
+
+    with pytest.raises(OSError):
+        beyond.run_verification(write_back_model)
+
+    assert group_statuses(write_back_model) == [beyond_fake_revit.TransactionStatus.RolledBack]
+    assert write_back_model.active_transaction is None
+
+
+def test_failed_parameter_write_rolls_back_transaction(beyond, write_back_model, monkeypatch):
+    def set_family_parameters(setter, pending_writes=None):
+        raise ValueError("parâmetro somente leitura")
+
+    monkeypatch.setattr(beyond.BeyondParameterWriter, "set_family_parameters", set_family_parameters)
+
+    with pytest.raises(ValueError):
+        beyond.run_verification(write_back_model)
+
+    assert group_statuses(write_back_model) == [beyond_fake_revit.TransactionStatus.RolledBack]
+    assert write_back_model.active_transaction is None